@@ -1,6 +1,10 @@
-def main():
-    print("Hello from telusinger!")
+import sys
+from pathlib import Path
 
+# Lets `python main.py <command>` run from a checkout without installing.
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from telusinger.cli import main
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
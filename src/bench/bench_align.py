@@ -0,0 +1,117 @@
+import argparse
+import contextlib
+import csv
+import io
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from datasets import align_lyrics
+from utils.dataset_csv import song_stem
+from utils.wav_io import write_pcm16
+
+RATE = 16000
+WORDS = ["ప్రేమ", "మనసు", "కలలు", "వెన్నెల", "గాలి", "నీవే", "పాట", "చిరు", "హృదయం", "ఆకాశం"]
+SYLLABLES = ["ka", "ma", "la", "ra", "va", "ne", "pu", "ti", "so", "ga"]
+SECONDS_PER_CHAR = 0.09
+
+class SlowAligner:
+    # Stands in for an aligner that hangs on a bad file.
+    name = "slow"
+
+    def params(self):
+        return {}
+
+    def align(self, path, lines):
+        time.sleep(3600)
+
+def synth_song(path, lines, rng):
+    # Every line is one sung phrase, as long as its text, between pauses of
+    # quiet noise, after a quiet intro. Returns the true (start, end) spans.
+    parts, spans = [rng.normal(0, 0.002, int(RATE * rng.uniform(1, 3)))], []
+    t = len(parts[0]) / RATE
+    for line in lines:
+        n = int(RATE * len(line.replace(" ", "")) * SECONDS_PER_CHAR * rng.uniform(0.85, 1.15))
+        pitch = rng.uniform(180, 400)
+        k = np.arange(n) / RATE
+        voice = 0.3 * np.sin(2 * np.pi * pitch * k + 3 * np.sin(2 * np.pi * 5 * k))
+        parts.append(voice + rng.normal(0, 0.01, n))
+        spans.append((t, t + n / RATE))
+        gap = rng.normal(0, 0.002, int(RATE * rng.uniform(0.4, 1.5)))
+        parts.append(gap)
+        t += (n + len(gap)) / RATE
+    write_pcm16(path, RATE, np.concatenate(parts)[:, None])
+    return spans
+
+def title(i, words=2):
+    # Distinct romanized names: title matching folds digits away.
+    digits = f"{i:0{words * 3}d}"
+    return " ".join("".join(SYLLABLES[int(d)] for d in digits[w * 3:w * 3 + 3]).capitalize() for w in range(words))
+
+def build(root, songs, seed=0):
+    rng = np.random.default_rng(seed)
+    pick = random.Random(seed)
+    dataset, lyrics, truth = [], [], {}
+    for i in range(songs):
+        song = {"song_name": title(i), "movie_name": f"{title(i // 4, 1)} (1990)", "category": "Solo / Bench",
+                "Downloaded": "Yes", "Vocals_Extracted": "No", "DeReverbed": "No", "Notes": ""}
+        lines = [" ".join(pick.choices(WORDS, k=pick.randint(2, 6))) for _ in range(pick.randint(16, 32))]
+        stem = song_stem(root / "raw", song)
+        stem.parent.mkdir(parents=True, exist_ok=True)
+        truth[song["song_name"]] = synth_song(stem.parent / f"{stem.name}.wav", lines, rng)
+        dataset.append(song)
+        # extracted_data.csv spelling: underscores, no year.
+        lyrics.append({"movie_name": title(i // 4, 1), "song_name": title(i).replace(" ", "_"), "lyrics": "\n".join(lines)})
+    for path, rows in ((root / "dataset.csv", dataset), (root / "lyrics.csv", lyrics)):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return truth
+
+def error_ms(output, truth):
+    import pyarrow.parquet as pq
+    table = pq.read_table(output).to_pandas()
+    errors = []
+    for row in table.itertuples():
+        start, end = truth[row.song_name][row.line]
+        errors += [abs(row.start - start), abs(row.end - end)]
+    return np.array(errors) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=align_lyrics.WORKERS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        truth = build(root, args.songs)
+        minutes = sum(spans[-1][1] for spans in truth.values()) / 60
+        print(f"{args.songs} songs, {minutes:.0f} min of audio, {sum(map(len, truth.values()))} lines\n")
+        print(f"{'run':<28}{'seconds':>9}{'songs/s':>9}{'median ms':>11}{'p90 ms':>8}")
+
+        def run(name, workers, aligner="energy", timeout=align_lyrics.TIMEOUT, cache="cache"):
+            output = root / f"{cache}.parquet"
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = align_lyrics.run(root / "dataset.csv", root / "raw", [root / "lyrics.csv"], output,
+                                         root / cache, aligner, workers, timeout)
+            if stats["aligned"]:
+                errors = error_ms(output, truth)
+                accuracy = f"{np.median(errors):>11.0f}{np.percentile(errors, 90):>8.0f}"
+            else:
+                accuracy = f"{'-':>11}{'-':>8}"
+            print(f"{name:<28}{stats['seconds']:>9.2f}{args.songs / stats['seconds']:>9.1f}{accuracy}")
+            return stats
+
+        run("1 worker, cold cache", 1, cache="serial")
+        run(f"{args.workers} workers, cold cache", args.workers)
+        run(f"{args.workers} workers, warm cache", args.workers)
+        stats = run("hung aligner, 2 s timeout", args.workers, "bench.bench_align:SlowAligner", 2.0, "slow")
+        print(f"\nhung aligner: {stats['timeout']}/{args.songs} songs killed at their timeout")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
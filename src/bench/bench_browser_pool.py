@@ -0,0 +1,47 @@
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+from bench.fixture_server import FixtureServer
+from scrape import lyrics_extractionV2
+
+def write_songs(path, count):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["song_name", "movie_album", "singers"])
+        writer.writeheader()
+        for i in range(count):
+            writer.writerow({"song_name": f"Fixture Song {i}", "movie_album": f"Fixture Movie {i % 5}", "singers": ""})
+
+def run(server, csv_file, out_dir, workers):
+    scraper = lyrics_extractionV2.StealthDeepScraper(workers=workers, search_url=server.search_url)
+    scraper.output_dir = Path(out_dir)
+    start = time.perf_counter()
+    scraper.run(csv_file)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated server latency (s)")
+    args = parser.parse_args()
+
+    lyrics_extractionV2.HEADLESS = True
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer(latency=args.latency) as server:
+        csv_file = Path(tmp) / "songs.csv"
+        write_songs(csv_file, args.songs)
+
+        timings = {}
+        for workers in (1, args.workers):
+            timings[workers] = run(server, csv_file, Path(tmp) / f"out{workers}", workers)
+
+    print(f"\n{'mode':<12}{'seconds':>9}{'songs/s':>9}")
+    for workers, seconds in timings.items():
+        mode = "serial" if workers == 1 else f"pool x{workers}"
+        print(f"{mode:<12}{seconds:>9.1f}{args.songs / seconds:>9.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
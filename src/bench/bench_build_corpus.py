@@ -0,0 +1,80 @@
+import re
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from data_cleaning import build_corpus, features
+
+NEW_SONGS = 50
+
+# The lyrics_cleaning notebook's per-row apply() version, the reference the
+# build must reproduce.
+SANSKRIT_CHARS = set("ఖఘఛఝఠఢథధఫభశషక్ష")
+
+def legacy_build(df):
+    df = df.copy()
+    df['clean_text'] = df['lyrics'].fillna('').astype(str)
+    df['word_count'] = df['clean_text'].apply(lambda x: len(x.split()))
+    def telugu_ratio(text):
+        total = len(re.sub(r'\s', '', text))
+        return len(re.findall(r'[\u0C00-\u0C7F]', text)) / total if total else 0
+    df['telugu_ratio'] = df['clean_text'].apply(telugu_ratio)
+    def uniqueness(text):
+        words = text.split()
+        return len(set(words)) / len(words) if words else 0
+    df['uniqueness_ratio'] = df['clean_text'].apply(uniqueness)
+    df['final_lyrics'] = df['clean_text'].apply(lambda x: re.sub(r'[^\u0C00-\u0C7F\s\.\,\?\!]', '', x))
+    def richness(text):
+        words = text.split()
+        return 0 if len(words) < 10 else len(set(words)) / len(words)
+    df['richness'] = df['final_lyrics'].apply(richness)
+    df['complexity'] = df['final_lyrics'].apply(lambda x: np.mean([len(w) for w in x.split()]) if x.split() else 0)
+    def sanskrit(text):
+        total = len(re.sub(r'\s', '', text))
+        return sum(1 for c in text if c in SANSKRIT_CHARS) / total if total else 0
+    df['sanskrit_score'] = df['final_lyrics'].apply(sanskrit)
+    return df[build_corpus.OUTPUT_COLUMNS]
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    raw = build_corpus.load_raw([build_corpus.RAW_CSV])
+    # The last NEW_SONGS rows play the part of a fresh scrape; their lyrics are
+    # tagged so they hash differently from anything already cached.
+    base = raw.iloc[:-NEW_SONGS]
+    grown = raw.copy()
+    grown.loc[grown.index[-NEW_SONGS:], 'lyrics'] = grown['lyrics'].iloc[-NEW_SONGS:].fillna('') + "\n."
+    print(f"{len(raw)} songs, {raw['lyrics'].fillna('').str.len().sum() / 1024:.0f} KB of lyrics\n")
+
+    legacy, legacy_ms = timed(lambda: legacy_build(raw))
+    print(f"{'legacy apply()':<28}{legacy_ms:>9.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = features.TokenCache(Path(tmp) / "tokens.npz")
+        try:
+            for label, df in (("cold (empty cache)", raw), ("warm (nothing changed)", raw)):
+                (_, computed, reused), ms = timed(lambda: build_corpus.build(df, cache))
+                print(f"{label:<28}{ms:>9.1f} ms  {computed:>4} tokenized {reused:>4} cached")
+
+            build_corpus.build(base, cache)
+            (_, computed, reused), ms = timed(lambda: build_corpus.build(grown, cache))
+            print(f"{f'+{NEW_SONGS} new songs':<28}{ms:>9.1f} ms  {computed:>4} tokenized {reused:>4} cached")
+        finally:
+            cache.close()
+
+    fresh, _, _ = build_corpus.build(raw)
+    mismatched = []
+    for col in build_corpus.OUTPUT_COLUMNS:
+        if col in ('song_name', 'final_lyrics'):
+            same = (fresh[col].astype(str) == legacy[col].astype(str)).all()
+        else:
+            same = np.allclose(fresh[col].astype(float), legacy[col].astype(float))
+        if not same:
+            mismatched.append(col)
+    print(f"\nmatches legacy: {'yes' if not mismatched else 'NO ' + ', '.join(mismatched)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import re
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from telusinger.cli import COMMANDS
+
+BUDGET = 1.0
+SRC = Path(__file__).resolve().parents[1]
+# Stages run as top-level packages out of src/, as bench_scrapers does.
+ENV = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(SRC), os.environ.get("PYTHONPATH")])))
+
+def leaf_commands(table=COMMANDS, prefix=()):
+    for name, entry in table.items():
+        if isinstance(entry, dict):
+            yield from leaf_commands(entry, prefix + (name,))
+        else:
+            yield prefix + (name,), entry[0]
+
+def start_time(argv, repeat):
+    # A fresh interpreter per run: wall time until it exits, the way a shell
+    # user sees it.
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *argv], check=True, env=ENV,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def import_offenders(args, top):
+    # -X importtime lines: "import time: self [us] | cumulative | imported package".
+    err = subprocess.run([sys.executable, "-X", "importtime", "-m", "telusinger", *args],
+                         env=ENV, capture_output=True, text=True).stderr
+    rows = []
+    for line in err.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)", line)
+        if m and not m.group(3):
+            rows.append((int(m.group(2)) / 1e6, m.group(4)))
+    return sorted(rows, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=BUDGET, help="seconds a --help may take")
+    parser.add_argument("--importtime", metavar="ARGS",
+                        help='list the slowest top-level imports of one command instead, e.g. "scrape stealth --help"')
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.importtime is not None:
+        for seconds, module in import_offenders(shlex.split(args.importtime), args.top):
+            print(f"{seconds:>8.3f} s  {module}")
+        return 0
+
+    baseline = start_time(["-c", "pass"], args.repeat)
+
+    runs = [("--help", ["--help"]), ("bench", ["bench"])]
+    runs += [(" ".join(cmd) + " --help", [*cmd, "--help"]) for cmd, _ in leaf_commands()]
+    width = max(len(label) for label, _ in runs) + 2
+    print(f"bare interpreter: {baseline:.3f} s\n")
+    print(f"{'telusinger':<{width}}{'seconds':>9}")
+    slow = 0
+    for label, argv in runs:
+        seconds = start_time(["-m", "telusinger", *argv], args.repeat)
+        over = seconds > args.budget
+        slow += over
+        print(f"{label:<{width}}{seconds:>9.3f}{'  over budget' if over else ''}")
+    print(f"\n{len(runs) - slow}/{len(runs)} under {args.budget:.1f} s")
+    return 1 if slow else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import tempfile
+import time
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+from utils import corpus_store
+
+REPEAT = 5
+PROJECTION = ['song_name', 'telugu_ratio']
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = fn()
+    return result, (time.perf_counter() - start) * 1000 / REPEAT
+
+def write_txt_tree(root, table):
+    # Same layout and header the lyrics scrapers write.
+    for i, row in enumerate(table.select(['song_name', 'movie_name', 'source', 'lyrics']).to_pylist()):
+        folder = Path(root) / row['movie_name']
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"{i}_{row['song_name']}.txt").write_text(
+            f"Song: {row['song_name']}\nMovie: {row['movie_name']}\nSource: {row['source']}\nURL: None\n\n{row['lyrics'] or ''}",
+            encoding='utf-8',
+        )
+
+def report(label, ms, allocated=None):
+    extra = f"{allocated / 1024:>10.0f} KB decoded" if allocated is not None else ""
+    print(f"{label:<40}{ms:>9.2f} ms{extra}")
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        table = corpus_store.main(tmp / "corpus.parquet", [corpus_store.RAW_CSV], [corpus_store.CLEAN_CSV])
+        corpus_store.write_corpus(table, tmp / "corpus.arrow")
+        write_txt_tree(tmp / "txt", table.slice(0, 417))
+        print()
+
+        _, ms = timed(lambda: pd.read_csv(corpus_store.RAW_CSV, index_col=0))
+        report("extracted_data.csv (pandas)", ms)
+        _, ms = timed(lambda: corpus_store.from_txt_tree(tmp / "txt"))
+        report("417-file .txt tree", ms)
+
+        for name in ("corpus.parquet", "corpus.arrow"):
+            for columns, label in ((None, "all columns"), (PROJECTION, " + ".join(PROJECTION))):
+                _, ms = timed(lambda: corpus_store.read_corpus(tmp / name, columns))
+                before = pa.total_allocated_bytes()
+                result = corpus_store.read_corpus(tmp / name, columns)
+                allocated = pa.total_allocated_bytes() - before
+                del result
+                report(f"{name}: {label}", ms, allocated)
+
+if __name__ == "__main__":
+    main()
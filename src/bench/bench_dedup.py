@@ -0,0 +1,52 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from utils import corpus_store
+from data_cleaning import dedup
+
+SIZES = (1000, 10000, 100000)
+DUP_RATE = 0.1
+
+def synthetic_corpus(rows, seed=0):
+    # Distinct songs built from the real corpus vocabulary, plus DUP_RATE
+    # planted near-duplicates (a random ~85% of another song's lines, name
+    # re-spelt) whose originals are known.
+    raw = corpus_store.from_extracted_csv().to_pandas()
+    lines = [l for text in raw['lyrics'].dropna() for l in text.split('\n') if l.strip()]
+    words = np.array(' '.join(lines).split())
+    rng = np.random.default_rng(seed)
+
+    originals = rows - int(rows * DUP_RATE)
+    songs = []
+    for i in range(originals):
+        verses = [' '.join(rng.choice(words, rng.integers(3, 7))) for _ in range(rng.integers(20, 40))]
+        songs.append({'song_name': f"Song_{i}", 'movie_name': f"Movie_{i % 997}", 'lyrics': '\n'.join(verses), 'origin': i})
+    for _ in range(rows - originals):
+        src = songs[rng.integers(0, originals)]
+        kept = [l for l in src['lyrics'].split('\n') if rng.random() < 0.85]
+        songs.append({'song_name': src['song_name'].replace('Song', 'Soong'), 'movie_name': src['movie_name'],
+                      'lyrics': '\n'.join(kept), 'origin': src['origin']})
+    return pd.DataFrame(songs)
+
+def main(sizes=SIZES):
+    print(f"{'records':>9}{'seconds':>10}{'us/record':>11}{'recall':>8}{'purity':>8}")
+    for rows in sizes:
+        df = synthetic_corpus(rows)
+        start = time.perf_counter()
+        clustered = dedup.find_duplicates(df)
+        seconds = time.perf_counter() - start
+
+        # A planted copy is found when it shares its original's cluster; a
+        # cluster is pure when all its members come from one original.
+        planted = clustered.iloc[len(df) - int(rows * DUP_RATE):]
+        first = clustered.groupby('origin')['cluster'].first()
+        recall = (planted['cluster'].to_numpy() == first.loc[planted['origin']].to_numpy()).mean()
+        purity = (clustered.groupby('cluster')['origin'].nunique() == 1).mean()
+        print(f"{rows:>9}{seconds:>10.2f}{seconds * 1e6 / rows:>11.0f}{recall:>8.3f}{purity:>8.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    args = parser.parse_args()
+    main(args.sizes)
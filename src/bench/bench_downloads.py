@@ -0,0 +1,88 @@
+import argparse
+import csv
+import math
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+from bench.fixture_server import FixtureServer
+from scrape.download_manager import DownloadManager
+from utils.dataset_csv import load_dataset
+
+def write_tone(path, seconds, rate=44100, freq=440.0):
+    frames = b"".join(
+        struct.pack("<h", int(12000 * math.sin(2 * math.pi * freq * i / rate)))
+        for i in range(int(seconds * rate))
+    )
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(frames)
+
+def make_media(media_dir, count, seconds, source=None):
+    # Real files from --media exercise the FFmpeg stage; generated WAV tones
+    # only exercise fetching.
+    if source:
+        files = sorted(p for p in Path(source).iterdir() if p.is_file())
+        for i in range(count):
+            shutil.copy(files[i % len(files)], media_dir / f"song{i}{files[i % len(files)].suffix}")
+    else:
+        write_tone(media_dir / "song0.wav", seconds)
+        for i in range(1, count):
+            shutil.copy(media_dir / "song0.wav", media_dir / f"song{i}.wav")
+    return sorted(media_dir.iterdir())
+
+def write_dataset(path, media, base_url):
+    fields = ["song_name", "movie_name", "category", "Downloaded", "Vocals_Extracted", "DeReverbed", "Notes"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for i, file in enumerate(media):
+            writer.writerow({"song_name": f"Song {i}", "movie_name": "Fixture", "category": "Bench / Local",
+                             "Downloaded": "No", "Vocals_Extracted": "No", "DeReverbed": "No", "Notes": ""})
+    rows = load_dataset(path)
+    for row, file in zip(rows, media):
+        row["url"] = f"{base_url}/media/{file.name}"
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--media", help="directory of real audio files to serve instead of tones")
+    parser.add_argument("--fetch-workers", type=int, default=4)
+    parser.add_argument("--transcode-workers", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "media").mkdir()
+        media = make_media(tmp / "media", args.songs, args.seconds, args.media)
+
+        results = {}
+        with FixtureServer(latency=args.latency, media_dir=tmp / "media") as server:
+            for label, fetch, transcode in (("serial", 1, 1), ("parallel", args.fetch_workers, args.transcode_workers)):
+                dataset = tmp / f"{label}.csv"
+                rows = write_dataset(dataset, media, server.url)
+                manager = DownloadManager(tmp / label, dataset_csv=dataset, fetch_workers=fetch, transcode_workers=transcode)
+                start = time.perf_counter()
+                manager.run(rows)
+                elapsed = time.perf_counter() - start
+
+                # A second pass must find everything already done.
+                rerun = DownloadManager(tmp / label, dataset_csv=dataset)
+                rerun.run(load_dataset(dataset))
+                results[label] = (elapsed, sum(t["status"] == "done" for t in manager.timings), len(rerun.timings))
+
+    print(f"\n{'mode':<10}{'seconds':>9}{'done':>6}{'rerun':>7}")
+    for label, (elapsed, done, rerun) in results.items():
+        print(f"{label:<10}{elapsed:>9.2f}{done:>6}{rerun:>7}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
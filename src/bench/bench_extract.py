@@ -0,0 +1,53 @@
+import re
+import sys
+import time
+from pathlib import Path
+from bs4 import BeautifulSoup
+from scrape.html_extract import parse, best_block, CANDIDATE_TAGS, DROP_TAGS, MIN_TELUGU_CHARS
+
+FIXTURES = Path(__file__).parent / "fixtures" / "lyricstape"
+REPEAT = 20
+
+def legacy_block(page):
+    # The get_text()-per-candidate scan both scrapers used before html_extract.
+    soup = BeautifulSoup(page, 'html.parser')
+    for tag in soup(list(DROP_TAGS)):
+        tag.decompose()
+    best_text, max_score = "", 0
+    for elem in soup.find_all(list(CANDIDATE_TAGS)):
+        text = elem.get_text(separator='\n')
+        score = len(re.findall(r'[\u0C00-\u0C7F]', text))
+        if score > max_score:
+            max_score, best_text = score, text
+    return best_text if max_score >= MIN_TELUGU_CHARS else None
+
+def lines(text):
+    return [line.strip() for line in (text or "").split('\n') if line.strip()]
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000 / REPEAT
+
+def main():
+    pages = sorted(FIXTURES.glob("*.html"))
+    print(f"{'fixture':<24}{'KB':>6}{'bs4 parse':>11}{'bs4 total':>11}{'lxml parse':>12}{'lxml total':>12}{'speedup':>9}  match")
+
+    mismatches = 0
+    for path in pages:
+        page = path.read_bytes()
+        _, old_parse = timed(BeautifulSoup, page, 'html.parser')
+        old, old_total = timed(legacy_block, page)
+        _, new_parse = timed(parse, page)
+        new, new_total = timed(lambda p: best_block(parse(p)), page)
+
+        match = lines(old) == lines(new)
+        mismatches += not match
+        print(f"{path.stem:<24}{len(page) / 1024:>6.0f}{old_parse:>9.2f}ms{old_total:>9.2f}ms"
+              f"{new_parse:>10.2f}ms{new_total:>10.2f}ms{old_total / new_total:>8.1f}x  {'yes' if match else 'NO'}")
+
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
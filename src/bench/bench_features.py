@@ -0,0 +1,71 @@
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from bench.bench_build_corpus import legacy_build
+from data_cleaning import build_corpus, features
+
+class LongWordShare:
+    # A metric added after the corpus was tokenized, the way a plugin would be.
+    name = "long_word_share"
+
+    def compute(self, tokens):
+        final = tokens.final()
+        return features._ratio(final.sum(final.per_token("length") >= 8), final.lengths)
+
+def synthetic_corpus(songs, seed=0):
+    # Songs stitched from lines of the real lyrics, so the vocabulary grows
+    # the way a bigger scrape's would.
+    raw = build_corpus.load_raw([build_corpus.RAW_CSV])
+    lines = [l for text in raw['lyrics'].dropna() for l in str(text).splitlines() if l.strip()]
+    rng = random.Random(seed)
+    lyrics = ["\n".join(rng.choices(lines, k=rng.randint(15, 45))) for _ in range(songs)]
+    return pd.DataFrame({"song_name": [f"song_{i}" for i in range(songs)], "lyrics": lyrics})
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=20_000)
+    parser.add_argument("--legacy", action="store_true", help="also time the notebook's apply() version")
+    args = parser.parse_args()
+
+    raw = synthetic_corpus(args.songs)
+    print(f"{args.songs} songs, {raw['lyrics'].str.len().sum() / 1e6:.1f} M characters\n")
+
+    if args.legacy:
+        _, seconds = timed(lambda: legacy_build(raw))
+        print(f"{'legacy apply()':<34}{seconds:>8.2f} s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tokens.npz"
+        cache = features.TokenCache(path)
+        (cold, _, _), seconds = timed(lambda: build_corpus.build(raw, cache))
+        print(f"{'cold: tokenize + all metrics':<34}{seconds:>8.2f} s")
+        _, seconds = timed(cache.save)
+        print(f"{'save token cache':<34}{seconds:>8.2f} s  ({path.stat().st_size / 1e6:.1f} MB, {len(cache.vocab)} tokens)")
+
+        cache, seconds = timed(lambda: features.TokenCache(path))
+        print(f"{'load token cache':<34}{seconds:>8.2f} s")
+        (warm, _, _), seconds = timed(lambda: build_corpus.build(raw, cache))
+        print(f"{'warm: all metrics from cache':<34}{seconds:>8.2f} s")
+
+        keys = raw['lyrics'].map(features.lyrics_key)
+        tokens, _, _ = cache.tokens(keys, raw['lyrics'].tolist())
+        _, seconds = timed(lambda: features.compute(tokens))
+        print(f"{'  metrics alone (6 plugins)':<34}{seconds:>8.2f} s")
+        _, seconds = timed(lambda: features.compute(tokens, [LongWordShare()]))
+        print(f"{'  + one new plugin':<34}{seconds:>8.2f} s")
+
+    columns = [c for c in build_corpus.OUTPUT_COLUMNS if c not in ('song_name', 'final_lyrics')]
+    same = np.allclose(cold[columns].to_numpy(float), warm[columns].to_numpy(float))
+    print(f"\ncold == warm: {'yes' if same else 'NO'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import openpyxl
+from datasets import ingest_lyrics
+
+WORDS = ["ప్రేమ", "మనసు", "కలలు", "వెన్నెల", "గాలి", "నీవే", "పాట", "చిరు", "హృదయం", "ఆకాశం"]
+
+def write_workbook(path, rows, sheets, seed=0):
+    # Same columns as the Kaggle telugu_lyrics.xlsx. Built in normal mode, not
+    # write_only: only then does openpyxl write the <dimension> and shared
+    # strings that Excel files like the Kaggle one carry.
+    rng = random.Random(seed)
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for s in range(sheets):
+        sheet = workbook.create_sheet(f"Sheet{s + 1}")
+        sheet.append(["movie", "telugu_lyrics", "lyricist", "year"])
+        for i in range(rows // sheets):
+            lyrics = "\n".join(" ".join(rng.choices(WORDS, k=6)) for _ in range(30))
+            sheet.append([f"movie {s}-{i // 8}", lyrics, "Sirivennala Sitarama Sastry", 1990 + i % 30])
+    workbook.save(path)
+
+def child(mode, path, workers, rows, sheets):
+    # Runs in its own process so peak RSS is this mode's alone. Linux carries
+    # ru_maxrss over from the forking parent, so even building the workbook
+    # gets its own process.
+    start = time.perf_counter()
+    if mode == "write":
+        write_workbook(path, rows, sheets)
+        return
+    if mode == "pandas":
+        import pandas as pd
+        rows = sum(len(df) for df in pd.read_excel(path, sheet_name=None).values())
+        result = {"rows": rows, "seconds": time.perf_counter() - start,
+                  "peak_mb": ingest_lyrics._peak_rss_mb(), "worker_peak_mb": None}
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            stats = ingest_lyrics.run([path], Path(tmp) / "out.csv", workers=workers)
+        result = {"rows": stats["read"], "seconds": stats["seconds"],
+                  "peak_mb": stats["peak_mb"], "worker_peak_mb": stats["worker_peak_mb"]}
+    print("RESULT " + json.dumps(result))
+
+def measure(mode, path, args, workers=1):
+    out = subprocess.run([sys.executable, "-m", "bench.bench_ingest", "--child", mode, str(path), "--workers", str(workers),
+                          "--rows", str(args.rows), "--sheets", str(args.sheets)],
+                         capture_output=True, text=True, check=True).stdout
+    lines = [line for line in out.splitlines() if line.startswith("RESULT ")]
+    return json.loads(lines[0][7:]) if lines else None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=40_000)
+    parser.add_argument("--sheets", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=ingest_lyrics.WORKERS)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], args.child[1], args.workers, args.rows, args.sheets)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "lyrics.xlsx"
+        measure("write", path, args)
+        print(f"{args.rows} rows in {args.sheets} sheets, {path.stat().st_size / 1e6:.1f} MB xlsx\n")
+        print(f"{'reader':<24}{'rows':>8}{'seconds':>9}{'rows/s':>9}{'peak MB':>9}{'worker MB':>11}")
+        for mode, workers in (("pandas", 1), ("stream", 1), ("stream", args.workers)):
+            r = measure(mode, path, args, workers)
+            name = "pandas.read_excel" if mode == "pandas" else f"ingest_lyrics x{workers}"
+            worker = f"{r['worker_peak_mb']:>11.0f}" if r["worker_peak_mb"] and workers > 1 else f"{'-':>11}"
+            print(f"{name:<24}{r['rows']:>8}{r['seconds']:>9.2f}{r['rows'] / r['seconds']:>9.0f}{r['peak_mb']:>9.0f}{worker}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
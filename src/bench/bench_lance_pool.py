@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import tempfile
+import time
+import lancedb
+import numpy as np
+import pyarrow as pa
+from lancedb.index import IvfPq
+from utils.database import lance_db
+
+ROWS = 20000
+DIM = 128
+QUERIES = 300
+TABLE = "bench_vectors"
+
+def make_table(uri, rows=ROWS, dim=DIM, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((rows, dim)).astype(np.float32)
+    table = pa.table({
+        'song_name': [f"song_{i}" for i in range(rows)],
+        'vector': pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), dim),
+    })
+    table = lancedb.connect(uri).create_table(TABLE, data=table, mode="overwrite")
+    table.create_index('vector', config=IvfPq(distance_type='cosine', num_partitions=64, num_sub_vectors=dim // 8))
+
+def legacy_lookup(uri, vector):
+    # What get_lance_table did before: a fresh connect + open_table per call.
+    table = lancedb.connect(uri).open_table(TABLE)
+    return table.search(vector).distance_type("cosine").limit(10).select(['song_name', '_distance']).to_pandas()
+
+def cached_lookup(uri, vector):
+    table = lance_db.get_lance_table(TABLE, uri)
+    return table.search(vector).distance_type("cosine").limit(10).select(['song_name', '_distance']).to_pandas()
+
+def run_sync(label, fn, uri, vectors):
+    start = time.perf_counter()
+    for vector in vectors:
+        fn(uri, vector)
+    report(label, time.perf_counter() - start, len(vectors))
+
+async def run_async(label, uri, vectors, concurrency):
+    client = lance_db.AsyncLance(uri, concurrency)
+    await client.table(TABLE)
+    start = time.perf_counter()
+    await client.search_many(TABLE, vectors, 10, columns=['song_name'])
+    report(label, time.perf_counter() - start, len(vectors))
+    client.close()
+
+def report(label, seconds, n):
+    print(f"{label:<28}{seconds * 1000 / n:>8.2f} ms/query{n / seconds:>9.0f} q/s")
+
+def main(queries=QUERIES):
+    with tempfile.TemporaryDirectory() as uri:
+        make_table(uri)
+        vectors = np.random.default_rng(1).standard_normal((queries, DIM)).astype(np.float32)
+        print(f"{ROWS} rows x {DIM} dims, {queries} queries\n")
+        run_sync("connect + open per call", legacy_lookup, uri, vectors)
+        run_sync("cached handle", cached_lookup, uri, vectors)
+        for concurrency in (1, 4, 16):
+            asyncio.run(run_async(f"async, concurrency {concurrency}", uri, vectors, concurrency))
+        lance_db.forget(uri)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=QUERIES)
+    args = parser.parse_args()
+    main(args.queries)
@@ -0,0 +1,72 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from utils import corpus_store
+from utils.database.lyrics_index import LyricsIndex, TEXT_COLUMN
+
+SCALE_ROWS = 20000
+QUERIES = 200
+K = 10
+
+def scaled_corpus(rows, seed=0):
+    # The real corpus is under a thousand songs, too few for IVF-PQ to matter;
+    # pad it with variants keeping a random ~70% of each song's lines (order
+    # alone wouldn't do: the hashing embedder ignores it).
+    raw = corpus_store.with_metrics(corpus_store.from_extracted_csv(corpus_store.RAW_CSV))
+    base = raw.filter(raw.column(TEXT_COLUMN).is_valid()).to_pandas()
+    rng = np.random.default_rng(seed)
+    frames = [base]
+    copy = 0
+    while sum(map(len, frames)) < rows:
+        copy += 1
+        variant = base.copy()
+        variant['song_name'] = variant['song_name'] + f"~{copy}"
+        variant[TEXT_COLUMN] = [
+            '\n'.join(line for line in text.split('\n') if rng.random() < 0.7) for text in variant[TEXT_COLUMN]
+        ]
+        frames.append(variant)
+    return pd.concat(frames, ignore_index=True).iloc[:rows]
+
+def timed_queries(index, vectors, **kwargs):
+    results, latencies = [], []
+    for vector in vectors:
+        start = time.perf_counter()
+        results.append(index.search_vector(vector, K, **kwargs)['song_name'].tolist())
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, np.array(latencies)
+
+def main(rows=SCALE_ROWS, queries=QUERIES):
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = scaled_corpus(rows)
+        path = corpus_store.write_corpus(corpus, Path(tmp) / "corpus.arrow")
+        index = LyricsIndex.connect(str(Path(tmp) / "lancedb"))
+
+        start = time.perf_counter()
+        count = index.ingest(path)
+        print(f"ingest: {count} songs in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        built = index.build_index()
+        print(f"IVF-PQ build: {time.perf_counter() - start:.1f}s" if built else "index skipped (too few rows)")
+
+        rng = np.random.default_rng(1)
+        sample = corpus[TEXT_COLUMN].iloc[rng.choice(len(corpus), queries, replace=False)].tolist()
+        vectors = index.embedder.embed(sample)
+
+        exact, exact_ms = timed_queries(index, vectors, exact=True)
+        print(f"\n{'search':<24}{'p50':>8}{'p99':>8}{'recall@' + str(K):>11}")
+        print(f"{'brute force':<24}{np.percentile(exact_ms, 50):>6.1f}ms{np.percentile(exact_ms, 99):>6.1f}ms{1.0:>11.3f}")
+        for nprobes, refine in ((10, 1), (20, 5), (40, 10)):
+            approx, ms = timed_queries(index, vectors, nprobes=nprobes, refine_factor=refine)
+            recall = np.mean([len(set(a) & set(e)) / K for a, e in zip(approx, exact)])
+            label = f"ivf-pq n={nprobes} r={refine}"
+            print(f"{label:<24}{np.percentile(ms, 50):>6.1f}ms{np.percentile(ms, 99):>6.1f}ms{recall:>11.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=SCALE_ROWS)
+    parser.add_argument("--queries", type=int, default=QUERIES)
+    args = parser.parse_args()
+    main(args.rows, args.queries)
@@ -0,0 +1,56 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+from scrape.lyrics_extraction import LyricstapeSerperScraper
+from scrape.metrics import Metrics, NULL_METRICS
+
+FIXTURES = Path(__file__).parent / "fixtures" / "lyricstape"
+CALLS = 200_000
+REPEAT = 20
+
+def ns_per_call(fn, calls=CALLS):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) * 1e9 / calls
+
+def timer_cost(metrics):
+    def once():
+        with metrics.timer("stage", kind="page"):
+            pass
+    return ns_per_call(once)
+
+def extract_ms(scraper, pages):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for page in pages:
+            scraper.extract_lyrics(page)
+    return (time.perf_counter() - start) * 1000 / (REPEAT * len(pages))
+
+def main():
+    enabled = Metrics("bench")
+    print(f"{'per call':<22}{'disabled':>12}{'enabled':>12}")
+    print(f"{'empty loop':<22}{ns_per_call(lambda: None):>10.0f}ns")
+    print(f"{'timer()':<22}{timer_cost(NULL_METRICS):>10.0f}ns{timer_cost(enabled):>10.0f}ns")
+    print(f"{'inc()':<22}{ns_per_call(lambda: NULL_METRICS.inc('songs', outcome='found')):>10.0f}ns"
+          f"{ns_per_call(lambda: enabled.inc('songs', outcome='found')):>10.0f}ns")
+
+    # The same scraper path the instrumentation wraps, on the fixture pages.
+    pages = [p.read_bytes() for p in sorted(FIXTURES.glob("*.html"))]
+    scraper = LyricstapeSerperScraper(api_key=None)
+    extract_ms(scraper, pages)
+    plain = extract_ms(scraper, pages)
+    scraper.metrics = Metrics("lyricstape_serper")
+    instrumented = extract_ms(scraper, pages)
+    print(f"\nextract_lyrics on {len(pages)} fixture pages: {plain:.3f} ms disabled, {instrumented:.3f} ms enabled "
+          f"({(instrumented / plain - 1) * 100:+.1f}%)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prom, report = scraper.metrics.write(tmp)
+        print(f"{prom.name}: {len(prom.read_text().splitlines())} lines, {report.name}: {report.stat().st_size} bytes")
+    print(scraper.metrics.summary())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
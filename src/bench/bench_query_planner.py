@@ -0,0 +1,76 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from bench.fixture_server import FixtureServer
+from scrape import lyrics_extraction, sink as sinks
+from scrape.query_planner import SearchIndex, BATCH_SIZE
+
+SONGS_JSON = Path(__file__).parent / "fixtures" / "jiosaavn" / "artist_songs.json"
+
+def write_songs(path, songs):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["song_name", "movie_album", "singers"])
+        writer.writeheader()
+        writer.writerows(songs)
+
+def run(server, csv_file, root, index_path, args):
+    # One scraper run against the fixture server; returns what it cost there.
+    search_index = SearchIndex(index_path) if index_path else None
+    sink = sinks.open_sink("jsonl", "bench", root / "shards")
+    scraper = lyrics_extraction.LyricstapeSerperScraper(
+        "bench", workers=args.workers, search_url=server.serper_url, sink=sink,
+        search_index=search_index, batch_size=args.batch_size)
+    requests, queries = server.serper_requests, server.serper_queries
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = scraper.run(csv_file)
+    seconds = time.perf_counter() - start
+    if search_index:
+        search_index.close()
+    return {"found": stats["found"], "songs": stats["found"] + stats["missing"], "seconds": seconds,
+            "requests": server.serper_requests - requests, "queries": server.serper_queries - queries}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=240, help="songs from the JioSaavn fixture (240 at most)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per fixture server request")
+    args = parser.parse_args()
+
+    songs = json.loads(SONGS_JSON.read_text(encoding="utf-8"))[:args.songs]
+    movies = len({s["movie_album"] for s in songs})
+    print(f"{len(songs)} songs from {movies} movies, {args.workers} workers, batches of {args.batch_size}\n")
+    print(f"{'search':<22}{'found':>7}{'POSTs':>7}{'queries':>9}{'seconds':>9}")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer(latency=args.latency, catalog=songs) as server:
+        # The scraper creates its txt output folder in the cwd.
+        os.chdir(tmp)
+        try:
+            csv_file = Path(tmp) / "songs.csv"
+            write_songs(csv_file, songs)
+            index = Path(tmp) / "serper_index.sqlite"
+            results = {}
+            for name, index_path in (("one per song", None), ("planner, cold index", index), ("planner, warm index", index)):
+                r = results[name] = run(server, csv_file, Path(tmp) / name.replace(" ", "_"), index_path, args)
+                print(f"{name:<22}{r['found']:>7}{r['requests']:>7}{r['queries']:>9}{r['seconds']:>9.2f}")
+        finally:
+            os.chdir(cwd)
+
+    base, cold = results["one per song"], results["planner, cold index"]
+    print(f"\nsaved on a cold index: {base['requests'] - cold['requests']} API calls, "
+          f"{base['queries'] - cold['queries']} billed queries")
+    same = len({r["found"] for r in results.values()}) == 1
+    print(f"same songs found: {'yes' if same else 'NO'}")
+    return 0 if same else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
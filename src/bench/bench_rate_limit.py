@@ -0,0 +1,70 @@
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from bench.fixture_server import FixtureServer
+from bench.bench_scrapers import write_songs
+from scrape.lyrics_extraction import LyricstapeSerperScraper
+from scrape.rate_limit import HostRateLimiter
+
+class FixedLimiter(HostRateLimiter):
+    # The limiter as it was: a fixed per-host pace that ignores responses.
+    def feedback(self, url, status=200, latency=None, retry_after=None):
+        pass
+
+def legacy(server, songs, out):
+    # The old serial loop: one song, then a fixed one-second sleep.
+    scraper = LyricstapeSerperScraper("bench", search_url=server.serper_url)
+    scraper.output_dir = out
+    scraper.limiter = None
+    found = 0
+    for row in songs:
+        found += scraper.process_song(row['song_name'], row['movie_album']).found
+        time.sleep(1.0)
+    return found
+
+def pooled(server, songs, out, workers, limiter):
+    scraper = LyricstapeSerperScraper("bench", workers=workers, search_url=server.serper_url)
+    scraper.output_dir = out
+    scraper.limiter = limiter
+    found = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(lambda row: scraper.process_song(row['song_name'], row['movie_album']), songs):
+            found += result.found
+    return found
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--rates", default="20,3", help="server capacities to test, requests/s")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = Path(tmp) / "songs.csv"
+        write_songs(csv_file, args.songs)
+        with open(csv_file, newline="", encoding="utf-8") as f:
+            songs = list(csv.DictReader(f))
+
+        print(f"{args.songs} songs, 2 requests each, {args.workers} workers where pooled\n")
+        print(f"{'server cap':<12}{'strategy':<24}{'songs/s':>9}{'found':>7}{'429s':>7}{'requests':>10}")
+        for rate in map(float, args.rates.split(",")):
+            strategies = [
+                ("serial + 1 s sleep", lambda s, o: legacy(s, songs, o)),
+                ("fixed 0.2 s / host", lambda s, o: pooled(s, songs, o, args.workers, FixedLimiter())),
+                ("adaptive (AIMD)", lambda s, o: pooled(s, songs, o, args.workers, HostRateLimiter())),
+            ]
+            for name, run in strategies:
+                with FixtureServer(args.latency, max_rate=rate) as server:
+                    start = time.perf_counter()
+                    found = run(server, Path(tmp) / "out")
+                    seconds = time.perf_counter() - start
+                print(f"{rate:>6.0f} /s    {name:<24}{args.songs / seconds:>9.2f}{found:>7}{server.rejected:>7}{server.requests:>10}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
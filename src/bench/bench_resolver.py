@@ -0,0 +1,91 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from scrape.resolver import Backend, LyricsResolver
+
+SONGS = 200
+LYRICS = "తెలుగు పాట సాహిత్యం " * 10
+SEED = 7
+
+class FakeBackend(Backend):
+    # Latency drawn from a lognormal with a heavy tail; finds lyrics with
+    # probability hit_rate. Sleeps in small steps so cancellation is seen.
+    def __init__(self, name, median, sigma, hit_rate, cost=0.0, timeout=5.0, start_after=0.0):
+        super().__init__(cost, timeout, start_after)
+        self.name = name
+        self.median = median
+        self.sigma = sigma
+        self.hit_rate = hit_rate
+        self.rng = random.Random(f"{SEED}-{name}")
+        self.work = 0.0
+
+    def resolve(self, song, movie, cancelled):
+        delay = self.median * self.rng.lognormvariate(0, self.sigma)
+        hit = self.rng.random() < self.hit_rate
+        end = time.monotonic() + delay
+        start = time.monotonic()
+        try:
+            while time.monotonic() < end:
+                self.check(cancelled)
+                time.sleep(0.005)
+        finally:
+            self.work += time.monotonic() - start
+        return (True, LYRICS, f"https://example.invalid/{self.name}/{song}") if hit else (False, "", "")
+
+def backends(serper_delay=0.0):
+    return [
+        FakeBackend("serper", median=0.08, sigma=0.8, hit_rate=0.8, cost=1.0, start_after=serper_delay),
+        FakeBackend("stealth", median=0.15, sigma=0.5, hit_rate=0.85),
+    ]
+
+def run(label, chosen, max_cost=None):
+    rows = [{'song_name': f"song {i}", 'movie_album': "movie"} for i in range(SONGS)]
+    resolver = LyricsResolver(chosen, max_cost=max_cost, song_workers=16)
+    start = time.perf_counter()
+    results = list(resolver.resolve_many(rows))
+    wall = time.perf_counter() - start
+    resolver.close()
+    seconds = np.array([r.seconds for r in results])
+    found = sum(r.found for r in results)
+    work = sum(b.work for b in chosen)
+    print(f"{label:<28}{found:>6}{np.percentile(seconds, 50):>8.3f}{np.percentile(seconds, 99):>8.3f}"
+          f"{wall:>8.2f}{resolver.spent:>9g}{work:>9.1f}")
+
+def run_sequential():
+    # The fallback the scrapers imply: serper first, stealth only on a miss.
+    chosen = backends()
+    rows = [f"song {i}" for i in range(SONGS)]
+    never = threading.Event()
+
+    def one(song):
+        start = time.monotonic()
+        for backend in chosen:
+            found, _, _ = backend.resolve(song, "movie", never)
+            if found:
+                break
+        return found, time.monotonic() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(one, rows))
+    wall = time.perf_counter() - start
+    seconds = np.array([s for _, s in results])
+    found = sum(f for f, _ in results)
+    work = sum(b.work for b in chosen)
+    print(f"{'sequential fallback':<28}{found:>6}{np.percentile(seconds, 50):>8.3f}{np.percentile(seconds, 99):>8.3f}"
+          f"{wall:>8.2f}{SONGS:>9g}{work:>9.1f}")
+
+def main():
+    print(f"{SONGS} songs, 16 at a time (seconds; work = backend time incl. losers)")
+    print(f"{'strategy':<28}{'found':>6}{'p50':>8}{'p99':>8}{'wall':>8}{'credits':>9}{'work':>9}")
+    run_sequential()
+    run("serper only", backends()[:1])
+    run("stealth only", backends()[1:])
+    run("fan-out", backends())
+    run("fan-out, serper hedged 0.2s", backends(serper_delay=0.2))
+    run("fan-out, 50 credit budget", backends(), max_cost=50)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import csv
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from bench.fixture_server import FixtureServer
+
+SRC = Path(__file__).resolve().parents[1]
+SONGS_JSON = Path(__file__).parent / "fixtures" / "jiosaavn" / "artist_songs.json"
+SCENARIOS = "serper:1,serper:8,stealth:1,stealth:4,jiosaavn"
+TOLERANCE = 0.2
+
+# Each scenario runs in its own process so peak RSS is that scraper's alone;
+# the fixture server stays in this one. Chrome's own processes aren't counted.
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+
+def timed_method(obj, name, latencies):
+    # Wraps obj.name so every call's wall time lands in `latencies`.
+    original = getattr(obj, name)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    setattr(obj, name, wrapper)
+
+def run_serper(args, workers, out):
+    from scrape import lyrics_extraction
+    from scrape.rate_limit import HostRateLimiter, MIN_INTERVAL
+    scraper = lyrics_extraction.LyricstapeSerperScraper("bench", workers=workers, search_url=args.server + "/serper/search")
+    scraper.output_dir = out
+    scraper.limiter = HostRateLimiter(interval=args.host_interval, min_interval=min(args.host_interval, MIN_INTERVAL))
+    latencies = []
+    timed_method(scraper, "process_song", latencies)
+    start = time.perf_counter()
+    stats = scraper.run(args.csv)
+    return time.perf_counter() - start, stats["found"] + stats["missing"], stats["found"], latencies
+
+def run_stealth(args, workers, out):
+    from scrape import lyrics_extractionV2
+    from scrape.rate_limit import HostRateLimiter, MIN_INTERVAL
+    lyrics_extractionV2.HEADLESS = True
+    scraper = lyrics_extractionV2.StealthDeepScraper(workers=workers, search_url=args.server + "/search?q={query}")
+    scraper.output_dir = out
+    scraper.limiter = HostRateLimiter(interval=args.host_interval, min_interval=min(args.host_interval, MIN_INTERVAL))
+    latencies = []
+    timed_method(scraper, "_process", latencies)
+    start = time.perf_counter()
+    stats = scraper.run(args.csv)
+    if stats["found"] + stats["missing"] and not latencies:
+        raise RuntimeError("no browser could be started (is Chrome installed?)")
+    return time.perf_counter() - start, stats["found"] + stats["missing"], stats["found"], latencies
+
+def run_jiosaavn(args, workers, out):
+    # Songs come from the artist page itself; latency is per "Load more" page.
+    from scrape import selenium_scrapper
+    latencies = []
+    timed_method(selenium_scrapper, "load_more", latencies)
+    output = out / "songs.csv"
+    start = time.perf_counter()
+    selenium_scrapper.main(args.server + "/artist/sirivennela-seetharama-sastry-songs/u-vLZvgDCPM_", str(output))
+    seconds = time.perf_counter() - start
+    with open(output, newline="", encoding="utf-8") as f:
+        songs = sum(1 for _ in csv.DictReader(f))
+    return seconds, songs, songs, latencies
+
+RUNNERS = {"serper": run_serper, "stealth": run_stealth, "jiosaavn": run_jiosaavn}
+
+def child(args):
+    name, _, workers = args.child.partition(":")
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    seconds, songs, found, latencies = RUNNERS[name](args, int(workers or 1), out)
+    latencies = np.array(latencies) if latencies else np.zeros(1)
+    result = {
+        "songs": songs, "found": found, "seconds": round(seconds, 3),
+        "songs_per_s": round(songs / seconds, 3) if seconds else 0.0,
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    print("RESULT " + json.dumps(result))
+
+def write_songs(path, count):
+    songs = json.loads(SONGS_JSON.read_text(encoding="utf-8"))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["song_name", "movie_album", "singers"])
+        writer.writeheader()
+        for i in range(count):
+            song = dict(songs[i % len(songs)])
+            if i >= len(songs):
+                song["song_name"] += f" ({i // len(songs)})"
+            writer.writerow(song)
+
+# The exception line of a traceback. A failed child's last stderr line is
+# often log noise printed on the way out (undetected_chromedriver's
+# "ensuring close"), not the error.
+ERROR_RE = re.compile(r'^\w+(\.\w+)*(Error|Exception)\b')
+
+def error_line(text, returncode):
+    lines = text.strip().splitlines()
+    for line in reversed(lines):
+        if ERROR_RE.match(line):
+            return line
+    return lines[-1] if lines else f"exit code {returncode}"
+
+def run_scenario(scenario, args, server, csv_file, tmp):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(SRC), os.environ.get("PYTHONPATH")])))
+    out = Path(tmp) / scenario.replace(":", "_")
+    cmd = [sys.executable, "-m", "bench.bench_scrapers", "--child", scenario,
+           "--server", server.url, "--csv", str(csv_file), "--out", str(out),
+           "--host-interval", str(args.host_interval)]
+    # Scrapers write stray output dirs relative to the cwd; keep them in tmp.
+    proc = subprocess.run(cmd, cwd=out.parent, env=env, capture_output=True, text=True, encoding="utf-8")
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    log = proc.stderr or proc.stdout
+    return {"error": error_line(log, proc.returncode), "stderr": log}
+
+def compare(results, baseline, tolerance):
+    # A scenario regresses if throughput drops or p99 grows by more than
+    # `tolerance` against the saved run.
+    regressions = []
+    for scenario, now in results.items():
+        then = baseline.get(scenario)
+        if not then or "error" in now or "error" in then:
+            continue
+        if now["songs_per_s"] < then["songs_per_s"] * (1 - tolerance):
+            regressions.append(f"{scenario}: {then['songs_per_s']} -> {now['songs_per_s']} songs/s")
+        if now["p99_ms"] > then["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{scenario}: p99 {then['p99_ms']} -> {now['p99_ms']} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the scrapers end to end against local recorded fixtures")
+    parser.add_argument("--scenarios", default=SCENARIOS, help="comma-separated scraper:workers")
+    parser.add_argument("--songs", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.05, help="per-request server latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="lognormal sigma applied to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 503")
+    parser.add_argument("--seed", type=int, default=0)
+    # All fixture traffic is one host, so the production limiter would time
+    # the politeness delay rather than the code.
+    parser.add_argument("--host-interval", type=float, default=0.0, help="per-host rate limit in seconds (default 0 = off)")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON from --save; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--server", help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer(args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed) as server:
+        csv_file = Path(tmp) / "songs.csv"
+        write_songs(csv_file, args.songs)
+        print(f"{args.songs} songs | latency {args.latency * 1000:.0f} ms (sigma {args.jitter}) | error rate {args.error_rate:.0%}\n")
+        print(f"{'scenario':<14}{'songs':>7}{'found':>7}{'songs/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'peak RSS':>10}")
+        for scenario in args.scenarios.split(","):
+            result = results[scenario] = run_scenario(scenario, args, server, csv_file, tmp)
+            if "error" in result:
+                print(f"{scenario:<14}  failed: {result['error'][:80]}")
+                continue
+            print(f"{scenario:<14}{result['songs']:>7}{result['found']:>7}{result['songs_per_s']:>9.2f}"
+                  f"{result['p50_ms']:>9.0f}{result['p99_ms']:>9.0f}{result['peak_rss_mb']:>8.0f}MB")
+        print(f"\nserver: {server.requests} requests, {server.errors} injected errors")
+
+    if args.save:
+        # A failed scenario's full stderr goes in a file beside the results.
+        save = Path(args.save)
+        for scenario, result in results.items():
+            log = result.pop("stderr", None)
+            if log:
+                path = save.with_name(f"{save.stem}.{scenario.replace(':', '_')}.stderr.txt")
+                path.write_text(log, encoding="utf-8")
+                result["stderr_file"] = str(path)
+        save.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8")), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from scrape import sink as sinks
+
+def make_records(count, seed=0):
+    # Song-sized lyrics (a few KB of Telugu) spread over a realistic number of
+    # movies, so the txt layout creates folders as well as files.
+    rng = random.Random(seed)
+    words = ["ప్రేమ", "మనసు", "కలలు", "వెన్నెల", "గాలి", "నీవే", "పాట", "చిరు", "హృదయం", "ఆకాశం"]
+    return [
+        sinks.record(f"Song {i}", f"Movie {i // 8}",
+                     "\n".join(" ".join(rng.choices(words, k=6)) for _ in range(40)),
+                     "bench", f"https://lyricstape.com/song-{i}", "bench")
+        for i in range(count)
+    ]
+
+def count_files(root):
+    return sum(len(files) for _, _, files in os.walk(root))
+
+def run(kind, records, root):
+    done = []
+    start = time.perf_counter()
+    with sinks.open_sink(kind, "bench", root / "shards", txt_root=root / "txt") as sink:
+        for rec in records:
+            sink.write(rec, done.append)
+    seconds = time.perf_counter() - start
+    # Every record has to be reported durable by close().
+    assert len(done) == len(records), f"{kind}: {len(done)}/{len(records)} durable"
+    return seconds
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=5000)
+    args = parser.parse_args()
+
+    records = make_records(args.songs)
+    print(f"{args.songs} songs\n")
+    print(f"{'sink':<10}{'seconds':>9}{'songs/s':>10}{'files':>8}{'size KB':>10}{'read s':>8}")
+    for kind in sinks.SINKS:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            seconds = run(kind, records, root)
+            size = sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+            start = time.perf_counter()
+            if kind == "txt":
+                from utils.corpus_store import from_txt_tree
+                rows = from_txt_tree(root / "txt").num_rows
+            else:
+                rows = len(sinks.read_shards([root / "shards"]))
+            read = time.perf_counter() - start
+            assert rows == args.songs, f"{kind}: read back {rows} rows"
+            print(f"{kind:<10}{seconds:>9.2f}{args.songs / seconds:>10.0f}{count_files(root):>8}{size / 1024:>10.0f}{read:>8.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import re
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+from utils import telugu_text
+
+CORPUS = "rawdata/extracted_data.csv"
+FIXTURES = Path(__file__).parent / "fixtures" / "lyricstape"
+REPEAT = 5
+
+# Verbatim copies of the scraper methods telugu_text replaced, kept here as
+# the reference the new module must agree with.
+def legacy_is_telugu(text):
+    return bool(re.search(r'[\u0C00-\u0C7F]', text))
+
+def legacy_count_telugu_chars(text):
+    return len(re.findall(r'[\u0C00-\u0C7F]', text))
+
+def legacy_clean_serper(text):
+    if not text: return ""
+    lines = [line.strip() for line in text.split('\n')]
+    cleaned = []
+    for line in lines:
+        if not line: continue
+        low = line.lower()
+        if any(x in low for x in ['home', 'movie', 'review', 'rating', 'whatsapp', 'share', 'tweet', 'pin it']):
+            continue
+        if legacy_is_telugu(line):
+            cleaned.append(line)
+    return '\n'.join(cleaned)
+
+def legacy_clean_stealth(text):
+    if not text: return ""
+    lines = [line.strip() for line in text.split('\n')]
+    cleaned = []
+    for line in lines:
+        if not line: continue
+        low = line.lower()
+        if any(x in low for x in ['share', 'comment', 'whatsapp', 'search', 'home', 'click here', 'advertisement']):
+            continue
+        cleaned.append(line)
+    return '\n'.join(cleaned)
+
+def load_texts():
+    lyrics = pd.read_csv(CORPUS, index_col=0)['lyrics'].fillna('').astype(str).tolist()
+    pages = [re.sub(r'<[^>]+>', '\n', p.read_text(encoding='utf-8')) for p in sorted(FIXTURES.glob("*.html"))]
+    return lyrics + pages
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = fn()
+    return result, (time.perf_counter() - start) * 1000 / REPEAT
+
+def main():
+    texts = load_texts()
+    series = pd.Series(texts)
+    print(f"{len(texts)} texts, {sum(map(len, texts)) / 1024:.0f} KB\n")
+    print(f"{'function':<22}{'legacy':>10}{'new':>10}{'batch':>10}{'speedup':>9}  match")
+
+    cases = [
+        ("is_telugu", legacy_is_telugu, telugu_text.is_telugu,
+         lambda: telugu_text.is_telugu_batch(series).tolist()),
+        ("count_telugu_chars", legacy_count_telugu_chars, telugu_text.count_telugu_chars,
+         lambda: telugu_text.count_telugu_chars_batch(series).tolist()),
+        ("clean_text (serper)", legacy_clean_serper,
+         lambda t: telugu_text.clean_text(t, telugu_text.SERPER_BLOCKLIST, telugu_only=True),
+         lambda: telugu_text.clean_text_batch(series, telugu_text.SERPER_BLOCKLIST, True).tolist()),
+        ("clean_text (stealth)", legacy_clean_stealth,
+         lambda t: telugu_text.clean_text(t, telugu_text.STEALTH_BLOCKLIST, telugu_only=False),
+         lambda: telugu_text.clean_text_batch(series, telugu_text.STEALTH_BLOCKLIST, False).tolist()),
+    ]
+
+    mismatches = 0
+    for name, old_fn, new_fn, batch_fn in cases:
+        old, old_ms = timed(lambda: [old_fn(t) for t in texts])
+        new, new_ms = timed(lambda: [new_fn(t) for t in texts])
+        batch, batch_ms = timed(batch_fn)
+        match = old == new == batch
+        mismatches += not match
+        print(f"{name:<22}{old_ms:>8.1f}ms{new_ms:>8.1f}ms{batch_ms:>8.1f}ms{old_ms / new_ms:>8.1f}x  {'yes' if match else 'NO'}")
+
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import csv
+import difflib
+import time
+from scrape.title_index import TitleIndex, title_key
+
+SONGS_CSV = "rawdata/sirivennela_songs.csv"
+REPEAT = 5
+
+def per_lookup_us(fn, rows, repeat=REPEAT):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for row in rows:
+            fn(row)
+    return (time.perf_counter() - start) * 1e6 / (repeat * max(len(rows), 1))
+
+def main():
+    start = time.perf_counter()
+    index = TitleIndex.from_local()
+    print(f"built from local sources: {len(index)} titles in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    with open(SONGS_CSV, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    lookup = lambda row: index.lookup(row['song_name'], row['movie_album'])
+    missing = index.missing(rows)
+    held = [row for row in rows if lookup(row)]
+    print(f"{SONGS_CSV}: {len(held)} of {len(rows)} already held -> {len(held)} searches skipped\n")
+
+    # The obvious alternative: fuzzy-compare against every title in turn.
+    titles = [entry[0] for entry in index.entries]
+    def linear(row):
+        key = title_key(row['song_name'])
+        return max((difflib.SequenceMatcher(None, key, t).ratio() for t in titles), default=0)
+
+    print(f"{'lookup':<24}{'held':>10}{'missing':>10}")
+    print(f"{'title index':<24}{per_lookup_us(lookup, held):>8.1f}us{per_lookup_us(lookup, missing):>8.1f}us")
+    sample_held, sample_missing = held[:20], missing[:20]
+    print(f"{'difflib linear scan':<24}{per_lookup_us(linear, sample_held, 1):>8.0f}us{per_lookup_us(linear, sample_missing, 1):>8.0f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, quote
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SAAVN_PAGE_SIZE = 20
+ARTIST_PATH = "/artist/sirivennela-seetharama-sastry-songs/u-vLZvgDCPM_"
+
+# The parts of a JioSaavn artist page selenium_scrapper reads: song rows with
+# /song/, /album/ and /artist/ links, and a "Load more" button that fetches the
+# next page of rows from the server.
+SAAVN_TEMPLATE = """<!DOCTYPE html><html><body>
+<div class="modal">Login to JioSaavn</div>
+<section id="songs">{rows}</section>
+<button class="c-btn c-btn--primary" id="more">Load more</button>
+<script>
+let page = 1;
+document.getElementById('more').addEventListener('click', async () => {{
+  const response = await fetch('/api/artist/songs?p=' + page);
+  if (!response.ok) return;
+  const data = await response.json();
+  document.getElementById('songs').insertAdjacentHTML('beforeend', data.html);
+  page += 1;
+  if (!data.more) document.getElementById('more').remove();
+}});
+</script></body></html>"""
+
+class FixtureServer:
+    # Local stand-in for the sites the scrapers talk to. Pages are served from
+    # fixtures/; lyrics links keep "lyricstape.com" in their path so the
+    # scrapers' host checks still pass against 127.0.0.1.
+    #
+    # Every request waits `latency` seconds, stretched by a lognormal factor
+    # when `jitter` (its sigma) is set, and fails with a 503 with probability
+    # `error_rate`. The seed makes a run's delays and failures repeatable.
+    # With max_rate set, requests beyond that many per second get a 429 and a
+    # Retry-After, as a rate-limited API would answer.
+    #
+    # Given a catalog of songs ({song_name, movie_album} rows), Serper answers
+    # a query naming a movie with a result per song of that movie, titled the
+    # way lyricstape titles its pages.
+    def __init__(self, latency=0.0, port=0, media_dir=None, jitter=0.0, error_rate=0.0, seed=0, max_rate=None, catalog=()):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_rate = max_rate
+        self.rejected = 0
+        self._tokens = max_rate or 0
+        self._refilled = time.monotonic()
+        self.media_dir = Path(media_dir) if media_dir else None
+        self.requests = 0
+        self.errors = 0
+        self.pages = sorted(p.name for p in (FIXTURES / "lyricstape").glob("*.html"))
+        self.serper = json.loads((FIXTURES / "serper" / "search.json").read_text(encoding="utf-8"))
+        self.saavn_songs = json.loads((FIXTURES / "jiosaavn" / "artist_songs.json").read_text(encoding="utf-8"))
+        self.catalog = {}
+        for row in catalog:
+            self.catalog.setdefault(row["movie_album"], []).append(row["song_name"])
+        self.serper_requests = 0
+        self.serper_queries = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self):
+        return self.url + "/search?q={query}"
+
+    @property
+    def serper_url(self):
+        return self.url + "/serper/search"
+
+    @property
+    def artist_url(self):
+        return self.url + ARTIST_PATH
+
+    def page_for(self, query):
+        digest = hashlib.sha1(query.encode("utf-8")).digest()
+        return self.pages[digest[0] % len(self.pages)]
+
+    def search_page(self, query):
+        first = self.page_for(query)
+        links = [first] + [p for p in self.pages if p != first]
+        items = "\n".join(
+            f'<li data-layout="organic"><article><h2><a href="{self.url}/lyricstape.com/{name}">'
+            f'{escape(query)}</a></h2></article></li>'
+            for name in links
+        )
+        return f"<!DOCTYPE html><html><body><ol class=\"react-results--main\">{items}</ol></body></html>"
+
+    def serper_response(self, payload):
+        # The recorded response with its links pointed at the local pages.
+        query = payload.get("q", "")
+        first = self.page_for(query)
+        links = [first] + [p for p in self.pages if p != first]
+        organic = [
+            dict(item, link=f"{self.url}/lyricstape.com/{name}")
+            for item, name in zip(self.serper["organic"], links)
+        ]
+        # Queries end "<movie> lyrics", whether or not they name a song.
+        movie = max((m for m in self.catalog if query.endswith(f" {m} lyrics")), key=len, default=None)
+        if movie:
+            # A song named in the query ranks first, then the rest of its movie.
+            songs = sorted(self.catalog[movie], key=lambda song: f" {song} " not in query)
+            organic = [
+                {"title": f"{song} Song Lyrics In Telugu - {movie}",
+                 "link": f"{self.url}/lyricstape.com/{self.page_for(song)}?song={quote(song)}",
+                 "snippet": f"{song} Song Lyrics from {movie} movie."}
+                for song in songs
+            ] + organic
+        organic = [dict(item, position=i + 1) for i, item in enumerate(organic[:payload.get("num", 10)])]
+        with self._lock:
+            self.serper_queries += 1
+        return dict(self.serper, searchParameters=dict(self.serper["searchParameters"], q=query), organic=organic)
+
+    def saavn_rows(self, page):
+        rows = self.saavn_songs[page * SAAVN_PAGE_SIZE:(page + 1) * SAAVN_PAGE_SIZE]
+        return "\n".join(
+            f'<article class="o-snippet"><a href="/song/{escape(s["song_name"])}">{escape(s["song_name"])}</a>'
+            f'<a href="/album/{escape(s["movie_album"])}">{escape(s["movie_album"])}</a>'
+            + "".join(f'<a href="/artist/{escape(a)}">{escape(a)}</a>' for a in s["singers"].split(", ") if a)
+            + '</article>'
+            for s in rows
+        )
+
+    def _admit(self):
+        # Token bucket holding one second's worth of requests.
+        now = time.monotonic()
+        self._tokens = min(self.max_rate, self._tokens + (now - self._refilled) * self.max_rate)
+        self._refilled = now
+        if self._tokens < 1:
+            self.rejected += 1
+            return False
+        self._tokens -= 1
+        return True
+
+    def _delay(self):
+        # Returns the injected error status, if any. Decided under the lock so
+        # a seeded run stays repeatable whatever order the handler threads get
+        # here in.
+        with self._lock:
+            self.requests += 1
+            if self.max_rate and not self._admit():
+                return 429
+            latency = self.latency * self._rng.lognormvariate(0, self.jitter) if self.jitter else self.latency
+            failed = self.error_rate and self._rng.random() < self.error_rate
+            self.errors += bool(failed)
+        if latency:
+            time.sleep(latency)
+        return 503 if failed else None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                error = server._delay()
+                if error:
+                    return self._send(error, b"injected error")
+
+                parsed = urlparse(self.path)
+                if parsed.path == "/search":
+                    query = parse_qs(parsed.query).get("q", [""])[0]
+                    return self._send(200, server.search_page(query).encode("utf-8"))
+
+                if parsed.path.startswith("/lyricstape.com/"):
+                    path = FIXTURES / "lyricstape" / Path(parsed.path).name
+                    if path.is_file():
+                        return self._send(200, path.read_bytes())
+
+                if parsed.path == ARTIST_PATH:
+                    page = SAAVN_TEMPLATE.format(rows=server.saavn_rows(0))
+                    return self._send(200, page.encode("utf-8"))
+
+                if parsed.path == "/api/artist/songs":
+                    page = int(parse_qs(parsed.query).get("p", ["1"])[0])
+                    more = (page + 1) * SAAVN_PAGE_SIZE < len(server.saavn_songs)
+                    body = json.dumps({"html": server.saavn_rows(page), "more": more})
+                    return self._send(200, body.encode("utf-8"), "application/json")
+
+                if parsed.path.startswith("/media/") and server.media_dir:
+                    path = server.media_dir / Path(parsed.path).name
+                    if path.is_file():
+                        return self._send(200, path.read_bytes(), "application/octet-stream")
+
+                self._send(404, b"not found")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                error = server._delay()
+                if error:
+                    return self._send(error, b"injected error")
+
+                if urlparse(self.path).path == "/serper/search":
+                    payload = json.loads(body or b"{}")
+                    # A list is Serper's batch form: one response per query.
+                    with server._lock:
+                        server.serper_requests += 1
+                    answer = [server.serper_response(p) for p in payload] if isinstance(payload, list) else server.serper_response(payload)
+                    return self._send(200, json.dumps(answer).encode("utf-8"), "application/json")
+
+                self._send(404, b"not found")
+
+            def _send(self, status, body, content_type="text/html; charset=utf-8"):
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
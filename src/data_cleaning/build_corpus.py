@@ -0,0 +1,93 @@
+import argparse
+import time
+from pathlib import Path
+import pandas as pd
+from data_cleaning import features
+from utils import corpus_store
+
+RAW_CSV = "rawdata/extracted_data.csv"
+# A file of its own: the committed sirivennela_cleaned_data.csv is the
+# notebook's reference output and is never overwritten by default.
+CLEAN_CSV = "cleaneddata/corpus.csv"
+CACHE_PATH = features.TOKEN_CACHE
+
+MIN_WORD_COUNT = 30
+MIN_TELUGU_RATIO = 0.6
+MIN_UNIQUE_RATIO = 0.2
+
+METRICS = ['word_count', 'telugu_ratio', 'uniqueness_ratio', 'final_lyrics', 'richness', 'complexity', 'sanskrit_score']
+OUTPUT_COLUMNS = ['song_name', 'word_count', 'telugu_ratio', 'uniqueness_ratio', 'final_lyrics', 'richness', 'complexity', 'sanskrit_score']
+
+def compute_metrics(lyrics, tokens=None, metrics=features.METRICS):
+    # Same definitions as the lyrics_cleaning notebook. Every metric runs on
+    # one tokenization of the lyrics (see data_cleaning.features).
+    text = lyrics.fillna('').astype(str).tolist()
+    tokens = tokens if tokens is not None else features.tokenize(text)
+    out = features.compute(tokens, metrics, index=lyrics.index)
+    out.insert(min(METRICS.index('final_lyrics'), len(out.columns)), 'final_lyrics', [features.final_text(t) for t in text])
+    return out
+
+def load_raw(paths):
+    frames = [_read_raw(path) for path in paths]
+    return pd.concat(frames, ignore_index=True)
+
+def _read_raw(path):
+    if Path(path).suffix in corpus_store.PARQUET_SUFFIXES + corpus_store.ARROW_SUFFIXES:
+        return corpus_store.load_corpus(path, columns=['movie_name', 'song_name', 'lyrics'])
+    return pd.read_csv(path, index_col=0)
+
+def build(raw, cache=None, metrics=features.METRICS):
+    # Songs are tokenized once and kept in the token cache keyed by a hash of
+    # the lyrics; only new (or changed) lyrics are tokenized. Metrics are
+    # always recomputed from the tokens, which takes a fraction of that.
+    lyrics = raw['lyrics'].fillna('').astype(str)
+    keys = lyrics.map(features.lyrics_key)
+    unique = pd.Series(lyrics.to_numpy(), index=keys.to_numpy())
+    unique = unique[~unique.index.duplicated()]
+
+    if cache:
+        tokens, computed, reused = cache.tokens(unique.index, unique.tolist())
+    else:
+        tokens, computed, reused = features.tokenize(unique.tolist()), len(unique), 0
+    out = compute_metrics(unique, tokens, metrics).reindex(keys.to_numpy())
+    out.insert(0, 'song_name', raw['song_name'].to_numpy())
+    out = out.reset_index(drop=True)
+    return out, computed, reused
+
+def apply_filters(df):
+    return df[
+        (df['word_count'] >= MIN_WORD_COUNT) &
+        (df['telugu_ratio'] >= MIN_TELUGU_RATIO) &
+        (df['uniqueness_ratio'] >= MIN_UNIQUE_RATIO)
+    ]
+
+def main(inputs=(RAW_CSV,), output=CLEAN_CSV, cache_path=CACHE_PATH, extra_metrics=()):
+    start = time.perf_counter()
+    raw = load_raw(inputs)
+    metrics = features.METRICS + tuple(map(features.load_metric, extra_metrics))
+    cache = features.TokenCache(cache_path) if cache_path else None
+    try:
+        corpus, computed, reused = build(raw, cache, metrics)
+    finally:
+        if cache:
+            cache.close()
+
+    # Plugin metrics go after the notebook's columns.
+    columns = OUTPUT_COLUMNS + [m.name for m in metrics if m.name not in OUTPUT_COLUMNS]
+    clean = apply_filters(corpus)[columns]
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    clean.to_csv(output, index=False)
+
+    print(f"{len(raw)} songs, {computed + reused} distinct lyrics | {computed} tokenized | {reused} from cache")
+    print(f"Kept {len(clean)} after filters -> {output} ({time.perf_counter() - start:.2f}s)")
+    return clean
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--input", action="append", help=f"raw lyrics CSV or corpus .parquet/.arrow (repeatable, default {RAW_CSV})")
+    parser.add_argument("-o", "--output", default=CLEAN_CSV)
+    parser.add_argument("--cache", default=CACHE_PATH, help="tokenized lyrics cache")
+    parser.add_argument("--no-cache", action="store_true", help="re-tokenize every song")
+    parser.add_argument("--metric", action="append", default=[], help="extra metric as module:Class (repeatable)")
+    args = parser.parse_args()
+    main(args.input or [RAW_CSV], args.output, None if args.no_cache else args.cache, args.metric)
@@ -0,0 +1,187 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from utils import corpus_store
+from utils.telugu_text import fold_title
+
+NUM_PERM = 128
+BANDS = 32
+LYRICS_SHINGLE = 5
+NAME_SHINGLE = 3
+# Estimated Jaccard needed to call two records the same song. Lyrics only
+# need moderate overlap (scrapes differ in headers, repeats, stray lines);
+# names must agree more, since many different songs share common words.
+LYRICS_THRESHOLD = 0.5
+NAME_THRESHOLD = 0.7
+# Buckets larger than this (boilerplate text, very common titles) are linked
+# as a chain instead of all-pairs, keeping candidate generation linear.
+MAX_BUCKET = 64
+SEED = 1
+
+_ROLL = np.uint64(1000003)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_EMPTY = np.zeros(0, dtype=np.uint32)
+
+def shingle_hashes(text, k):
+    # Rolling polynomial hash of every k-codepoint window, computed as numpy
+    # slices rather than a Python loop over shingles. uint64 overflow wraps,
+    # which is exactly the arithmetic wanted here.
+    if len(text) < k:
+        return _EMPTY if not text else shingle_hashes(text.ljust(k), k)
+    points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    n = len(points) - k + 1
+    h = np.zeros(n, dtype=np.uint64)
+    for j in range(k):
+        h = h * _ROLL + points[j:j + n]
+    return np.unique(((h * _MIX) >> np.uint64(32)).astype(np.uint32))
+
+def lyrics_shingles(text, k=LYRICS_SHINGLE):
+    return shingle_hashes(' '.join(str(text or '').split()), k)
+
+def name_shingles(song, movie, k=NAME_SHINGLE):
+    return shingle_hashes(f"{fold_title(song)}|{fold_title(movie)}", k)
+
+class MinHasher:
+    # Multiply-add-shift hashing: h_i(x) = ((a_i * x + b_i) mod 2^64) >> 32
+    # with random 64-bit a_i (odd) and b_i. Full-width a_i matters: with small
+    # multipliers the products barely wrap, h_i stays nearly monotonic in x,
+    # and every permutation picks the same smallest shingle.
+    def __init__(self, num_perm=NUM_PERM, seed=SEED):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(0, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self.b = rng.integers(0, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64, endpoint=True)
+
+    def signature(self, shingles):
+        if len(shingles) == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        x = shingles.astype(np.uint64)[:, None]
+        # The shift is monotonic, so it can wait until after the min.
+        return ((self.a * x + self.b).min(axis=0) >> np.uint64(32)).astype(np.uint32)
+
+    def signatures(self, shingle_sets):
+        out = np.empty((len(shingle_sets), self.num_perm), dtype=np.uint32)
+        for i, shingles in enumerate(shingle_sets):
+            out[i] = self.signature(shingles)
+        return out
+
+def lsh_candidates(signatures, valid, bands=BANDS, max_bucket=MAX_BUCKET):
+    # Records sharing every row of at least one band land in the same bucket.
+    # Each band is one np.unique over fixed-width row keys, so the cost is
+    # O(n log n) per band however many records there are.
+    rows = signatures.shape[1] // bands
+    index = np.flatnonzero(valid)
+    pairs = []
+    for band in range(bands):
+        keys = np.ascontiguousarray(signatures[index, band * rows:(band + 1) * rows])
+        keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * rows))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        shared = counts[inverse] > 1
+        if not shared.any():
+            continue
+        members = index[shared]
+        order = np.argsort(inverse[shared], kind='stable')
+        members, groups = members[order], inverse[shared][order]
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        for start, end in zip(starts, np.r_[starts[1:], len(members)]):
+            bucket = members[start:end]
+            if len(bucket) > max_bucket:
+                pairs.append(np.column_stack([bucket[:-1], bucket[1:]]))
+            else:
+                i, j = np.triu_indices(len(bucket), k=1)
+                pairs.append(np.column_stack([bucket[i], bucket[j]]))
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    return np.unique(pairs, axis=0)
+
+def similarity(signatures, pairs):
+    if len(pairs) == 0:
+        return np.zeros(0)
+    return (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+
+def _components(n, pairs):
+    parent = np.arange(n)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    return np.array([find(i) for i in range(n)])
+
+def _text(df):
+    text = df['lyrics'] if 'lyrics' in df else pd.Series(None, index=df.index, dtype=object)
+    if 'final_lyrics' in df:
+        text = text.fillna(df['final_lyrics'])
+    return text.fillna('').astype(str)
+
+def find_duplicates(df, hasher=None, lyrics_threshold=LYRICS_THRESHOLD, name_threshold=NAME_THRESHOLD):
+    # Returns df with a `cluster` id per row and `canonical` marking the one
+    # record kept per cluster. Two records are linked when their lyrics are
+    # near-identical, or, when either side has no lyrics to compare, when
+    # their folded song + movie names are.
+    hasher = hasher or MinHasher()
+    df = df.reset_index(drop=True)
+    text = _text(df)
+    movie = df['movie_name'] if 'movie_name' in df else pd.Series('', index=df.index)
+
+    lyrics_sets = [lyrics_shingles(t) for t in text]
+    name_sets = [name_shingles(s, m) for s, m in zip(df['song_name'], movie)]
+    has_lyrics = np.fromiter((len(s) > 0 for s in lyrics_sets), dtype=bool, count=len(df))
+    has_name = np.fromiter((len(s) > 0 for s in name_sets), dtype=bool, count=len(df))
+    lyrics_sig = hasher.signatures(lyrics_sets)
+    name_sig = hasher.signatures(name_sets)
+
+    lyric_pairs = lsh_candidates(lyrics_sig, has_lyrics)
+    lyric_pairs = lyric_pairs[similarity(lyrics_sig, lyric_pairs) >= lyrics_threshold]
+    name_pairs = lsh_candidates(name_sig, has_name)
+    name_pairs = name_pairs[~(has_lyrics[name_pairs[:, 0]] & has_lyrics[name_pairs[:, 1]])]
+    name_pairs = name_pairs[similarity(name_sig, name_pairs) >= name_threshold]
+
+    out = df.copy()
+    out['cluster'] = _components(len(df), np.concatenate([lyric_pairs, name_pairs]))
+    # Canonical: the record with the most lyrics text, first seen on ties.
+    length = text.str.len()
+    best = length.groupby(out['cluster']).idxmax()
+    out['canonical'] = False
+    out.loc[best.to_numpy(), 'canonical'] = True
+    return out
+
+def dedupe(df, **kwargs):
+    clustered = find_duplicates(df, **kwargs)
+    return clustered[clustered['canonical']].drop(columns=['cluster', 'canonical'])
+
+def clusters(clustered):
+    # One row per cluster with more than one record, canonical listed first.
+    dupes = clustered[clustered.groupby('cluster')['cluster'].transform('size') > 1]
+    dupes = dupes.sort_values(['cluster', 'canonical'], ascending=[True, False])
+    return dupes[[c for c in ('cluster', 'canonical', 'song_name', 'movie_name', 'source') if c in dupes]]
+
+def main(inputs, output=None, clusters_csv=None):
+    start = time.perf_counter()
+    table = corpus_store.to_table(pd.concat([corpus_store.load_corpus(p) for p in inputs], ignore_index=True))
+    clustered = find_duplicates(table.to_pandas())
+    kept = clustered[clustered['canonical']]
+    groups = clusters(clustered)
+    print(f"{len(clustered)} records -> {len(kept)} after dedup "
+          f"({groups['cluster'].nunique()} clusters of duplicates, {time.perf_counter() - start:.1f}s)")
+    if output:
+        corpus_store.write_corpus(kept.drop(columns=['cluster', 'canonical']), output)
+    if clusters_csv:
+        groups.to_csv(clusters_csv, index=False)
+    return clustered
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate songs across corpus sources")
+    parser.add_argument("inputs", nargs="+", help="corpus .parquet/.arrow files (see utils.corpus_store)")
+    parser.add_argument("-o", "--output", help="write the canonical records here")
+    parser.add_argument("--clusters", help="CSV listing every duplicate cluster")
+    args = parser.parse_args()
+    main(args.inputs, args.output, args.clusters)
@@ -0,0 +1,262 @@
+import hashlib
+import importlib
+import os
+import re
+from itertools import chain
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from utils.telugu_text import count_telugu_chars, TELUGU_RANGE
+
+TOKEN_CACHE = ".cache/lyrics_tokens.npz"
+
+# Bump whenever tokenization changes: every cached song is re-tokenized.
+# Metrics aren't cached, so changing one needs no bump.
+TOKENIZER_VERSION = "1"
+
+# Python's re, not the pyarrow-backed .str methods: RE2 doesn't treat
+# non-breaking spaces as \s, which shifts every metric on scraped pages.
+NON_TELUGU_RE = re.compile(rf'[^{TELUGU_RANGE}\s\.\,\?\!]')
+SANSKRIT_RE = re.compile('[' + ''.join(sorted(set("ఖఘఛఝఠఢథధఫభశషక్ష"))) + ']')
+
+def lyrics_key(text):
+    return hashlib.sha1(f"{TOKENIZER_VERSION}\0{text}".encode("utf-8")).hexdigest()
+
+def final_text(text):
+    # The notebook's final_lyrics: Telugu, whitespace and basic punctuation.
+    return NON_TELUGU_RE.sub('', text)
+
+def _ratio(num, den):
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+# --- tokens -----------------------------------------------------------------
+
+# Per-token properties, computed once per distinct token rather than once
+# per occurrence.
+PROPERTIES = {
+    "length": len,
+    "telugu": count_telugu_chars,
+    "sanskrit": lambda token: len(SANSKRIT_RE.findall(token)),
+}
+
+class Vocab:
+    # Every distinct whitespace-separated token gets an int32 id. Property
+    # arrays are indexed by id and extended as the vocabulary grows.
+    def __init__(self, tokens=()):
+        self.ids = {token: i for i, token in enumerate(tokens)}
+        self._tokens = list(self.ids)
+        self._props = {}
+        self._final = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def tokens(self):
+        if len(self._tokens) < len(self.ids):
+            self._tokens.extend(list(self.ids)[len(self._tokens):])
+        return self._tokens
+
+    def encode(self, words):
+        ids = self.ids
+        setdefault = ids.setdefault
+        return np.fromiter([setdefault(w, len(ids)) for w in words], dtype=np.int32, count=len(words))
+
+    def prop(self, name):
+        values = self._props.get(name, np.zeros(0, dtype=np.int64))
+        if len(values) < len(self):
+            fn = PROPERTIES[name]
+            new = np.fromiter(map(fn, self.tokens[len(values):]), dtype=np.int64, count=len(self) - len(values))
+            values = self._props[name] = np.concatenate([values, new])
+        return values
+
+    def final(self):
+        # Stripping non-Telugu characters never touches whitespace, so each
+        # token of final_lyrics is just a stripped token of the lyrics. Maps
+        # token ids to ids in a second vocabulary of stripped forms; -1 where
+        # nothing is left.
+        if self._final is None:
+            self._final = (Vocab(), np.zeros(0, dtype=np.int32))
+        vocab, mapping = self._final
+        if len(mapping) < len(self):
+            stripped = [final_text(t) for t in self.tokens[len(mapping):]]
+            new = np.fromiter((vocab.ids.setdefault(s, len(vocab.ids)) if s else -1 for s in stripped),
+                              dtype=np.int32, count=len(stripped))
+            mapping = np.concatenate([mapping, new])
+            self._final = (vocab, mapping)
+        return vocab, mapping
+
+class Tokens:
+    # A batch of songs as one flat id array: song i is ids[offsets[i]:offsets[i + 1]].
+    def __init__(self, ids, offsets, vocab):
+        self.ids = ids
+        self.offsets = offsets
+        self.vocab = vocab
+        self.lengths = np.diff(offsets)
+        self._song = None
+        self._final = None
+
+    def __len__(self):
+        return len(self.lengths)
+
+    @property
+    def song(self):
+        # Which song each token belongs to.
+        if self._song is None:
+            self._song = np.repeat(np.arange(len(self), dtype=np.int64), self.lengths)
+        return self._song
+
+    def per_token(self, name):
+        return self.vocab.prop(name)[self.ids]
+
+    def sum(self, values):
+        return np.bincount(self.song, weights=values, minlength=len(self)).astype(np.int64)
+
+    def unique(self):
+        # Distinct tokens per song: distinct (song, token) pairs, counted by
+        # song. Sorted and compared with the neighbour; np.unique does the
+        # same but is many times slower on millions of keys.
+        width = max(len(self.vocab), 1)
+        pairs = np.sort(self.song * width + self.ids)
+        first = np.ones(len(pairs), dtype=bool)
+        first[1:] = pairs[1:] != pairs[:-1]
+        return np.bincount(pairs[first] // width, minlength=len(self))
+
+    def final(self):
+        # The same songs as final_lyrics tokens.
+        if self._final is None:
+            vocab, mapping = self.vocab.final()
+            mapped = mapping[self.ids]
+            keep = mapped >= 0
+            lengths = np.bincount(self.song[keep], minlength=len(self))
+            self._final = Tokens(mapped[keep], np.concatenate([[0], np.cumsum(lengths)]), vocab)
+        return self._final
+
+    def select(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.offsets[rows]
+        lengths = self.lengths[rows]
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        index = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return Tokens(self.ids[index], offsets, self.vocab)
+
+def tokenize(texts, vocab=None):
+    words = [t.split() for t in texts]
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+    vocab = vocab if vocab is not None else Vocab()
+    ids = vocab.encode(list(chain.from_iterable(words)))
+    return Tokens(ids, np.concatenate([[0], np.cumsum(lengths)]), vocab)
+
+# --- metrics ----------------------------------------------------------------
+# A metric is a class with a `name` (its output column) and compute(tokens),
+# returning one value per song as an array. Extra metrics plug in as
+# module:Class; they run on the cached tokens, so adding one never
+# re-tokenizes the corpus.
+
+class WordCount:
+    name = "word_count"
+
+    def compute(self, tokens):
+        return tokens.lengths
+
+class TeluguRatio:
+    name = "telugu_ratio"
+
+    def compute(self, tokens):
+        # Tokens cover every non-whitespace character, so their summed
+        # lengths are the text's non-whitespace count.
+        return _ratio(tokens.sum(tokens.per_token("telugu")), tokens.sum(tokens.per_token("length")))
+
+class UniquenessRatio:
+    name = "uniqueness_ratio"
+
+    def compute(self, tokens):
+        return _ratio(tokens.unique(), tokens.lengths)
+
+class Richness:
+    name = "richness"
+    min_words = 10
+
+    def compute(self, tokens):
+        final = tokens.final()
+        return np.where(final.lengths >= self.min_words, _ratio(final.unique(), final.lengths), 0.0)
+
+class Complexity:
+    name = "complexity"
+
+    def compute(self, tokens):
+        # Mean final_lyrics word length.
+        final = tokens.final()
+        return _ratio(final.sum(final.per_token("length")), final.lengths)
+
+class SanskritScore:
+    name = "sanskrit_score"
+
+    def compute(self, tokens):
+        final = tokens.final()
+        return _ratio(final.sum(final.per_token("sanskrit")), final.sum(final.per_token("length")))
+
+METRICS = (WordCount(), TeluguRatio(), UniquenessRatio(), Richness(), Complexity(), SanskritScore())
+
+def load_metric(spec):
+    module, _, cls = spec.partition(":")
+    return getattr(importlib.import_module(module), cls)()
+
+def compute(tokens, metrics=METRICS, index=None):
+    return pd.DataFrame({m.name: m.compute(tokens) for m in metrics}, index=index)
+
+# --- cache ------------------------------------------------------------------
+
+class TokenCache:
+    # Tokenized lyrics keyed by lyrics_key, in one .npz: the vocabulary
+    # (newline-joined; tokens never contain whitespace), every cached song's
+    # ids back to back, their offsets and their keys.
+    def __init__(self, path=TOKEN_CACHE):
+        self.path = Path(path)
+        self.keys = []
+        self.store = Tokens(np.zeros(0, dtype=np.int32), np.zeros(1, dtype=np.int64), Vocab())
+        if self.path.is_file():
+            with np.load(self.path, allow_pickle=False) as data:
+                text = data["vocab"].tobytes().decode("utf-8")
+                vocab = Vocab(text.split("\n") if text else ())
+                self.keys = data["keys"].tolist()
+                self.store = Tokens(data["ids"], data["offsets"], vocab)
+        self.rows = {key: i for i, key in enumerate(self.keys)}
+        self._dirty = False
+
+    @property
+    def vocab(self):
+        return self.store.vocab
+
+    def tokens(self, keys, texts):
+        # Tokens for these songs, in this order; only the ones not cached yet
+        # are tokenized. Returns (tokens, tokenized, reused).
+        missing = [(k, t) for k, t in zip(keys, texts) if k not in self.rows]
+        if missing:
+            fresh = tokenize([t for _, t in missing], self.vocab)
+            base = len(self.keys)
+            for i, (key, _) in enumerate(missing):
+                self.rows[key] = base + i
+            self.keys += [k for k, _ in missing]
+            self.store = Tokens(np.concatenate([self.store.ids, fresh.ids]),
+                                np.concatenate([self.store.offsets, self.store.offsets[-1] + fresh.offsets[1:]]),
+                                self.vocab)
+            self._dirty = True
+        rows = [self.rows[k] for k in keys]
+        return self.store.select(rows), len(missing), len(rows) - len(missing)
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp.npz")
+        vocab = np.frombuffer("\n".join(self.vocab.tokens).encode("utf-8"), dtype=np.uint8)
+        np.savez(tmp, vocab=vocab, keys=np.array(self.keys, dtype="U40"),
+                 ids=self.store.ids, offsets=self.store.offsets)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def close(self):
+        self.save()
@@ -0,0 +1,309 @@
+import argparse
+import csv
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import connection
+from pathlib import Path
+import numpy as np
+from scrape.title_index import TitleIndex
+from utils.dataset_csv import song_stem, load_dataset, update_dataset, DATASET_CSV
+from utils.wav_io import open_wav, to_float
+
+RAW_FOLDER = "SPB_Dataset_Raw"
+LYRICS_CSVS = ("rawdata/extracted_data.csv", "rawdata/external_lyrics.csv")
+OUTPUT_PATH = "SPB_Dataset_Processed/lyrics_segments.parquet"
+CACHE_FOLDER = ".cache/align"
+# Bump when the cached span format or line splitting changes.
+ALIGN_VERSION = "1"
+
+WORKERS = os.cpu_count() or 2
+TIMEOUT = 300.0
+CHUNK_FRAMES = 1 << 18
+
+FRAME_SECONDS = 0.02
+ACTIVE_FRACTION = 0.4
+MIN_GAP = 0.25
+MIN_PHRASE = 0.3
+SNAP_SECONDS = 1.0
+
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+def lyric_lines(lyrics):
+    return [" ".join(line.split()) for line in str(lyrics or "").splitlines() if line.strip()]
+
+# --- aligners ---------------------------------------------------------------
+# An aligner has a `name`, params() (part of the cache key) and
+# align(wav_path, lines), returning one (start, end, score) in seconds per
+# line, or None for a line it couldn't place. Other aligners (a CTC or
+# HMM forced aligner, say) plug in as --aligner module:Class.
+
+class EnergyAligner:
+    # CPU-only baseline with no model: sung phrases are runs of frames well
+    # above the song's noise floor, and the lines are laid over the voiced
+    # time in proportion to their length, each boundary snapped to a nearby
+    # pause. Works best on a vocal stem (audio_pipeline --separator);
+    # repeated choruses that the lyrics list once will drift.
+    name = "energy"
+
+    def __init__(self, frame=FRAME_SECONDS, active=ACTIVE_FRACTION, min_gap=MIN_GAP, min_phrase=MIN_PHRASE, snap=SNAP_SECONDS):
+        self.frame = frame
+        self.active = active
+        self.min_gap = min_gap
+        self.min_phrase = min_phrase
+        self.snap = snap
+
+    def params(self):
+        return {"frame": self.frame, "active": self.active, "min_gap": self.min_gap,
+                "min_phrase": self.min_phrase, "snap": self.snap}
+
+    def phrases(self, path):
+        # [start, end) frame pairs of the voiced runs, and seconds per frame.
+        info, data = open_wav(path)
+        frame = max(1, int(info.rate * self.frame))
+        hop = frame / info.rate
+        step = max(frame, CHUNK_FRAMES // frame * frame)
+        levels = []
+        for start in range(0, info.frames, step):
+            x = to_float(data[start:start + step]).mean(axis=1, dtype=np.float64)
+            n = len(x) // frame
+            rms = np.sqrt((x[:n * frame].reshape(n, frame) ** 2).mean(axis=1))
+            levels.append(20 * np.log10(rms + 1e-9))
+        db = np.concatenate(levels) if levels else np.zeros(0)
+        if not len(db):
+            return np.zeros((0, 2), dtype=np.int64), hop
+
+        lo, hi = np.percentile(db, [10, 95])
+        active = (db > lo + (hi - lo) * self.active).astype(np.int8)
+        runs = np.flatnonzero(np.diff(np.concatenate([[0], active, [0]]))).reshape(-1, 2)
+        merged = []
+        for start, end in runs:
+            if merged and start - merged[-1][1] < self.min_gap / hop:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        phrases = [p for p in merged if p[1] - p[0] >= self.min_phrase / hop]
+        return np.array(phrases, dtype=np.int64).reshape(-1, 2), hop
+
+    def align(self, path, lines):
+        phrases, hop = self.phrases(path)
+        if not lines or not len(phrases):
+            return [None] * len(lines)
+
+        # Positions below are in voiced frames: phrase k covers
+        # [voiced_end[k] - lengths[k], voiced_end[k]), pauses squeezed out.
+        lengths = phrases[:, 1] - phrases[:, 0]
+        voiced_end = np.cumsum(lengths)
+        weights = np.array([max(1, len(line.replace(" ", ""))) for line in lines], dtype=np.float64)
+        bounds = np.concatenate([[0.0], np.cumsum(weights)]) / weights.sum() * voiced_end[-1]
+
+        pauses = voiced_end[:-1]
+        for i in range(1, len(lines)):
+            j = np.searchsorted(pauses, bounds[i])
+            near = [pauses[k] for k in (j - 1, j) if 0 <= k < len(pauses)]
+            if near:
+                pause = min(near, key=lambda p: abs(p - bounds[i]))
+                if abs(pause - bounds[i]) <= self.snap / hop and bounds[i - 1] < pause < bounds[i + 1]:
+                    bounds[i] = pause
+
+        def frame_at(pos, side):
+            # side "left": a position on a pause is the end of the phrase
+            # before it; "right": the start of the one after.
+            k = min(int(np.searchsorted(voiced_end, pos, side=side)), len(phrases) - 1)
+            return phrases[k, 0] + pos - (voiced_end[k] - lengths[k])
+
+        spans = []
+        for i in range(len(lines)):
+            start, end = frame_at(bounds[i], "right"), frame_at(bounds[i + 1], "left")
+            score = (bounds[i + 1] - bounds[i]) / (end - start) if end > start else 0.0
+            spans.append((round(float(start * hop), 3), round(float(end * hop), 3), round(float(score), 3)))
+        return spans
+
+def load_aligner(spec):
+    if not spec or spec == EnergyAligner.name:
+        return EnergyAligner()
+    module, _, cls = spec.partition(":")
+    return getattr(importlib.import_module(module), cls)()
+
+# --- worker -----------------------------------------------------------------
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def align_key(audio_hash, lines, aligner):
+    raw = json.dumps([ALIGN_VERSION, audio_hash, lines, aligner.name, aligner.params()], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def align_song(task):
+    # Runs in the song's own process. The audio is hashed here, not in the
+    # parent, so hashing is spread over the workers too.
+    start = time.perf_counter()
+    aligner = load_aligner(task['aligner'])
+    key = align_key(file_hash(task['audio']), task['lines'], aligner)
+    path = Path(task['cache']) / f"{key}.json"
+    cached = path.exists()
+    if not cached:
+        spans = aligner.align(task['audio'], task['lines'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{key}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"spans": spans}), encoding="utf-8")
+        os.replace(tmp, path)
+    return {"song_name": task['song_name'], "key": key, "cached": cached,
+            "seconds": round(time.perf_counter() - start, 2)}
+
+def _child(conn, task):
+    try:
+        conn.send(("ok", align_song(task)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+def run_tasks(tasks, workers=WORKERS, timeout=TIMEOUT):
+    # Yields (task, status, result) as songs finish: status is ok, error or
+    # timeout. One process per song rather than a ProcessPoolExecutor: a pool
+    # can't stop a task stuck in native code, but a song's own process can be
+    # terminated at its deadline. Forking is cheap next to an alignment.
+    context = multiprocessing.get_context()
+    pending = list(reversed(tasks))
+    running = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            task = pending.pop()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_child, args=(sender, task), daemon=True)
+            process.start()
+            sender.close()
+            deadline = time.monotonic() + timeout if timeout else None
+            running[process.sentinel] = (process, receiver, task, deadline)
+
+        deadlines = [d for *_, d in running.values() if d is not None]
+        wait = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        ready = connection.wait(list(running), wait)
+        now = time.monotonic()
+        for sentinel, (process, receiver, task, deadline) in list(running.items()):
+            if sentinel in ready:
+                status, result = receiver.recv() if receiver.poll() else ("error", f"worker exited with code {process.exitcode}")
+            elif deadline is not None and now >= deadline:
+                process.terminate()
+                status, result = "timeout", f"timed out after {timeout:g}s"
+            else:
+                continue
+            process.join()
+            receiver.close()
+            del running[sentinel]
+            yield task, status, result
+
+# --- matching and output ----------------------------------------------------
+
+def load_lyrics(paths=LYRICS_CSVS):
+    # Every song with lyrics, indexed by folded title. extracted_data.csv
+    # spells names "Allantha_Doorala"; the dataset CSV "Allantha Doorala".
+    # Exact (folded) titles only: a fuzzy match could give a song another
+    # song's lyrics.
+    rows, index = [], TitleIndex(threshold=1.0)
+    for path in map(Path, paths):
+        if not path.is_file():
+            continue
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                lines = lyric_lines(row.get("lyrics"))
+                if not lines:
+                    continue
+                index.add(row["song_name"].replace("_", " "), (row.get("movie_name") or "").replace("_", " ") or None, str(len(rows)))
+                rows.append(lines)
+    return rows, index
+
+def plan(songs, audio_folder, lyrics, index, aligner, cache_folder):
+    tasks, unmatched, no_audio = [], 0, 0
+    for song in songs:
+        stem = song_stem(audio_folder, song)
+        wav = stem.parent / f"{stem.name}.wav"
+        if not wav.exists():
+            no_audio += 1
+            continue
+        match = index.lookup(song['song_name'], song.get('movie_name'))
+        if match is None:
+            unmatched += 1
+            continue
+        tasks.append({"song_name": song['song_name'], "movie_name": song.get('movie_name', ''),
+                      "audio": str(wav), "lines": lyrics[int(match.source)],
+                      "aligner": aligner, "cache": cache_folder})
+    return tasks, unmatched, no_audio
+
+def write_index(rows, output):
+    # One row per lyric line. Names are dictionary-encoded and times float32,
+    # so the index stays a few bytes per line; unaligned lines keep nulls.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    names = pa.dictionary(pa.int32(), pa.string())
+    schema = pa.schema([
+        ('song_name', names), ('movie_name', names), ('line', pa.int16()),
+        ('start', pa.float32()), ('end', pa.float32()), ('score', pa.float32()), ('text', pa.string()),
+    ])
+    table = pa.Table.from_pydict({f.name: pa.array([r[i] for r in rows], type=f.type) for i, f in enumerate(schema)}, schema=schema)
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + ".tmp")
+    pq.write_table(table, tmp, compression='zstd')
+    os.replace(tmp, output)
+    return table
+
+def run(dataset_csv=DATASET_CSV, audio_folder=RAW_FOLDER, lyrics_csvs=LYRICS_CSVS, output=OUTPUT_PATH,
+        cache_folder=CACHE_FOLDER, aligner=EnergyAligner.name, workers=WORKERS, timeout=TIMEOUT):
+    songs = load_dataset(dataset_csv)
+    lyrics, index = load_lyrics(lyrics_csvs)
+    tasks, unmatched, no_audio = plan(songs, audio_folder, lyrics, index, aligner, cache_folder)
+    print(f"Aligning {len(tasks)} of {len(songs)} songs with {workers} workers "
+          f"({no_audio} without audio, {unmatched} without lyrics)")
+
+    start = time.perf_counter()
+    by_name = {song['song_name']: song for song in songs}
+    rows, stats = [], {"aligned": 0, "cached": 0, "failed": 0, "timeout": 0, "lines": 0, "placed": 0}
+    for task, status, result in run_tasks(tasks, workers, timeout):
+        if status != "ok":
+            stats["timeout" if status == "timeout" else "failed"] += 1
+            print(f" {status}: {task['song_name']} | {result}")
+            update_dataset(dataset_csv, by_name[task['song_name']], Notes=f"align: {result}")
+            continue
+        spans = json.loads((Path(cache_folder) / f"{result['key']}.json").read_text(encoding="utf-8"))["spans"]
+        for i, (text, span) in enumerate(zip(task['lines'], spans)):
+            begin, end, score = span or (None, None, None)
+            rows.append((task['song_name'], task['movie_name'], i, begin, end, score, text))
+        placed = sum(span is not None for span in spans)
+        stats["aligned"] += 1
+        stats["cached"] += result['cached']
+        stats["lines"] += len(spans)
+        stats["placed"] += placed
+        print(f" done: {task['song_name']} | {placed}/{len(spans)} lines | "
+              f"{'cached' if result['cached'] else 'aligned'} | {result['seconds']}s")
+
+    # Output follows the dataset's order, whatever order songs finished in.
+    order = {task['song_name']: i for i, task in enumerate(tasks)}
+    rows.sort(key=lambda r: (order[r[0]], r[2]))
+    write_index(rows, output)
+    stats["seconds"] = time.perf_counter() - start
+    print(f"\n{stats['aligned']} songs ({stats['cached']} cached), {stats['placed']}/{stats['lines']} lines -> {output}; "
+          f"{stats['failed']} failed, {stats['timeout']} timed out, {stats['seconds']:.1f}s")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Align lyric lines to the dataset's audio and write a Parquet segment index")
+    parser.add_argument("--dataset", default=DATASET_CSV)
+    parser.add_argument("--audio", default=RAW_FOLDER, help="folder laid out like SPB_Dataset_Raw (<category>/<song>.wav)")
+    parser.add_argument("--lyrics", nargs="+", default=list(LYRICS_CSVS), help="CSVs with song_name, movie_name and lyrics columns")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH)
+    parser.add_argument("--cache", default=CACHE_FOLDER)
+    parser.add_argument("--aligner", default=EnergyAligner.name, help="'energy' or module:Class")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="seconds a song may take before its process is killed (0 = none)")
+    args = parser.parse_args()
+    run(args.dataset, args.audio, args.lyrics, args.output, args.cache, args.aligner, args.workers, args.timeout)
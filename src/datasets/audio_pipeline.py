@@ -0,0 +1,323 @@
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math import gcd
+from pathlib import Path
+import numpy as np
+from utils.dataset_csv import song_stem, load_dataset, update_dataset, DATASET_CSV
+from utils.wav_io import open_wav, create_wav, write_pcm16, to_float
+
+RAW_FOLDER = "SPB_Dataset_Raw"
+OUTPUT_FOLDER = "SPB_Dataset_Processed"
+CACHE_FOLDER = ".cache/audio"
+
+TARGET_RATE = 40000
+TARGET_LUFS = -20.0
+PEAK_CEILING = 10 ** (-1.0 / 20)
+SILENCE_DB = -45.0
+SILENCE_PAD = 0.1
+FRAME_SECONDS = 0.02
+SEGMENT_SECONDS = 10.0
+MIN_SEGMENT_SECONDS = 3.0
+CHUNK_FRAMES = 1 << 18
+RESAMPLE_PAD = 4096
+WORKERS = os.cpu_count() or 2
+
+def _chunks(total, size=CHUNK_FRAMES):
+    for start in range(0, total, size):
+        yield start, min(start + size, total)
+
+def _mono(chunk):
+    data = to_float(chunk)
+    return data.mean(axis=1) if data.shape[1] > 1 else data[:, 0]
+
+# --- stages -----------------------------------------------------------------
+# Each stage reads one WAV and writes one WAV, chunk by chunk through memory
+# mapped buffers. params() feeds the cache key, so changing a setting only
+# invalidates that stage and the ones after it.
+
+class Resample:
+    name = "resample"
+    columns = ()
+
+    def __init__(self, rate=TARGET_RATE):
+        self.rate = rate
+
+    def params(self):
+        return {"rate": self.rate}
+
+    def process(self, src, dst):
+        # scipy.signal takes most of a second to import; only stages that
+        # filter pay for it, not --help or a fully cached run.
+        from scipy import signal
+        info, data = open_wav(src)
+        g = gcd(self.rate, info.rate)
+        up, down = self.rate // g, info.rate // g
+        out_frames = -(-info.frames * up // down)
+        out = create_wav(dst, self.rate, 1, out_frames)
+
+        # Chunks start on multiples of `down` so every output sample has an
+        # exact input position; the padding absorbs the filter's edge effects.
+        step = max(down, CHUNK_FRAMES // down * down)
+        pad = -(-RESAMPLE_PAD // down) * down
+        for start in range(0, info.frames, step):
+            end = min(start + step, info.frames)
+            lo, hi = max(0, start - pad), min(info.frames, end + pad)
+            y = signal.resample_poly(_mono(data[lo:hi]), up, down)
+            first = (start - lo) * up // down
+            o_start = start * up // down
+            o_end = min(out_frames, -(-end * up // down))
+            out[o_start:o_end, 0] = y[first:first + o_end - o_start]
+        if out_frames:
+            out.flush()
+
+def _biquad_shelf(rate, gain_db=4.0, q=1 / np.sqrt(2), fc=1500.0):
+    a = 10 ** (gain_db / 40)
+    w0 = 2 * np.pi * fc / rate
+    alpha = np.sin(w0) / (2 * q)
+    cos = np.cos(w0)
+    b = [a * ((a + 1) + (a - 1) * cos + 2 * np.sqrt(a) * alpha),
+         -2 * a * ((a - 1) + (a + 1) * cos),
+         a * ((a + 1) + (a - 1) * cos - 2 * np.sqrt(a) * alpha)]
+    den = [(a + 1) - (a - 1) * cos + 2 * np.sqrt(a) * alpha,
+           2 * ((a - 1) - (a + 1) * cos),
+           (a + 1) - (a - 1) * cos - 2 * np.sqrt(a) * alpha]
+    return np.array(b) / den[0], np.array(den) / den[0]
+
+def _biquad_highpass(rate, q=0.5, fc=38.0):
+    w0 = 2 * np.pi * fc / rate
+    alpha = np.sin(w0) / (2 * q)
+    cos = np.cos(w0)
+    b = [(1 + cos) / 2, -(1 + cos), (1 + cos) / 2]
+    den = [1 + alpha, -2 * cos, 1 - alpha]
+    return np.array(b) / den[0], np.array(den) / den[0]
+
+def integrated_loudness(data, rate):
+    # ITU-R BS.1770 (K-weighting, 400 ms blocks at 75% overlap, absolute and
+    # relative gates), streamed: the filters carry their state across chunks
+    # and only per-100 ms energy sums are kept.
+    from scipy import signal
+    filters = [_biquad_shelf(rate), _biquad_highpass(rate)]
+    states = [np.zeros(2) for _ in filters]
+    hop = int(rate * 0.1)
+    energies, carry, peak = [], np.zeros(0, dtype=np.float64), 0.0
+    for start, end in _chunks(len(data)):
+        x = to_float(data[start:end, :1])[:, 0].astype(np.float64)
+        peak = max(peak, float(np.abs(x).max(initial=0)))
+        for i, (b, a) in enumerate(filters):
+            x, states[i] = signal.lfilter(b, a, x, zi=states[i])
+        x = np.concatenate([carry, x * x])
+        usable = len(x) // hop * hop
+        energies.append(x[:usable].reshape(-1, hop).sum(axis=1))
+        carry = x[usable:]
+
+    sub = np.concatenate(energies) if energies else np.zeros(0)
+    if len(sub) < 4:
+        return None, peak
+    blocks = np.lib.stride_tricks.sliding_window_view(sub, 4).sum(axis=1) / (4 * hop)
+    blocks = blocks[blocks > 0]
+    loud = -0.691 + 10 * np.log10(blocks)
+    gated = blocks[loud > -70]
+    if not len(gated):
+        return None, peak
+    relative = -0.691 + 10 * np.log10(gated.mean()) - 10
+    gated = gated[-0.691 + 10 * np.log10(gated) > relative]
+    return -0.691 + 10 * np.log10(gated.mean()), peak
+
+class Normalize:
+    name = "normalize"
+    columns = ()
+
+    def __init__(self, target=TARGET_LUFS):
+        self.target = target
+
+    def params(self):
+        return {"target": self.target, "ceiling": PEAK_CEILING}
+
+    def process(self, src, dst):
+        info, data = open_wav(src)
+        loudness, peak = integrated_loudness(data, info.rate)
+        gain = 1.0 if loudness is None else 10 ** ((self.target - loudness) / 20)
+        if peak > 0:
+            gain = min(gain, PEAK_CEILING / peak)
+
+        out = create_wav(dst, info.rate, 1, info.frames)
+        for start, end in _chunks(info.frames):
+            out[start:end] = to_float(data[start:end, :1]) * gain
+        if info.frames:
+            out.flush()
+
+class TrimSilence:
+    name = "trim"
+    columns = ()
+
+    def __init__(self, threshold_db=SILENCE_DB, pad=SILENCE_PAD):
+        self.threshold_db = threshold_db
+        self.pad = pad
+
+    def params(self):
+        return {"threshold_db": self.threshold_db, "pad": self.pad, "frame": FRAME_SECONDS}
+
+    def process(self, src, dst):
+        info, data = open_wav(src)
+        frame = max(1, int(info.rate * FRAME_SECONDS))
+        threshold = 10 ** (self.threshold_db / 20)
+        first = last = None
+        step = max(frame, CHUNK_FRAMES // frame * frame)
+        for start, end in _chunks(info.frames, step):
+            x = to_float(data[start:end, :1])[:, 0]
+            n = len(x) // frame
+            if n == 0:
+                continue
+            rms = np.sqrt((x[:n * frame].reshape(n, frame).astype(np.float64) ** 2).mean(axis=1))
+            loud = np.flatnonzero(rms > threshold)
+            if len(loud):
+                if first is None:
+                    first = start + loud[0] * frame
+                last = start + (loud[-1] + 1) * frame
+
+        if first is None:
+            first = last = 0
+        pad = int(self.pad * info.rate)
+        first, last = max(0, first - pad), min(info.frames, last + pad)
+
+        out = create_wav(dst, info.rate, 1, last - first)
+        for start, end in _chunks(last - first):
+            out[start:end] = to_float(data[first + start:first + end, :1])
+        if last > first:
+            out.flush()
+
+# Separation is off by default. A separator (vocal extraction, de-reverb, ...)
+# plugs in as --separator module:Class: the class needs the same name, params()
+# and process(src, dst) as the stages above, plus `columns`, the dataset CSV
+# columns it completes (e.g. ("Vocals_Extracted",)).
+def load_separator(spec):
+    if not spec or spec == "none":
+        return None
+    module, _, cls = spec.partition(":")
+    return getattr(importlib.import_module(module), cls)()
+
+def segment(src, out_dir, seconds=SEGMENT_SECONDS, min_seconds=MIN_SEGMENT_SECONDS):
+    info, data = open_wav(src)
+    length = int(seconds * info.rate)
+    shortest = int(min_seconds * info.rate)
+    written = 0
+    for i, start in enumerate(range(0, info.frames, length)):
+        chunk = data[start:start + length]
+        if len(chunk) < shortest:
+            break
+        write_pcm16(out_dir / f"seg_{i:03d}.wav", info.rate, chunk)
+        written += 1
+    return written
+
+# --- orchestration ----------------------------------------------------------
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def stage_key(parent, stage):
+    raw = json.dumps([parent, stage.name, stage.params()], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def build_stages(separator=None, rate=TARGET_RATE, target=TARGET_LUFS):
+    stages = [Resample(rate)]
+    if separator:
+        stages.append(separator)
+    stages += [Normalize(target), TrimSilence()]
+    return stages
+
+def process_song(task):
+    # Runs in a worker process. Each stage's output lives in the cache under a
+    # key chained from the input's content hash, so an unchanged song skips
+    # every stage and a changed one reruns from the first affected stage.
+    start = time.perf_counter()
+    stages = build_stages(load_separator(task['separator']), task['rate'], task['target'])
+    cache = Path(task['cache'])
+    src = Path(task['src'])
+    key = file_hash(src)
+    ran = []
+
+    for stage in stages:
+        key = stage_key(key, stage)
+        dst = cache / stage.name / f"{key}.wav"
+        if not dst.exists():
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dst.with_name(f"{key}.{os.getpid()}.tmp.wav")
+            stage.process(src, tmp)
+            os.replace(tmp, dst)
+            ran.append(stage.name)
+        src = dst
+
+    out_dir = Path(task['out'])
+    marker = out_dir / ".key"
+    seg_key = f"{key}:{SEGMENT_SECONDS}:{MIN_SEGMENT_SECONDS}"
+    if marker.exists() and marker.read_text() == seg_key:
+        segments = len(list(out_dir.glob("seg_*.wav")))
+    else:
+        if out_dir.exists():
+            shutil.rmtree(out_dir)
+        out_dir.mkdir(parents=True)
+        segments = segment(src, out_dir)
+        marker.write_text(seg_key)
+        ran.append("segment")
+
+    columns = [c for stage in stages for c in stage.columns]
+    return {"song_name": task['song_name'], "ran": ran, "segments": segments,
+            "columns": columns, "seconds": round(time.perf_counter() - start, 2)}
+
+def run(dataset_csv=DATASET_CSV, raw_folder=RAW_FOLDER, output_folder=OUTPUT_FOLDER, cache_folder=CACHE_FOLDER,
+        separator=None, workers=WORKERS, rate=TARGET_RATE, target=TARGET_LUFS):
+    songs = load_dataset(dataset_csv)
+    tasks, by_name = [], {}
+    for song in songs:
+        stem = song_stem(raw_folder, song)
+        wav = stem.parent / f"{stem.name}.wav"
+        if not wav.exists():
+            continue
+        tasks.append({
+            "song_name": song['song_name'], "src": str(wav), "out": str(song_stem(output_folder, song)),
+            "cache": cache_folder, "separator": separator, "rate": rate, "target": target,
+        })
+        by_name[song['song_name']] = song
+
+    print(f"Processing {len(tasks)} of {len(songs)} songs with {workers} workers")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {pool.submit(process_song, task): task for task in tasks}
+        for future in as_completed(futures):
+            task = futures[future]
+            song = by_name[task['song_name']]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f" failed: {task['song_name']} | {e}")
+                update_dataset(dataset_csv, song, Notes=f"preprocess: {e}")
+                continue
+            stages = ", ".join(result['ran']) or "cached"
+            print(f" done: {result['song_name']} | {result['segments']} segments | {stages} | {result['seconds']}s")
+            if result['columns']:
+                update_dataset(dataset_csv, song, **{c: 'Yes' for c in result['columns']})
+
+    print(f"\nFinished in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", default=DATASET_CSV)
+    parser.add_argument("--raw", default=RAW_FOLDER)
+    parser.add_argument("--output", default=OUTPUT_FOLDER)
+    parser.add_argument("--cache", default=CACHE_FOLDER)
+    parser.add_argument("--separator", default="none", help="separation stage as module:Class")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--rate", type=int, default=TARGET_RATE)
+    parser.add_argument("--lufs", type=float, default=TARGET_LUFS)
+    args = parser.parse_args()
+    run(args.dataset, args.raw, args.output, args.cache, args.separator, args.workers, args.rate, args.lufs)
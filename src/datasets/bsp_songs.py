@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import json
 
@@ -47,7 +48,7 @@ spb_songs_data = [
 ]
 
 
-def save_dataset():
+def save_dataset(file_name="rawdata/spb_rvc_training_dataset.csv"):
     df = pd.DataFrame(spb_songs_data)
     
     df['Downloaded'] = 'No'        
@@ -55,7 +56,6 @@ def save_dataset():
     df['DeReverbed'] = 'No'        
     df['Notes'] = ''               
 
-    file_name = "rawdata/spb_rvc_training_dataset.csv"
     df.to_csv(file_name, index=False)
     
     print(f" Success! Dataset saved as '{file_name}'")
@@ -63,4 +63,6 @@ def save_dataset():
     print("\nPreview of the first 5 rows:")
     print(df.head())
 if __name__=="__main__":
-  save_dataset()
\ No newline at end of file
+  parser = argparse.ArgumentParser(description="Write the SPB song list as the download dataset CSV")
+  parser.add_argument("-o", "--output", default="rawdata/spb_rvc_training_dataset.csv")
+  save_dataset(parser.parse_args().output)
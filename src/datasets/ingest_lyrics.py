@@ -0,0 +1,285 @@
+import argparse
+import csv
+import hashlib
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from xml.etree import ElementTree
+import openpyxl
+
+# External lyrics dumps, as downloaded. Missing ones are skipped.
+SOURCES = (
+    "rawdata/telugu-lyrics.zip",
+    "rawdata/telugu-lyrics/telugu_lyrics.xlsx",
+    "rawdata/kaggle_data/kaggle_dataset.csv",
+)
+OUTPUT_CSV = "rawdata/external_lyrics.csv"
+# Same columns as extracted_data.csv, so build_corpus and corpus_store read
+# the output unchanged.
+FIELDS = ("movie_name", "song_name", "lyrics")
+WORKERS = os.cpu_count() or 2
+SONG_NAME_WORDS = 5
+
+# Header spellings seen in the dumps, per output column.
+COLUMN_ALIASES = {
+    "movie_name": ("movie_name", "movie", "movie_album", "film", "album"),
+    "song_name": ("song_name", "song", "song_title", "title"),
+    "lyrics": ("lyrics", "telugu_lyrics", "final_lyrics", "text"),
+    "lyricist": ("lyricist", "writer", "lyrics_by"),
+}
+
+# Lines above the pallavi that aren't lyrics: credits ("Director: ...",
+# "గానం : జానకి"), and labels for a section or a singer ("పల్లవి:",
+# "అ: ప: దేవుడే ..."), which are dropped from the front of a line.
+CREDIT_RE = re.compile(r'^(director|music|singers?|lyrics|lyricist|producer|cast|starring|banner|movie|film|album|written'
+                       r'|గానం|గాయకులు|గాయని|సంగీతం|రచన|సాహిత్యం|దర్శకత్వం|చిత్రం)(?=[\s:.-]|$)', re.I)
+TITLE_LABEL_RE = re.compile(r'^(song|title|పాట)\s*:\s*', re.I)
+LINE_LABEL_RE = re.compile(r'^([^\s:]+\s*:\s*)+')
+
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+def _columns(header):
+    names = [re.sub(r'\W+', '_', str(h or '').strip().lower()) for h in header]
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                columns[field] = names.index(alias)
+                break
+    return columns
+
+def _name(text):
+    # extracted_data.csv style: "aadavari matalaku" -> "Aadavari_Matalaku".
+    return "_".join(p[:1].upper() + p[1:] for p in re.split(r'[\s_]+', str(text).strip()) if p)
+
+def _song_name(lyrics):
+    # The xlsx dump has no titles; Telugu film songs are known by the opening
+    # words of the pallavi, which is also what the scrapers search for.
+    # A "Song: ..." line names it outright.
+    for line in lyrics.splitlines():
+        line = line.strip()
+        if not line or CREDIT_RE.match(line):
+            continue
+        titled = TITLE_LABEL_RE.match(line)
+        line = line[titled.end():] if titled else LINE_LABEL_RE.sub("", line)
+        # "Konte Chuputo :" or "ఓ మనసా... : ఓ మనసా" - the name ends at the colon.
+        line = line.split(":")[0]
+        if line.strip(" .-"):
+            return _name(" ".join(line.split()[:SONG_NAME_WORDS]))
+    return ""
+
+def normalize(values, columns, lyricist=None):
+    # One source row -> {movie_name, song_name, lyrics}, or None to drop it.
+    def get(field):
+        i = columns.get(field)
+        value = values[i] if i is not None and i < len(values) else None
+        return "" if value is None else str(value).strip()
+
+    lyrics = get("lyrics").replace("\r\n", "\n")
+    if not lyrics:
+        return None
+    if lyricist and lyricist.lower() not in get("lyricist").lower():
+        return None
+    return {
+        "movie_name": _name(get("movie_name")),
+        "song_name": _name(get("song_name")) or _song_name(lyrics),
+        "lyrics": lyrics,
+    }
+
+# --- planning ---------------------------------------------------------------
+# A task is one CSV or one sheet of one workbook, either on disk or as a member
+# of a zip that is never extracted. Sheets aren't split further: openpyxl has
+# to parse every row before min_row to reach a range, so row-range chunks
+# would each re-read the sheet up to their start.
+
+def _open(task):
+    if task["member"]:
+        archive = zipfile.ZipFile(task["path"])
+        return archive, archive.open(task["member"])
+    return None, open(task["path"], "rb")
+
+def _sheet_names(path, member):
+    # Straight from xl/workbook.xml: load_workbook would first read the whole
+    # shared strings table, which for a lyrics sheet is nearly all its text.
+    archive, f = _open({"path": path, "member": member})
+    try:
+        with zipfile.ZipFile(f) as book:
+            root = ElementTree.fromstring(book.read("xl/workbook.xml"))
+        return [e.get("name") for e in root.iter() if e.tag.rsplit("}", 1)[-1] == "sheet"]
+    finally:
+        f.close()
+        if archive:
+            archive.close()
+
+def plan(paths=SOURCES):
+    tasks = []
+    for path in map(Path, paths):
+        if not path.is_file():
+            continue
+        if path.suffix == ".zip":
+            with zipfile.ZipFile(path) as archive:
+                members = [m for m in archive.namelist() if not m.endswith("/")]
+        else:
+            members = [None]
+        for member in members:
+            suffix = Path(member or path).suffix.lower()
+            if suffix in (".xlsx", ".xlsm"):
+                tasks += [{"path": str(path), "member": member, "kind": "xlsx", "sheet": name}
+                          for name in _sheet_names(str(path), member)]
+            elif suffix == ".csv":
+                tasks.append({"path": str(path), "member": member, "kind": "csv"})
+    return tasks
+
+def describe(task):
+    where = f"{task['path']}:{task['member']}" if task["member"] else task["path"]
+    return f"{where}[{task['sheet']}]" if task["kind"] == "xlsx" else where
+
+# --- workers ----------------------------------------------------------------
+
+def _xlsx_rows(f, task):
+    # read_only streams the sheet XML row by row instead of building every
+    # cell of the workbook in memory first.
+    workbook = openpyxl.load_workbook(f, read_only=True)
+    try:
+        yield from workbook[task["sheet"]].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def _csv_rows(f):
+    yield from csv.reader(io.TextIOWrapper(f, encoding="utf-8-sig", newline=""))
+
+def task_rows(task, lyricist=None, stats=None):
+    # (movie_name, song_name, lyrics) for every usable row of one task;
+    # stats, if given, gets the source row count and whether it had lyrics.
+    stats = stats if stats is not None else {}
+    stats.update(read=0, usable=False)
+    archive, f = _open(task)
+    try:
+        source = _xlsx_rows(f, task) if task["kind"] == "xlsx" else _csv_rows(f)
+        columns = _columns(next(source, ()))
+        stats["usable"] = "lyrics" in columns
+        if not stats["usable"]:
+            return
+        for values in source:
+            stats["read"] += 1
+            row = normalize(values, columns, lyricist)
+            if row:
+                yield row["movie_name"], row["song_name"], row["lyrics"]
+    finally:
+        f.close()
+        if archive:
+            archive.close()
+
+def ingest_task(task, part, lyricist=None):
+    # Pool worker: streams one task into its own part file, so no process
+    # ever holds a whole sheet however large it is.
+    start = time.perf_counter()
+    stats = {"task": describe(task), "part": part}
+    with open(part, "w", newline="", encoding="utf-8") as out:
+        csv.writer(out).writerows(task_rows(task, lyricist, stats))
+    stats.update(seconds=time.perf_counter() - start, peak_mb=_peak_rss_mb())
+    return stats
+
+def _ingest(args):
+    return ingest_task(*args)
+
+def _inline(task, lyricist):
+    stats = {"task": describe(task)}
+    return stats, task_rows(task, lyricist, stats)
+
+def _read_part(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.reader(f)
+    os.remove(path)
+
+# --- run --------------------------------------------------------------------
+
+def _key(movie, lyrics):
+    text = " ".join(lyrics.split())
+    return hashlib.sha1(f"{movie.lower()}\0{text}".encode("utf-8")).digest()
+
+def run(paths=SOURCES, output=OUTPUT_CSV, workers=WORKERS, lyricist=None):
+    tasks = plan(paths)
+    if not tasks:
+        raise SystemExit(f"No spreadsheets or CSVs found in: {', '.join(map(str, paths))}")
+    workers = max(1, min(workers, len(tasks)))
+    print(f"Ingesting {len(tasks)} sheets/files with {workers} worker{'s' if workers > 1 else ''}")
+
+    start = time.perf_counter()
+    read = written = duplicates = 0
+    peaks = []
+    seen = set()
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{output}.tmp"
+    parts = tempfile.mkdtemp(prefix="ingest-", dir=Path(output).parent)
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        if pool:
+            # map() hands results back in task order, so the output is the
+            # same however the work was scheduled.
+            jobs = [(task, os.path.join(parts, f"{i:05d}.csv"), lyricist) for i, task in enumerate(tasks)]
+            stream = ((stats, _read_part(stats["part"])) for stats in pool.map(_ingest, jobs))
+        else:
+            # One worker: rows go straight to the output, no part files.
+            stream = (_inline(task, lyricist) for task in tasks)
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("",) + FIELDS)
+            for stats, rows in stream:
+                task_start = time.perf_counter()
+                new = 0
+                for movie, song, lyrics in rows:
+                    # The zip and the extracted xlsx are the same workbook.
+                    key = _key(movie, lyrics)
+                    if key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(key)
+                    writer.writerow((written, movie, song, lyrics))
+                    written += 1
+                    new += 1
+                seconds = stats.get("seconds", time.perf_counter() - task_start)
+                read += stats["read"]
+                peaks.append(stats.get("peak_mb"))
+                note = "" if stats["usable"] else " (no lyrics column, skipped)"
+                print(f" {stats['task']}: {stats['read']} rows, {new} new in {seconds:.2f}s{note}")
+        os.replace(tmp, output)
+    finally:
+        if pool:
+            pool.shutdown()
+        shutil.rmtree(parts, ignore_errors=True)
+
+    seconds = time.perf_counter() - start
+    worker_peak = max((p for p in peaks if p is not None), default=None)
+    parent_peak = _peak_rss_mb()
+    print(f"\n{written} songs -> {output} ({duplicates} duplicates dropped)")
+    print(f"{read} rows in {seconds:.2f}s = {read / seconds:.0f} rows/s")
+    if parent_peak is not None:
+        workers_note = f", {worker_peak:.0f} MB largest worker" if worker_peak is not None else ""
+        print(f"Peak RSS: {parent_peak:.0f} MB main{workers_note}")
+    return {"read": read, "written": written, "duplicates": duplicates, "seconds": seconds,
+            "peak_mb": parent_peak, "worker_peak_mb": worker_peak}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream external lyrics dumps (zip/xlsx/csv) into the extracted_data.csv schema")
+    parser.add_argument("sources", nargs="*", default=list(SOURCES), help=".zip, .xlsx or .csv files")
+    parser.add_argument("-o", "--output", default=OUTPUT_CSV)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="worker processes, one sheet or file each (1 = in this process)")
+    parser.add_argument("--lyricist", help='keep only rows whose lyricist matches, e.g. "Sirivennala"')
+    args = parser.parse_args()
+    run(args.sources, args.output, args.workers, args.lyricist)
@@ -0,0 +1,173 @@
+import queue
+import threading
+import logging
+from contextlib import contextmanager
+from selenium.common.exceptions import WebDriverException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+POOL_SIZE = 4
+MAX_RESTARTS = 2
+READY_TIMEOUT = 10
+
+# Nothing the scrapers read lives in these; skipping them is most of a page load.
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.css", "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*doubleclick.net*", "*googlesyndication.com*", "*google-analytics.com*", "*googletagmanager.com*",
+]
+BLOCKING_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.stylesheets": 2,
+    "profile.managed_default_content_settings.fonts": 2,
+}
+
+log = logging.getLogger(__name__)
+
+def blocking_options(options):
+    options.add_experimental_option("prefs", BLOCKING_PREFS)
+    # Hand control back at DOMContentLoaded; wait_ready() decides the rest.
+    options.page_load_strategy = "eager"
+    return options
+
+def block_resources(driver):
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    except WebDriverException as e:
+        log.warning(f"Resource blocking unavailable: {e}")
+
+def wait_ready(driver, timeout=READY_TIMEOUT, condition=None):
+    # Replaces the fixed sleep after driver.get(): returns as soon as the DOM is
+    # usable (and `condition` holds, if given), or quietly after `timeout`.
+    def ready(d):
+        state = d.execute_script("return document.readyState")
+        return state in ("interactive", "complete") and (condition is None or condition(d))
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(ready)
+        return True
+    except TimeoutException:
+        return False
+
+def is_alive(driver):
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+class BrowserPool:
+    # driver_factory returns a ready browser, resource blocking included
+    # (see StealthDeepScraper._setup_driver); the pool doesn't set it up again.
+    def __init__(self, driver_factory, size=POOL_SIZE, max_restarts=MAX_RESTARTS):
+        self.driver_factory = driver_factory
+        self.size = size
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        # undetected_chromedriver patches its binary on start; two workers doing
+        # that at once corrupt it, so launches are serialized.
+        self._start_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._idle_lock = threading.Lock()
+
+    def _start(self):
+        with self._start_lock:
+            return self.driver_factory()
+
+    def _restarted(self):
+        with self._idle_lock:
+            self.restarts += 1
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def driver(self):
+        # Checkout for callers that aren't a batch of items (the resolver): an
+        # idle browser if there is one, a new one while under `size`, else wait.
+        # A browser that died while checked out is quit instead of returned.
+        self._slots.acquire()
+        driver = None
+        try:
+            with self._idle_lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                driver = self._start()
+            yield driver
+        finally:
+            if driver is not None:
+                if is_alive(driver):
+                    with self._idle_lock:
+                        self._idle.append(driver)
+                else:
+                    self._restarted()
+                    self._quit(driver)
+            self._slots.release()
+
+    def close(self):
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._quit(driver)
+
+    def map(self, handler, items, on_result=None):
+        # handler(driver, item) runs on a worker's own browser. Results come
+        # back in input order; an item whose handler raised holds the exception.
+        jobs = queue.Queue()
+        for i, item in enumerate(items):
+            jobs.put((i, item, 0))
+        results = [None] * len(items)
+
+        workers = [
+            threading.Thread(target=self._work, args=(handler, jobs, results, on_result), daemon=True)
+            for _ in range(min(self.size, len(items)))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return results
+
+    def _work(self, handler, jobs, results, on_result):
+        driver = None
+        try:
+            while True:
+                try:
+                    i, item, tries = jobs.get_nowait()
+                except queue.Empty:
+                    return
+
+                if driver is None:
+                    try:
+                        driver = self._start()
+                    except Exception as e:
+                        log.error(f"Browser failed to start: {e}")
+                        results[i] = e
+                        if on_result:
+                            on_result(i, item, e)
+                        continue
+
+                try:
+                    result = handler(driver, item)
+                except Exception as e:
+                    result = e
+                    if not is_alive(driver):
+                        # The browser died under this item: replace it, and
+                        # give the item another go on the fresh one.
+                        log.warning(f"Browser crashed ({type(e).__name__}), restarting")
+                        self._restarted()
+                        self._quit(driver)
+                        driver = None
+                        if tries < self.max_restarts:
+                            jobs.put((i, item, tries + 1))
+                            continue
+
+                results[i] = result
+                if on_result:
+                    on_result(i, item, result)
+        finally:
+            if driver is not None:
+                self._quit(driver)
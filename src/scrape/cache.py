@@ -0,0 +1,106 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+CACHE_PATH = ".cache/http_cache.sqlite"
+CACHE_TTL = 30 * 24 * 3600
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES, offline=False):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Scrapers call in from worker threads, so one connection is shared
+        # behind a lock rather than opened per thread.
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+        self._db.commit()
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def key(*parts):
+        # Content-addressed: the same method/URL/payload always lands on the
+        # same row, whichever scraper asked for it.
+        raw = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT body, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            body, created = row
+            # Offline replays never expire: a stale answer beats no answer.
+            if not self.offline and self.ttl and now - created > self.ttl:
+                self._delete(key)
+                self._db.commit()
+                self.stats['misses'] += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.stats['hits'] += 1
+        return zlib.decompress(body)
+
+    def put(self, key, body):
+        if self.offline:
+            return
+        blob = zlib.compress(body)
+        now = time.time()
+        with self._lock:
+            self._delete(key)
+            self._db.execute(
+                "INSERT INTO responses (key, body, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+            self._total += len(blob)
+            if self.max_bytes and self._total > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+            self._db.commit()
+
+    def get_json(self, key):
+        body = self.get(key)
+        return None if body is None else json.loads(body)
+
+    def put_json(self, key, data):
+        self.put(key, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    def _delete(self, key):
+        row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total -= row[0]
+
+    def _evict(self, target):
+        # Least recently used first, until the store is back under target.
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall()
+        for key, size in rows:
+            if self._total <= target:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total -= size
+            self.stats['evicted'] += 1
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,154 @@
+import os
+import subprocess
+import time
+import json
+import glob
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from utils.dataset_csv import song_stem as output_stem, update_dataset
+
+BASE_FOLDER = "SPB_Dataset_Raw"
+FETCH_WORKERS = 4
+TRANSCODE_WORKERS = os.cpu_count() or 2
+
+def wav_path(stem):
+    return stem.parent / f"{stem.name}.wav"
+
+def search_query(song):
+    return f"{song['song_name']} {song['movie_name']} telugu song high quality audio"
+
+class DownloadManager:
+    # Fetching (network bound) and WAV transcoding (CPU bound) run on separate
+    # bounded pools, so one song converts while the next ones download.
+    def __init__(self, base_folder=BASE_FOLDER, dataset_csv=None,
+                 fetch_workers=FETCH_WORKERS, transcode_workers=TRANSCODE_WORKERS):
+        self.base_folder = Path(base_folder)
+        self.base_folder.mkdir(parents=True, exist_ok=True)
+        self.archive = str(self.base_folder / "download_archive.txt")
+        self.dataset_csv = dataset_csv
+        self.fetch_workers = fetch_workers
+        self.transcode_workers = transcode_workers
+        self.timings = []
+
+    def _ydl_opts(self, stem):
+        return {
+            'format': 'bestaudio/best',
+            'outtmpl': f"{stem}.%(ext)s",
+            'default_search': 'ytsearch1',
+            'noplaylist': True,
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            # Finished ids are skipped on reruns; .part files are resumed.
+            'download_archive': self.archive,
+            'continuedl': True,
+        }
+
+    def _fetch(self, song):
+        # Imported on first fetch, so a run with nothing left to download
+        # never loads yt-dlp's hundreds of extractors.
+        import yt_dlp
+        stem = output_stem(self.base_folder, song)
+        stem.parent.mkdir(parents=True, exist_ok=True)
+        source = song.get('url') or search_query(song)
+
+        with yt_dlp.YoutubeDL(self._ydl_opts(stem)) as ydl:
+            info = ydl.extract_info(source, download=True)
+
+        entry = info
+        if info and 'entries' in info:
+            entries = [e for e in info['entries'] if e]
+            entry = entries[0] if entries else None
+
+        if entry:
+            downloads = entry.get('requested_downloads') or []
+            if downloads and downloads[0].get('filepath'):
+                return Path(downloads[0]['filepath'])
+            return Path(ydl.prepare_filename(entry))
+
+        # Skipped as already archived: pick up a download whose conversion
+        # never finished, if one is lying around.
+        leftovers = [p for p in stem.parent.glob(f"{glob.escape(stem.name)}.*") if p.suffix not in ('.wav', '.part')]
+        return leftovers[0] if leftovers else None
+
+    def _transcode(self, src, stem):
+        wav = wav_path(stem)
+        if src.suffix == '.wav':
+            os.replace(src, wav)
+            return wav
+        tmp = stem.parent / f"{stem.name}.tmp.wav"
+        subprocess.run(
+            ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", str(src), "-vn", "-c:a", "pcm_s16le", str(tmp)],
+            check=True,
+        )
+        os.replace(tmp, wav)
+        src.unlink(missing_ok=True)
+        return wav
+
+    def _finish(self, song, timing, status, note=""):
+        timing['status'] = status
+        timing['total_s'] = round(time.perf_counter() - timing.pop('_start'), 3)
+        self.timings.append(timing)
+        if self.dataset_csv:
+            update_dataset(self.dataset_csv, song, Downloaded='Yes' if status == 'done' else 'No', Notes=note)
+        mark = "" if status == 'done' else f" | {note}"
+        print(f" {status}: {song['song_name']} (fetch {timing['fetch_s']}s, transcode {timing['transcode_s']}s){mark}")
+
+    def _pending(self, songs):
+        todo = []
+        for song in songs:
+            if song.get('Downloaded') == 'Yes' and wav_path(output_stem(self.base_folder, song)).exists():
+                continue
+            todo.append(song)
+        return todo
+
+    def run(self, songs):
+        todo = self._pending(songs)
+        print(f"⬇️  {len(todo)} to download ({len(songs) - len(todo)} already done)")
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(self.fetch_workers) as fetch_pool, \
+                ThreadPoolExecutor(self.transcode_workers) as transcode_pool:
+            pending = {}
+            for song in todo:
+                timing = {'song_name': song['song_name'], 'fetch_s': 0.0, 'transcode_s': 0.0, '_start': time.perf_counter()}
+                pending[fetch_pool.submit(self._timed, self._fetch, song)] = ('fetch', song, timing)
+
+            # A finished download is handed to the transcode pool straight away,
+            # so conversions overlap with the downloads still in flight.
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, song, timing = pending.pop(future)
+                    try:
+                        result, timing[f'{stage}_s'] = future.result()
+                    except Exception as e:
+                        self._finish(song, timing, 'failed', f"{stage}: {e}")
+                        continue
+
+                    if stage == 'transcode':
+                        self._finish(song, timing, 'done')
+                        continue
+
+                    stem = output_stem(self.base_folder, song)
+                    if result is not None:
+                        pending[transcode_pool.submit(self._timed, self._transcode, result, stem)] = ('transcode', song, timing)
+                    elif wav_path(stem).exists():
+                        self._finish(song, timing, 'done')
+                    else:
+                        self._finish(song, timing, 'failed', "no result")
+
+        elapsed = time.perf_counter() - start
+        done = sum(t['status'] == 'done' for t in self.timings)
+        print(f"\nFinished {done}/{len(todo)} in {elapsed:.1f}s")
+        return self.timings
+
+    @staticmethod
+    def _timed(fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        return result, round(time.perf_counter() - start, 3)
+
+    def write_report(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.timings, f, indent=2)
@@ -0,0 +1,55 @@
+from lxml import html as lxml_html
+from utils.telugu_text import count_telugu_chars
+
+MIN_TELUGU_CHARS = 30
+CANDIDATE_TAGS = ('div', 'article', 'p')
+DROP_TAGS = ('script', 'style', 'header', 'footer', 'nav', 'aside', 'iframe')
+
+UTF8_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+def parse(page):
+    if isinstance(page, bytes):
+        return lxml_html.document_fromstring(page, parser=UTF8_PARSER)
+    return lxml_html.document_fromstring(page)
+
+def _strings(elem):
+    # Same strings, in the same order, that BeautifulSoup's get_text() yields:
+    # element text and tails, but never the body of a comment.
+    stack = [(elem, False)]
+    while stack:
+        node, is_tail = stack.pop()
+        if is_tail:
+            if node.tail:
+                yield node.tail
+            continue
+        if isinstance(node.tag, str) and node.text:
+            yield node.text
+        for child in reversed(node):
+            stack.append((child, True))
+            stack.append((child, False))
+
+def best_block(root, candidates=CANDIDATE_TAGS, drop=DROP_TAGS, min_chars=MIN_TELUGU_CHARS):
+    for elem in list(root.iter(*drop)):
+        elem.drop_tree()
+
+    # One bottom-up pass: every text node is scanned once and its Telugu count
+    # is added to each ancestor, instead of re-serialising every candidate.
+    nodes = list(root.iter())
+    counts = {}
+    for node in reversed(nodes):
+        score = count_telugu_chars(node.text) if isinstance(node.tag, str) else 0
+        for child in node:
+            score += counts[child] + count_telugu_chars(child.tail)
+        counts[node] = score
+
+    best, max_score = None, 0
+    for node in root.iter(*candidates):
+        if counts[node] > max_score:
+            best, max_score = node, counts[node]
+
+    if max_score < min_chars:
+        return None
+    return '\n'.join(_strings(best))
+
+def extract_block(page, candidates=CANDIDATE_TAGS, drop=DROP_TAGS, min_chars=MIN_TELUGU_CHARS):
+    return best_block(parse(page), candidates, drop, min_chars)
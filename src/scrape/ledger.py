@@ -0,0 +1,110 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+LEDGER_PATH = ".cache/ledger.sqlite"
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = 300
+MAX_BACKOFF = 24 * 3600
+
+class JobLedger:
+    def __init__(self, scraper, path=LEDGER_PATH, max_attempts=MAX_ATTEMPTS, backoff=RETRY_BACKOFF):
+        self.scraper = scraper
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                scraper TEXT NOT NULL,
+                song TEXT NOT NULL,
+                movie TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                source_url TEXT,
+                output_path TEXT,
+                next_attempt REAL NOT NULL DEFAULT 0,
+                updated REAL NOT NULL,
+                PRIMARY KEY (scraper, song, movie)
+            )
+        """)
+        self._db.commit()
+
+    def pending(self, rows, song_key='song_name', movie_key='movie_album'):
+        # One query for the whole ledger, then a dict lookup per row: resuming
+        # a 1000-song run costs milliseconds rather than a round-trip per song.
+        now = time.time()
+        with self._lock:
+            jobs = {
+                (song, movie): (status, attempts, next_attempt)
+                for song, movie, status, attempts, next_attempt in self._db.execute(
+                    "SELECT song, movie, status, attempts, next_attempt FROM jobs WHERE scraper = ?",
+                    (self.scraper,),
+                )
+            }
+
+        todo = []
+        for row in rows:
+            job = jobs.get((row[song_key], row[movie_key]))
+            if job is None:
+                todo.append(row)
+                continue
+            status, attempts, next_attempt = job
+            if status == 'done':
+                continue
+            if attempts >= self.max_attempts or next_attempt > now:
+                continue
+            todo.append(row)
+        return todo
+
+    def complete(self, song, movie, source_url="", output_path=""):
+        with self._lock:
+            self._record(song, movie, 'done', None, source_url, str(output_path), 0)
+
+    def fail(self, song, movie, error):
+        # Read and write under one lock: the resolver's song workers can fail
+        # the same song at once, and each failure must see the last one's count.
+        with self._lock:
+            attempts = self._attempts(song, movie) + 1
+            delay = min(self.backoff * 2 ** (attempts - 1), MAX_BACKOFF)
+            self._record(song, movie, 'failed', error, None, None, time.time() + delay)
+
+    def summary(self):
+        with self._lock:
+            return dict(self._db.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE scraper = ? GROUP BY status",
+                (self.scraper,),
+            ).fetchall())
+
+    # _attempts and _record expect the caller to hold self._lock.
+    def _attempts(self, song, movie):
+        row = self._db.execute(
+            "SELECT attempts FROM jobs WHERE scraper = ? AND song = ? AND movie = ?",
+            (self.scraper, song, movie),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _record(self, song, movie, status, error, source_url, output_path, next_attempt):
+        # Committed immediately so the ledger is consistent at any kill point.
+        self._db.execute("""
+            INSERT INTO jobs (scraper, song, movie, status, attempts, last_error, source_url, output_path, next_attempt, updated)
+            VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?)
+            ON CONFLICT (scraper, song, movie) DO UPDATE SET
+                status = excluded.status,
+                attempts = jobs.attempts + 1,
+                last_error = excluded.last_error,
+                source_url = COALESCE(excluded.source_url, jobs.source_url),
+                output_path = COALESCE(excluded.output_path, jobs.output_path),
+                next_attempt = excluded.next_attempt,
+                updated = excluded.updated
+        """, (self.scraper, song, movie, status, error, source_url, output_path, next_attempt, time.time()))
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
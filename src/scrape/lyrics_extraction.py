@@ -1,20 +1,33 @@
 import requests
 import json
-from bs4 import BeautifulSoup
 import csv
 import time
-import re
+import threading
 import logging
+from functools import partial
 from pathlib import Path
 from dataclasses import dataclass
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 load_dotenv()
 import os
+import argparse
+from scrape.rate_limit import HostRateLimiter, MAX_ATTEMPTS, RETRY_STATUSES, backoff, retry_after
+from scrape.cache import ResponseCache, CACHE_PATH
+from scrape.ledger import JobLedger, LEDGER_PATH
+from scrape.title_index import TitleIndex
+from scrape.html_extract import parse, best_block
+from scrape.metrics import Metrics, NULL_METRICS, METRICS_DIR
+from scrape.query_planner import QueryPlanner, SearchIndex, INDEX_PATH, BATCH_SIZE, MOVIE_RESULTS
+from scrape import sink as sinks
+from utils import telugu_text
 SERPER_API_KEY=os.getenv("SERPER_API_KEY")
 OUTPUT_DIR = "lyrics_serper_tape"
-REQUEST_DELAY = 1.0
+SERPER_URL = "https://google.serper.dev/search"
 MIN_TELUGU_CHARS = 30 
+MAX_WORKERS = 16
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 log = logging.getLogger(__name__)
@@ -25,40 +38,130 @@ class LyricsResult:
     lyrics: str = ""
     source: str = ""
     url: str = ""
+    reason: str = ""
 
 class LyricstapeSerperScraper:
-    def __init__(self, api_key):
+    def __init__(self, api_key, workers=1, cache=None, ledger=None, title_index=None, metrics=None, search_url=SERPER_URL, sink=None, search_index=None, batch_size=BATCH_SIZE, movie_results=MOVIE_RESULTS):
         self.api_key = api_key
+        self.sink = sink
+        self.search_url = search_url
+        self.metrics = metrics or NULL_METRICS
+        self.title_index = title_index
+        self.workers = workers
+        self.cache = cache
+        self.ledger = ledger
+        self.network_calls = 0
+        # Bumped from every worker thread.
+        self._calls_lock = threading.Lock()
         self.output_dir = Path(OUTPUT_DIR)
         self.output_dir.mkdir(exist_ok=True)
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
+        self.session = self._setup_session()
+        # Serial runs share the limiter too: it replaces the old fixed
+        # one-second sleep between songs.
+        self.limiter = HostRateLimiter()
+        # With a search index, searches are planned per movie and batched up
+        # front (see query_planner); without one, one search per song.
+        self.planner = None
+        if search_index is not None:
+            self.planner = QueryPlanner(self.search_batch, search_index, batch_size, movie_results, metrics=self.metrics)
+
+    def _setup_session(self):
+        # One keep-alive pool shared by every worker thread; sized so that no
+        # worker ever has to open a throwaway connection.
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(self.workers, 10))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _fetch(self, method, url, stage="page", check=None, **kwargs):
+        # Returns the response body, or None for a non-200 / offline miss.
+        # The API key lives in the headers, so it is kept out of the cache key.
+        # `check` runs before every attempt and may raise to stop early.
+        key = None
+        if self.cache:
+            key = self.cache.key(method, url, kwargs.get("data"))
+            body = self.cache.get(key)
+            if body is not None:
+                self.metrics.inc("requests", kind=stage, status="cached")
+                return body
+            if self.cache.offline:
+                self.metrics.inc("requests", kind=stage, status="offline_miss")
+                return None
+
+        # 429/5xx and dropped connections are retried with jittered backoff;
+        # every outcome is fed back so the limiter can speed up or back off.
+        for attempt in range(MAX_ATTEMPTS):
+            if self.limiter:
+                with self.metrics.timer("throttle"):
+                    self.limiter.wait(url)
+            if check:
+                check()
+            with self._calls_lock:
+                self.network_calls += 1
+            start = time.monotonic()
+            try:
+                with self.metrics.timer("http", kind=stage):
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if self.limiter:
+                    self.limiter.feedback(url, None)
+                self.metrics.inc("requests", kind=stage, status="connection_error")
+                if attempt + 1 == MAX_ATTEMPTS:
+                    raise
+                with self.metrics.timer("backoff"):
+                    time.sleep(backoff(attempt))
+                continue
+
+            status = response.status_code
+            if self.limiter:
+                self.limiter.feedback(url, status, time.monotonic() - start, retry_after(response.headers.get("Retry-After")))
+            self.metrics.inc("requests", kind=stage, status=status)
+            if status not in RETRY_STATUSES or attempt + 1 == MAX_ATTEMPTS:
+                break
+            with self.metrics.timer("backoff"):
+                time.sleep(backoff(attempt))
+
+        if response.status_code != 200:
+            return None
+
+        if self.cache:
+            self.cache.put(key, response.content)
+        return response.content
 
     def is_telugu(self, text):
-        return bool(re.search(r'[\u0C00-\u0C7F]', text))
+        return telugu_text.is_telugu(text)
 
     def count_telugu_chars(self, text):
-        return len(re.findall(r'[\u0C00-\u0C7F]', text))
+        return telugu_text.count_telugu_chars(text)
 
     def clean_text(self, text):
-        if not text: return ""
-        lines = [line.strip() for line in text.split('\n')]
-        cleaned = []
-        for line in lines:
-            if not line: continue
-            
-            low = line.lower()
-            if any(x in low for x in ['home', 'movie', 'review', 'rating', 'whatsapp', 'share', 'tweet', 'pin it']):
-                continue
-            
-            if self.is_telugu(line):
-                cleaned.append(line)
-                
-        return '\n'.join(cleaned)
+        return telugu_text.clean_text(text, telugu_text.SERPER_BLOCKLIST, telugu_only=True)
+
+    def search_batch(self, payloads):
+        # Serper's batch form: a JSON list of queries, answered with a list
+        # of responses in the same order.
+        headers = {
+            'X-API-KEY': self.api_key,
+            'Content-Type': 'application/json'
+        }
+        try:
+            body = self._fetch("POST", self.search_url, stage="search", headers=headers, data=json.dumps(payloads))
+            if body is None:
+                return None
+            data = json.loads(body)
+            return data if isinstance(data, list) else [data]
+        except Exception as e:
+            log.error(f"Search Request Error: {e}")
+            return None
 
     def get_lyricstape_urls(self, song, movie):
-        url = "https://google.serper.dev/search"
+        if self.planner:
+            return self.planner.urls(song, movie)
+        url = self.search_url
         
         query = f"site:lyricstape.com {song} {movie} lyrics"
         
@@ -75,11 +178,11 @@ class LyricstapeSerperScraper:
         }
 
         try:
-            response = requests.request("POST", url, headers=headers, data=payload)
-            if response.status_code != 200:
-                return []
+            body = self._fetch("POST", url, stage="search", headers=headers, data=payload)
+            if body is None:
+                return None
                 
-            data = response.json()
+            data = json.loads(body)
             valid_urls = []
             
             if "organic" in data:
@@ -92,88 +195,172 @@ class LyricstapeSerperScraper:
             
         except Exception as e:
             log.error(f"Search Request Error: {e}")
-            return []
+            return None
 
-    def extract_lyrics(self, soup):
+    def fetch_lyrics(self, url, check=None):
+        # One lyricstape page -> cleaned lyrics, or None when the fetch failed
+        # or the page has none.
+        body = self._fetch("GET", url, check=check, headers=self.headers, timeout=10)
+        return self.extract_lyrics(body) if body is not None else None
 
-        for tag in soup(['script', 'style', 'header', 'footer', 'nav', 'aside', 'iframe']):
-            tag.decompose()
+    def extract_lyrics(self, page):
+        with self.metrics.timer("parse"):
+            root = parse(page)
+        with self.metrics.timer("extract"):
+            best_text = best_block(
+                root,
+                candidates=('div', 'article', 'p'),
+                drop=('script', 'style', 'header', 'footer', 'nav', 'aside', 'iframe'),
+                min_chars=MIN_TELUGU_CHARS,
+            )
 
-        best_text = ""
-        max_score = 0
-        
-        for elem in soup.find_all(['div', 'article', 'p']):
-            text = elem.get_text(separator='\n')
-            score = self.count_telugu_chars(text)
-            
-            if score > max_score:
-                max_score = score
-                best_text = text
-
-        if max_score >= MIN_TELUGU_CHARS:
-            return self.clean_text(best_text)
+            if best_text is not None:
+                return self.clean_text(best_text)
             
         return None
 
     def process_song(self, song, movie):
-        urls = self.get_lyricstape_urls(song, movie)
-        
-        for url in urls:
-            try:
-                resp = requests.get(url, headers=self.headers, timeout=10)
-                if resp.status_code != 200: continue
-                
-                soup = BeautifulSoup(resp.content, 'html.parser')
-                lyrics = self.extract_lyrics(soup)
-                
-                if lyrics:
-                    return LyricsResult(True, lyrics, "lyricstape.com", url)
-                    
-            except Exception:
-                continue
-                
-        return LyricsResult(False)
+        with self.metrics.timer("song"):
+            urls = self.get_lyricstape_urls(song, movie)
+            # None: the search itself failed, which is an error, not a miss.
+            if urls is None:
+                return LyricsResult(False, reason="search_failed")
+            reason = "no_search_results"
 
-    def save_file(self, song, movie, result):
-        clean_movie = re.sub(r'[^\w\-_]', '', movie.replace(' ', '_'))
-        clean_song = re.sub(r'[^\w\-_]', '', song.replace(' ', '_'))
-        
-        folder = self.output_dir / clean_movie
-        folder.mkdir(exist_ok=True)
-        
-        path = folder / f"{clean_song}.txt"
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(f"Song: {song}\nMovie: {movie}\nSource: {result.source}\nURL: {result.url}\n\n{result.lyrics}")
+            for url in urls:
+                try:
+                    body = self._fetch("GET", url, headers=self.headers, timeout=10)
+                    if body is None:
+                        reason = "fetch_failed"
+                        continue
+
+                    lyrics = self.extract_lyrics(body)
+
+                    if lyrics:
+                        return LyricsResult(True, lyrics, "lyricstape.com", url)
+                    reason = "no_telugu_text"
+
+                except Exception as e:
+                    reason = type(e).__name__
+                    continue
+
+            return LyricsResult(False, reason=reason)
+
+    def save_file(self, song, movie, result, on_durable=None):
+        # Without a sink, each song is its own <movie>/<song>.txt as before.
+        sink = self.sink or sinks.TxtSink(self.output_dir)
+        rec = sinks.record(song, movie, result.lyrics, result.source, result.url, "lyricstape_serper")
+        with self.metrics.timer("save"):
+            return sink.write(rec, on_durable)
+
+    def _report(self, i, total, song, movie, result, stats):
+        print(f"[{i+1}/{total}] {song}...", end=" ", flush=True)
+        self.metrics.inc("songs", outcome="found" if result.found else result.reason)
+        if result.found:
+            # The ledger hears about a song once its shard is on disk.
+            self.save_file(song, movie, result, partial(self.ledger.complete, song, movie, result.url) if self.ledger else None)
+            print(f" Found")
+            stats['found'] += 1
+        else:
+            error = "Serper search failed" if result.reason == "search_failed" else "Not found on Lyricstape"
+            if self.ledger and not (self.cache and self.cache.offline):
+                self.ledger.fail(song, movie, error)
+            print(f" {error}")
+            stats['missing'] += 1
 
     def run(self, csv_file):
         with open(csv_file, 'r', encoding='utf-8') as f:
             songs = list(csv.DictReader(f))
             
+        if self.ledger:
+            skipped = len(songs)
+            songs = self.ledger.pending(songs)
+            skipped -= len(songs)
+            if skipped:
+                print(f"Ledger: skipping {skipped} songs already done or backing off")
+
+        if self.title_index:
+            held = len(songs)
+            songs = self.title_index.missing(songs)
+            held -= len(songs)
+            if held:
+                print(f"Title index: skipping {held} songs already in the local corpus")
+
         total = len(songs)
         print(f"--- Starting Serper (Lyricstape Only) on {total} songs ---")
         
         stats = {'found': 0, 'missing': 0}
-        
-        for i, row in enumerate(songs):
-            song = row['song_name']
-            movie = row['movie_album']
-            
-            print(f"[{i+1}/{total}] {song}...", end=" ", flush=True)
-            
-            result = self.process_song(song, movie)
-            
-            if result.found:
-                self.save_file(song, movie, result)
-                print(f" Found")
-                stats['found'] += 1
+
+        try:
+            if self.planner:
+                self.planner.prefetch(songs)
+            if self.workers > 1:
+                self.run_concurrent(songs, stats)
             else:
-                print(" Not found on Lyricstape")
-                stats['missing'] += 1
-                
-            time.sleep(REQUEST_DELAY)
+                for i, row in enumerate(songs):
+                    song = row['song_name']
+                    movie = row['movie_album']
+
+                    result = self.process_song(song, movie)
+                    self._report(i, total, song, movie, result, stats)
+        finally:
+            if self.sink:
+                self.sink.close()
+
+        print(f"\nCompleted. Found: {stats['found']} | Missing: {stats['missing']} | Network calls: {self.network_calls}")
+        if self.cache:
+            print(f"Cache: {self.cache.stats['hits']} hits | {self.cache.stats['misses']} misses")
+        if self.planner:
+            print(self.planner.summary())
+        if self.limiter and self.limiter.stats['throttled']:
+            print(f"Rate limiter: backed off {self.limiter.stats['throttled']} times")
+        if self.metrics.enabled:
+            paths = self.metrics.write()
+            print(f"Time by stage (metrics in {paths[0].parent}):\n{self.metrics.summary()}")
+        return stats
+
+    def run_concurrent(self, songs, stats):
+        # Up to `workers` songs are in flight at once; pacing comes from the
+        # per-host limiter instead of a global sleep. executor.map yields in
+        # input order, so files and the printed log match the serial path.
+        total = len(songs)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = pool.map(
+                lambda row: self.process_song(row['song_name'], row['movie_album']),
+                songs,
+            )
+            for i, (row, result) in enumerate(zip(songs, results)):
+                self._report(i, total, row['song_name'], row['movie_album'], result, stats)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_file", nargs="?", default="rawdata/sirivennela_songs.csv")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"songs in flight at once (1 = serial, max {MAX_WORKERS})")
+    parser.add_argument("--cache", default=CACHE_PATH, help="response cache database")
+    parser.add_argument("--no-cache", action="store_true", help="always hit the network")
+    parser.add_argument("--offline", action="store_true", help="replay from the cache only")
+    parser.add_argument("--ledger", default=LEDGER_PATH, help="job ledger database for resumable runs")
+    parser.add_argument("--no-ledger", action="store_true", help="process every song, ignoring past runs")
+    parser.add_argument("--no-title-index", action="store_true", help="search even for songs the local corpus already has")
+    parser.add_argument("--search-index", default=INDEX_PATH, help="local index of Serper results, shared by a movie's songs")
+    parser.add_argument("--no-planner", action="store_true", help="one Serper search per song, as before the query planner")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="queries per Serper batch request")
+    parser.add_argument("--movie-results", type=int, default=MOVIE_RESULTS, help="results fetched per movie search")
+    parser.add_argument("--sink", choices=sinks.SINKS, default="jsonl", help="jsonl/parquet: one batched shard per run; txt: a file per song")
+    parser.add_argument("--shard-dir", default=sinks.SHARD_DIR, help="where jsonl/parquet shards are written")
+    parser.add_argument("--metrics-dir", default=METRICS_DIR, help="where the .prom and .json run metrics are written")
+    parser.add_argument("--no-metrics", action="store_true", help="disable instrumentation")
+    args = parser.parse_args()
+
     MY_SERPER_KEY = SERPER_API_KEY
+    cache = None if args.no_cache else ResponseCache(args.cache, offline=args.offline)
+    ledger = None if args.no_ledger else JobLedger("lyricstape_serper", args.ledger)
+    title_index = None if args.no_title_index else TitleIndex.from_local()
+    metrics = None if args.no_metrics else Metrics("lyricstape_serper", args.metrics_dir)
+    sink = sinks.open_sink(args.sink, "lyricstape_serper", args.shard_dir, txt_root=OUTPUT_DIR)
+    search_index = None if args.no_planner else SearchIndex(args.search_index, offline=args.offline)
     
-    scraper = LyricstapeSerperScraper(api_key=MY_SERPER_KEY)
-    scraper.run("sirivennela_songs.csv")
\ No newline at end of file
+    scraper = LyricstapeSerperScraper(api_key=MY_SERPER_KEY, workers=min(args.workers, MAX_WORKERS), cache=cache, ledger=ledger, title_index=title_index, metrics=metrics, sink=sink,
+                                      search_index=search_index, batch_size=args.batch_size, movie_results=args.movie_results)
+    scraper.run(args.csv_file)
\ No newline at end of file
@@ -1,165 +1,378 @@
 
 import csv
 import time
-import re
 import logging
-import random
+import argparse
+import threading
+from functools import partial
 from pathlib import Path
-from bs4 import BeautifulSoup
 from urllib.parse import quote_plus
-import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from scrape.cache import ResponseCache, CACHE_PATH
+from scrape.ledger import JobLedger, LEDGER_PATH
+from scrape.title_index import TitleIndex
+from scrape.html_extract import parse, best_block
+from scrape.metrics import Metrics, NULL_METRICS, METRICS_DIR
+from scrape import sink as sinks
+from scrape.browser_pool import BrowserPool, blocking_options, block_resources, wait_ready
+from scrape.rate_limit import HostRateLimiter, backoff
+from utils import telugu_text
 
 OUTPUT_DIR = "lyrics_stealth_v13"
 HEADLESS = False           
 MIN_TELUGU_CHARS = 30       
 MAX_RESULTS_TO_CHECK = 7    
+MAX_CONSECUTIVE_ERRORS = 5
+PAGE_READY_TIMEOUT = 5
+SEARCH_URL = "https://duckduckgo.com/?q={query}&t=h_&ia=web"
+HOST_INTERVALS = {"duckduckgo.com": 1.0}
+SEARCH_ATTEMPTS = 2
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 log = logging.getLogger(__name__)
 
 class StealthDeepScraper:
-    def __init__(self):
+    def __init__(self, cache=None, ledger=None, workers=1, search_url=SEARCH_URL, title_index=None, metrics=None, sink=None, start_driver=True):
         self.output_dir = Path(OUTPUT_DIR)
+        self.sink = sink
+        self.metrics = metrics or NULL_METRICS
+        self.title_index = title_index
         self.output_dir.mkdir(exist_ok=True)
-        self.driver = self._setup_driver()
+        self.cache = cache
+        self.ledger = ledger
+        self.search_url = search_url
+        self.network_calls = 0
+        # Bumped from every worker thread.
+        self._calls_lock = threading.Lock()
+        self.last_url = ""
+        offline = bool(cache and cache.offline)
+        self.workers = 1 if offline else workers
+        # Serial runs pace through the limiter too, instead of a random 2-4 s
+        # sleep after every song.
+        self.limiter = HostRateLimiter(interval=0.5, overrides=HOST_INTERVALS)
+        # Pure replay runs never touch the network, and pool runs start their
+        # own browsers, so only the plain serial run launches Chrome here.
+        # start_driver=False is for callers with browsers of their own (the
+        # resolver's pool).
+        self.driver = self._setup_driver() if start_driver and not offline and self.workers == 1 else None
 
     def _setup_driver(self):
+        # Imported here: it patches and locates a Chrome binary on import,
+        # which replay runs and --help don't need.
+        import undetected_chromedriver as uc
         options = uc.ChromeOptions()
         if HEADLESS:
             options.add_argument('--headless')
+        blocking_options(options)
         driver = uc.Chrome(options=options)
+        block_resources(driver)
         return driver
 
     def close(self):
-        self.driver.quit()
+        if self.driver:
+            self.driver.quit()
+        if self.sink:
+            self.sink.close()
 
-    def count_telugu_chars(self, text):
-        return len(re.findall(r'[\u0C00-\u0C7F]', text))
+    def _load(self, driver, url, kind, check=None):
+        if self.limiter:
+            with self.metrics.timer("throttle"):
+                self.limiter.wait(url)
+        if check:
+            check()
+        with self._calls_lock:
+            self.network_calls += 1
+        # A browser shows no status codes, so load time (and failures) are
+        # the limiter's only signal here.
+        start = time.monotonic()
+        try:
+            with self.metrics.timer("page_load", kind=kind):
+                driver.get(url)
+        except Exception:
+            if self.limiter:
+                self.limiter.feedback(url, None)
+            raise
+        if self.limiter:
+            self.limiter.feedback(url, 200, time.monotonic() - start)
 
-    def clean_text(self, text):
-        if not text: return ""
-        lines = [line.strip() for line in text.split('\n')]
-        cleaned = []
-        for line in lines:
-            if not line: continue
-            low = line.lower()
-            if any(x in low for x in ['share', 'comment', 'whatsapp', 'search', 'home', 'click here', 'advertisement']):
-                continue
-            cleaned.append(line)
-        return '\n'.join(cleaned)
+    def search_results(self, song, movie, driver, check=None):
+        # DuckDuckGo's top result links for a song, None on an offline miss.
+        # `check` runs before every page load and may raise to stop early.
+        query = f"lyricstape.com {song} {movie} lyrics"
+        ddg_url = self.search_url.format(query=quote_plus(query))
+        key = self.cache.key("DDG", ddg_url) if self.cache else None
+        if self.cache:
+            cached = self.cache.get_json(key)
+            if cached is not None or self.cache.offline:
+                self.metrics.inc("requests", kind="search", status="cached" if cached is not None else "offline_miss")
+                return cached
 
-    def process_song(self, song, movie):
-        try:
-            query = f"lyricstape.com {song} {movie} lyrics"
-            encoded_query = quote_plus(query)
-            ddg_url = f"https://duckduckgo.com/?q={encoded_query}&t=h_&ia=web"
-            
-            self.driver.get(ddg_url)
-            
-            wait = WebDriverWait(self.driver, 5)
-            
+        for attempt in range(SEARCH_ATTEMPTS):
+            self._load(driver, ddg_url, "search", check)
+            wait = WebDriverWait(driver, 5)
             try:
-                result_elements = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li[data-layout='organic'] h2 a")))
-                
-                candidate_urls = []
-                for elem in result_elements[:MAX_RESULTS_TO_CHECK]:
-                    url = elem.get_attribute("href")
-                    if url:
-                        candidate_urls.append(url)
+                with self.metrics.timer("render_wait", kind="search"):
+                    result_elements = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li[data-layout='organic'] h2 a")))
+                break
+            except TimeoutException:
+                # No organic results is nearly always DuckDuckGo's anomaly
+                # page, i.e. we are going too fast: slow the host and retry.
+                if self.limiter:
+                    self.limiter.feedback(ddg_url, None)
+                self.metrics.inc("requests", kind="search", status="timeout")
+                if attempt + 1 == SEARCH_ATTEMPTS:
+                    raise
+                with self.metrics.timer("backoff"):
+                    time.sleep(backoff(attempt, base=2.0))
+        self.metrics.inc("requests", kind="search", status="loaded")
 
-                if not candidate_urls:
-                    return False, "No search results found"
+        candidate_urls = []
+        for elem in result_elements[:MAX_RESULTS_TO_CHECK]:
+            url = elem.get_attribute("href")
+            if url:
+                candidate_urls.append(url)
 
-            except Exception as e:
-                return False, "Search results selector failed"
+        if self.cache and candidate_urls:
+            self.cache.put_json(key, candidate_urls)
+        return candidate_urls
 
-            target_url = None
-            
-            for url in candidate_urls:
-                if "lyricstape.com" in url:
-                    target_url = url
-                    break
-            
-            if not target_url:
-                return False, f"Lyricstape not found in top {MAX_RESULTS_TO_CHECK} results"
+    def page_source(self, url, driver, check=None):
+        key = self.cache.key("GET", url, None) if self.cache else None
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None or self.cache.offline:
+                self.metrics.inc("requests", kind="page", status="cached" if cached is not None else "offline_miss")
+                return cached
 
+        self._load(driver, url, "page", check)
+        # Ready once the lyrics are in the DOM, rather than after a fixed 3 s.
+        with self.metrics.timer("render_wait", kind="page"):
+            ready = wait_ready(driver, PAGE_READY_TIMEOUT, condition=lambda d: telugu_text.count_telugu_chars(
+                d.execute_script("return document.body ? document.body.textContent : ''")) >= MIN_TELUGU_CHARS)
+        self.metrics.inc("requests", kind="page", status="loaded" if ready else "ready_timeout")
+        html = driver.page_source.encode("utf-8")
 
-            self.driver.get(target_url)
-            
-            time.sleep(3)
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            content = self._extract_from_soup(soup)
-            
-            if content:
-                return True, content
-            else:
-                return False, "Page loaded, but no Telugu text found"
+        # A page that timed out may be half-rendered; don't pin that for the TTL.
+        if self.cache and ready:
+            self.cache.put(key, html)
+        return html
+
+    def count_telugu_chars(self, text):
+        return telugu_text.count_telugu_chars(text)
 
+    def clean_text(self, text):
+        return telugu_text.clean_text(text, telugu_text.STEALTH_BLOCKLIST, telugu_only=False)
+
+    def process_song(self, song, movie):
+        try:
+            found, content, self.last_url = self._process(song, movie, self.driver)
+            return found, content
         except Exception as e:
+            self.metrics.inc("songs", outcome=type(e).__name__)
+            self.last_url = ""
             return False, f"Error: {e}"
 
-    def _extract_from_soup(self, soup):
-        for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'form', 'noscript']):
-            tag.decompose()
+    def _outcome(self, reason, found, content, url=""):
+        self.metrics.inc("songs", outcome=reason)
+        return found, content, url
 
-        best_text = ""
-        max_score = 0
+    def _process(self, song, movie, driver):
+        # Driver errors propagate so the pool can tell a crashed browser from a
+        # song that simply has no lyrics.
+        with self.metrics.timer("song"):
+            return self._search_and_extract(song, movie, driver)
+
+    def _search_and_extract(self, song, movie, driver):
+        try:
+            candidate_urls = self.search_results(song, movie, driver)
+
+            if candidate_urls is None:
+                return self._outcome("offline_miss", False, "Search not in cache (offline)")
+
+            if not candidate_urls:
+                return self._outcome("no_search_results", False, "No search results found")
+
+        except TimeoutException:
+            return self._outcome("search_timeout", False, "Search results selector failed")
+
+        target_url = None
         
-        for elem in soup.find_all(['div', 'article', 'p', 'span']):
-            text = elem.get_text(separator='\n')
-            score = self.count_telugu_chars(text)
-            
-            if score > max_score:
-                max_score = score
-                best_text = text
+        for url in candidate_urls:
+            if "lyricstape.com" in url:
+                target_url = url
+                break
         
-        if max_score >= MIN_TELUGU_CHARS:
-            return self.clean_text(best_text)
-        return None
+        if not target_url:
+            return self._outcome("not_in_results", False, f"Lyricstape not found in top {MAX_RESULTS_TO_CHECK} results")
 
-    def save_file(self, song, movie, content):
-        clean_movie = re.sub(r'[^\w\-_]', '', movie.replace(' ', '_'))
-        clean_song = re.sub(r'[^\w\-_]', '', song.replace(' ', '_'))
-        
-        folder = self.output_dir / clean_movie
-        folder.mkdir(exist_ok=True)
+        html = self.page_source(target_url, driver)
+        if html is None:
+            return self._outcome("offline_miss", False, "Page not in cache (offline)", target_url)
+
+        content = self.extract_from_page(html)
         
-        path = folder / f"{clean_song}.txt"
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(f"Song: {song}\nMovie: {movie}\nSource: Lyricstape (DDG-DeepScan)\n\n{content}")
+        if content:
+            return self._outcome("found", True, content, target_url)
+        else:
+            return self._outcome("no_telugu_text", False, "Page loaded, but no Telugu text found", target_url)
+
+    def extract_from_page(self, page):
+        with self.metrics.timer("parse"):
+            root = parse(page)
+        with self.metrics.timer("extract"):
+            best_text = best_block(
+                root,
+                candidates=('div', 'article', 'p', 'span'),
+                drop=('script', 'style', 'nav', 'header', 'footer', 'form', 'noscript'),
+                min_chars=MIN_TELUGU_CHARS,
+            )
+
+            if best_text is not None:
+                return self.clean_text(best_text)
+        return None
+
+    def save_file(self, song, movie, content, url="", on_durable=None):
+        # Without a sink, each song is its own <movie>/<song>.txt as before.
+        sink = self.sink or sinks.TxtSink(self.output_dir)
+        rec = sinks.record(song, movie, content, "Lyricstape (DDG-DeepScan)", url, "stealth_ddg")
+        with self.metrics.timer("save"):
+            return sink.write(rec, on_durable)
+
+    def _record(self, song, movie, found, content, url, path=None):
+        if not self.ledger:
+            return
+        if found:
+            self.ledger.complete(song, movie, url, path)
+        elif not (self.cache and self.cache.offline):
+            # Offline misses say nothing about the song, so they don't count
+            # against its retry budget.
+            self.ledger.fail(song, movie, content)
 
     def run(self, csv_file):
         with open(csv_file, 'r', encoding='utf-8') as f:
             songs = list(csv.DictReader(f))
+
+        if self.ledger:
+            skipped = len(songs)
+            songs = self.ledger.pending(songs)
+            skipped -= len(songs)
+            if skipped:
+                print(f"Ledger: skipping {skipped} songs already done or backing off")
+
+        if self.title_index:
+            held = len(songs)
+            songs = self.title_index.missing(songs)
+            held -= len(songs)
+            if held:
+                print(f"Title index: skipping {held} songs already in the local corpus")
             
         print(f"--- Deep Scan Scraper (Top {MAX_RESULTS_TO_CHECK}) Started ---")
         
         stats = {'found': 0, 'missing': 0}
+        errors = 0
+
+        if self.workers > 1:
+            try:
+                self.run_pool(songs, stats)
+            finally:
+                self.close()
+            print(f"\nCompleted. Found: {stats['found']} | Missing: {stats['missing']} | Network calls: {self.network_calls}")
+            self._write_metrics()
+            return stats
         
-        for i, row in enumerate(songs):
-            song = row['song_name']
-            movie = row['movie_album']
-            
-            print(f"[{i+1}/{len(songs)}] {song}...", end=" ", flush=True)
-            
-            found, content = self.process_song(song, movie)
-            
-            if found:
-                self.save_file(song, movie, content)
-                print(f"✓ Found")
-                stats['found'] += 1
+        try:
+            for i, row in enumerate(songs):
+                song = row['song_name']
+                movie = row['movie_album']
+                
+                print(f"[{i+1}/{len(songs)}] {song}...", end=" ", flush=True)
+                
+                found, content = self.process_song(song, movie)
+                
+                if found:
+                    # Recorded in the ledger once the shard is on disk.
+                    self.save_file(song, movie, content, self.last_url, partial(self._record, song, movie, True, content, self.last_url))
+                    print(f"✓ Found")
+                    stats['found'] += 1
+                    errors = 0
+                else:
+                    self._record(song, movie, False, content, self.last_url)
+                    print(f"✗ {content}")
+                    stats['missing'] += 1
+                    errors = errors + 1 if content.startswith("Error") else 0
+
+                # A closed window or dead driver fails every song after it;
+                # stop instead of burning retry attempts, and resume later.
+                if errors >= MAX_CONSECUTIVE_ERRORS:
+                    print(f"\nAborting after {errors} consecutive errors. Rerun to resume.")
+                    break
+        finally:
+            self.close()
+
+        print(f"\nCompleted. Found: {stats['found']} | Missing: {stats['missing']} | Network calls: {self.network_calls}")
+        self._write_metrics()
+        return stats
+
+    def _write_metrics(self):
+        if self.metrics.enabled:
+            paths = self.metrics.write()
+            print(f"Time by stage (metrics in {paths[0].parent}):\n{self.metrics.summary()}")
+
+    def run_pool(self, songs, stats):
+        # Each worker owns a browser; politeness comes from the shared
+        # per-host limiter.
+        total = len(songs)
+        lock = threading.Lock()
+        pool = BrowserPool(self._setup_driver, size=self.workers)
+
+        def task(driver, row):
+            return self._process(row['song_name'], row['movie_album'], driver)
+
+        def done(i, row, result):
+            song, movie = row['song_name'], row['movie_album']
+            if isinstance(result, Exception):
+                self.metrics.inc("songs", outcome=type(result).__name__)
+                found, content, url = False, f"Error: {result}", ""
             else:
-                print(f"✗ {content}")
-                stats['missing'] += 1
-            
-            time.sleep(random.uniform(2.0, 4.0))
+                found, content, url = result
+            with lock:
+                if found:
+                    self.save_file(song, movie, content, url, partial(self._record, song, movie, True, content, url))
+                    print(f"[{i+1}/{total}] {song}... ✓ Found")
+                    stats['found'] += 1
+                else:
+                    self._record(song, movie, False, content, url)
+                    print(f"[{i+1}/{total}] {song}... ✗ {content}")
+                    stats['missing'] += 1
 
-        self.close()
-        print(f"\nCompleted. Found: {stats['found']} | Missing: {stats['missing']}")
+        pool.map(task, songs, on_result=done)
+        self.metrics.inc("browser_restarts", pool.restarts)
+        if pool.restarts:
+            print(f"Browser restarts: {pool.restarts}")
 
 if __name__ == "__main__":
-    scraper = StealthDeepScraper()
-    scraper.run("rawdata/pending_songsv1.csv")
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_file", nargs="?", default="rawdata/pending_songsv1.csv")
+    parser.add_argument("--cache", default=CACHE_PATH, help="response cache database")
+    parser.add_argument("--no-cache", action="store_true", help="always hit the network")
+    parser.add_argument("--offline", action="store_true", help="replay from the cache only")
+    parser.add_argument("--ledger", default=LEDGER_PATH, help="job ledger database for resumable runs")
+    parser.add_argument("--no-ledger", action="store_true", help="process every song, ignoring past runs")
+    parser.add_argument("--no-title-index", action="store_true", help="search even for songs the local corpus already has")
+    parser.add_argument("--workers", type=int, default=1, help="parallel browsers (1 = serial)")
+    parser.add_argument("--sink", choices=sinks.SINKS, default="jsonl", help="jsonl/parquet: one batched shard per run; txt: a file per song")
+    parser.add_argument("--shard-dir", default=sinks.SHARD_DIR, help="where jsonl/parquet shards are written")
+    parser.add_argument("--metrics-dir", default=METRICS_DIR, help="where the .prom and .json run metrics are written")
+    parser.add_argument("--no-metrics", action="store_true", help="disable instrumentation")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else ResponseCache(args.cache, offline=args.offline)
+    ledger = None if args.no_ledger else JobLedger("stealth_ddg", args.ledger)
+    title_index = None if args.no_title_index else TitleIndex.from_local()
+    metrics = None if args.no_metrics else Metrics("stealth_ddg", args.metrics_dir)
+    sink = sinks.open_sink(args.sink, "stealth_ddg", args.shard_dir, txt_root=OUTPUT_DIR)
+    scraper = StealthDeepScraper(cache=cache, ledger=ledger, workers=args.workers, title_index=title_index, metrics=metrics, sink=sink)
+    scraper.run(args.csv_file)
\ No newline at end of file
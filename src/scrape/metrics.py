@@ -0,0 +1,188 @@
+import bisect
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+METRICS_DIR = ".cache/metrics"
+PREFIX = "telusinger_scraper"
+# Seconds. Cache hits land in the first buckets, page loads and the
+# deliberate sleeps in the last.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "labels", "start")
+
+    def __init__(self, metrics, stage, labels):
+        self.metrics = metrics
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start, **self.labels)
+        if exc_type is not None:
+            self.metrics.inc("errors", stage=self.stage, reason=exc_type.__name__)
+        return False
+
+class Metrics:
+    # Stage timings go into one histogram labelled by stage, everything else
+    # into labelled counters. Writes are a dict update under a lock, so the
+    # scrapers' worker threads can share one instance.
+    enabled = True
+
+    def __init__(self, job, directory=METRICS_DIR, buckets=BUCKETS):
+        self.job = job
+        self.directory = directory
+        self.buckets = tuple(buckets)
+        self.started = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def timer(self, stage, **labels):
+        return _Timer(self, stage, labels)
+
+    def observe(self, stage, seconds, **labels):
+        key = (stage, tuple(sorted(labels.items())))
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            h[0][i] += 1
+            h[1] += seconds
+            h[2] += 1
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def _quantile(self, counts, total, q):
+        # Linear within the bucket, as Prometheus' histogram_quantile does.
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lo = self.buckets[i - 1] if i else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / n
+            seen += n
+        return 0.0
+
+    def report(self):
+        with self._lock:
+            histograms = {k: (list(h[0]), h[1], h[2]) for k, h in self.histograms.items()}
+            counters = dict(self.counters)
+        stages = []
+        for (stage, labels), (counts, total, n) in sorted(histograms.items()):
+            stages.append({
+                "stage": stage, "labels": dict(labels), "count": n, "seconds": round(total, 6),
+                "mean": round(total / n, 6) if n else 0.0,
+                "p50": round(self._quantile(counts, n, 0.5), 6),
+                "p99": round(self._quantile(counts, n, 0.99), 6),
+            })
+        return {
+            "job": self.job,
+            "started": self.started,
+            "elapsed": round(time.time() - self.started, 3),
+            "stages": stages,
+            "counters": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in sorted(counters.items())],
+        }
+
+    def prometheus(self):
+        # Text exposition format, for node_exporter's textfile collector or a
+        # pushgateway. Every series carries the job label.
+        def fmt(labels):
+            pairs = [("job", self.job), *labels]
+            return ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+
+        with self._lock:
+            histograms = {k: (list(h[0]), h[1], h[2]) for k, h in self.histograms.items()}
+            counters = dict(self.counters)
+        lines = [
+            f"# HELP {PREFIX}_stage_seconds Time spent per scraper stage.",
+            f"# TYPE {PREFIX}_stage_seconds histogram",
+        ]
+        for (stage, labels), (counts, total, n) in sorted(histograms.items()):
+            labels = (("stage", stage), *labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{{fmt(labels)},le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_stage_seconds_bucket{{{fmt(labels)},le="+Inf"}} {n}')
+            lines.append(f"{PREFIX}_stage_seconds_sum{{{fmt(labels)}}} {total:.6f}")
+            lines.append(f"{PREFIX}_stage_seconds_count{{{fmt(labels)}}} {n}")
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+            for (series, labels), value in sorted(counters.items()):
+                if series == name:
+                    lines.append(f"{PREFIX}_{name}_total{{{fmt(labels)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory=None):
+        # <job>.prom and <job>.json, each replaced atomically so a collector
+        # never reads half a file.
+        directory = Path(directory or self.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for suffix, text in ((".prom", self.prometheus()), (".json", json.dumps(self.report(), indent=2))):
+            path = directory / f"{self.job}{suffix}"
+            tmp = path.with_suffix(suffix + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+            paths.append(path)
+        return paths
+
+    def summary(self, top=8):
+        # Where the time went, largest stage first.
+        stages = sorted(self.report()["stages"], key=lambda s: -s["seconds"])[:top]
+        return "\n".join(
+            f"  {'/'.join([s['stage'], *map(str, s['labels'].values())]):<18}{s['count']:>7} x {s['mean'] * 1000:>8.1f} ms  (p99 {s['p99'] * 1000:.0f} ms, {s['seconds']:.1f} s total)"
+            for s in stages
+        )
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class NullMetrics:
+    # Disabled mode: same interface, every call returns immediately and
+    # timer() hands back one shared no-op context manager.
+    enabled = False
+    job = None
+
+    def timer(self, stage, **labels):
+        return _NULL_TIMER
+
+    def observe(self, stage, seconds, **labels):
+        pass
+
+    def inc(self, name, amount=1, **labels):
+        pass
+
+    def report(self):
+        return {}
+
+    def write(self, directory=None):
+        return []
+
+    def summary(self, top=8):
+        return ""
+
+NULL_METRICS = NullMetrics()
@@ -0,0 +1,247 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlparse
+from scrape.metrics import NULL_METRICS
+from scrape.title_index import title_key, _similar, MATCH_THRESHOLD
+from utils.telugu_text import fold_title
+
+INDEX_PATH = ".cache/serper_index.sqlite"
+INDEX_TTL = 30 * 24 * 3600
+SITE = "lyricstape.com"
+# Queries per POST: Serper's batch form takes a JSON list of queries and
+# answers with a list of responses. Each query is still billed.
+BATCH_SIZE = 20
+MOVIE_RESULTS = 10
+SONG_RESULTS = 3
+# A movie gets one query for all its pending songs once it has this many.
+MIN_GROUP = 2
+# Trigram similarity between a song title and a result's title, as strict as
+# the title index: a movie's results hold its other songs, and "Cheliya" must
+# not take the page of "Cheliya Cheliya" (0.78). The "... Song Lyrics In
+# Telugu" tail is cut off before comparing. A song none of its movie's
+# results match gets its own search.
+SONG_THRESHOLD = MATCH_THRESHOLD
+
+# "Gaali Vaaluga Song Lyrics In Telugu - Agnyaathavaasi" -> "Gaali Vaaluga";
+# the slug "gaali-vaaluga-song-lyrics-agnyaathavaasi" the same way.
+LYRICS_SUFFIX_RE = re.compile(r'[\s\-|]*\b(?:video\s+)?(?:songs?\s+)?lyrics?\b.*$', re.I)
+
+def song_query(song, movie):
+    # Same payload the scraper has always sent for one song, so its cached
+    # responses still replay.
+    return {"q": f"site:{SITE} {song} {movie} lyrics", "gl": "in", "hl": "en", "num": SONG_RESULTS}
+
+def movie_query(movie, num=MOVIE_RESULTS):
+    return {"q": f"site:{SITE} {movie} lyrics", "gl": "in", "hl": "en", "num": num}
+
+def movie_group(movie):
+    # Movie names folded word by word, numbers kept: fold_title and
+    # title_key drop digits and version tags, which would make one movie of
+    # "Manmadhudu" and "Manmadhudu 2", or of "Rrr Ost Vol-5" and "Vol-7".
+    words = re.findall(r'[a-z]+|\d+', str(movie or '').lower())
+    return " ".join(w if w.isdigit() else fold_title(w) for w in words)
+
+def query_key(payload):
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False)
+
+def site_links(organic):
+    return [item["link"] for item in organic if SITE in (item.get("link") or "")]
+
+def result_titles(item):
+    # The song names a search result may be for: its title and its URL slug,
+    # each with the "... lyrics ..." tail cut off.
+    slug = urlparse(item.get("link") or "").path.rstrip("/").rsplit("/", 1)[-1].replace("-", " ")
+    return [t for t in (LYRICS_SUFFIX_RE.sub("", item.get("title") or ""), LYRICS_SUFFIX_RE.sub("", slug)) if t.strip()]
+
+def match_score(song, item):
+    # (similarity, same version): titles compared as the title index does,
+    # version tags dropped, so "Samajavaragamana - Female" can use the Male
+    # page; a result for the very same version sorts first.
+    key, full = title_key(song), fold_title(song)
+    best = (0.0, False)
+    for title in result_titles(item):
+        other = title_key(title)
+        if not key or not other:
+            continue
+        best = max(best, (_similar(key, other), fold_title(title) == full))
+    return best
+
+class SearchIndex:
+    # Every organic result Serper has returned, per query. A movie's results
+    # answer its other songs on later runs too, without a paid call.
+    def __init__(self, path=INDEX_PATH, ttl=INDEX_TTL, offline=False):
+        self.ttl = ttl
+        self.offline = offline
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS searches (
+                query TEXT PRIMARY KEY,
+                organic TEXT NOT NULL,
+                credits REAL NOT NULL,
+                fetched REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    def get_many(self, keys):
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in keys:
+                row = self._db.execute("SELECT organic, fetched FROM searches WHERE query = ?", (key,)).fetchone()
+                # Offline replays never expire, as in ResponseCache.
+                if row and (self.offline or not self.ttl or now - row[1] <= self.ttl):
+                    found[key] = json.loads(row[0])
+        return found
+
+    def put_many(self, results):
+        # results: (key, organic, credits) triples.
+        if self.offline:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO searches (query, organic, credits, fetched) VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(organic, ensure_ascii=False), credits, now) for key, organic, credits in results],
+            )
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class QueryPlanner:
+    # Plans a run's Serper searches before any song is processed: songs are
+    # grouped by movie (see movie_group; "Gang Leader (1991)" and "Gang
+    # Leader (2019)" are two movies), each movie is searched once with a
+    # full page of results, and every query not already in the index goes
+    # out in batches. A song its movie's results don't cover falls back to
+    # its own query, batched the same way in a second round.
+    #
+    # `search` takes a list of payloads and returns Serper's list of
+    # responses, or None when the request failed.
+    def __init__(self, search, index=None, batch_size=BATCH_SIZE, movie_results=MOVIE_RESULTS,
+                 min_group=MIN_GROUP, threshold=SONG_THRESHOLD, metrics=None):
+        self.search = search
+        self.index = index if index is not None else SearchIndex()
+        self.batch_size = batch_size
+        self.movie_results = movie_results
+        self.min_group = min_group
+        self.threshold = threshold
+        self.metrics = metrics or NULL_METRICS
+        self.answers = {}
+        self.stats = {"songs": 0, "requests": 0, "queries": 0, "credits": 0.0,
+                      "from_index": 0, "movie_hits": 0, "fallbacks": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def _lookup(self, payloads):
+        # Organic results for each payload: from the index where it has
+        # them, the rest from Serper, batch_size queries per request. The
+        # queries of a failed request are left out.
+        unique = {query_key(p): p for p in payloads}
+        results = self.index.get_many(unique)
+        self._count("from_index", len(results))
+        todo = [(k, p) for k, p in unique.items() if k not in results]
+        for i in range(0, len(todo), self.batch_size):
+            batch = todo[i:i + self.batch_size]
+            self._count("requests")
+            self._count("queries", len(batch))
+            with self.metrics.timer("search_batch"):
+                responses = self.search([p for _, p in batch])
+            if responses is None:
+                self._count("failed", len(batch))
+                continue
+            fetched = []
+            for (key, _), response in zip(batch, responses):
+                organic = response.get("organic", [])
+                credits = response.get("credits", 1)
+                self._count("credits", credits)
+                self.metrics.inc("search_queries")
+                results[key] = organic
+                fetched.append((key, organic, credits))
+            self.index.put_many(fetched)
+        return results
+
+    def _match(self, song, organic):
+        scored = [(match_score(song, item), item["link"]) for item in organic
+                  if SITE in (item.get("link") or "")]
+        scored.sort(key=lambda s: s[0], reverse=True)
+        return [link for (score, _), link in scored if score >= self.threshold][:SONG_RESULTS]
+
+    def _answer(self, plan):
+        # plan: (song, movie) -> (payload, by_movie). Movie results are
+        # matched by title; a song's own results are taken as they come.
+        # Songs whose search failed get no answer, so urls() tries again
+        # rather than reporting them as not found.
+        results = self._lookup(payload for payload, _ in plan.values())
+        missed = []
+        for (song, movie), (payload, by_movie) in plan.items():
+            organic = results.get(query_key(payload))
+            if organic is None:
+                continue
+            if not by_movie:
+                self.answers[song, movie] = site_links(organic)
+                continue
+            urls = self._match(song, organic)
+            if urls:
+                self.answers[song, movie] = urls
+                self._count("movie_hits")
+            else:
+                missed.append((song, movie))
+        if missed:
+            self._count("fallbacks", len(missed))
+            self._answer({pair: (song_query(*pair), False) for pair in missed})
+
+    def prefetch(self, rows, song_key='song_name', movie_key='movie_album'):
+        pairs = list(dict.fromkeys((row[song_key], row[movie_key]) for row in rows))
+        groups = defaultdict(list)
+        for song, movie in pairs:
+            groups[movie_group(movie) or movie].append((song, movie))
+        plan = {}
+        for members in groups.values():
+            if len(members) >= self.min_group:
+                payload = movie_query(members[0][1], self.movie_results)
+                plan.update((pair, (payload, True)) for pair in members)
+            else:
+                plan.update((pair, (song_query(*pair), False)) for pair in members)
+        # Movie searches and lone songs share the first round of batches;
+        # songs missing from their movie's results make the second.
+        with self.metrics.timer("search_plan"):
+            self._answer(plan)
+
+    def urls(self, song, movie):
+        # Lyricstape links for one song, best first. Songs that weren't
+        # prefetched, or whose batch failed, are searched on their own,
+        # through the index. None when that search fails too.
+        self._count("songs")
+        urls = self.answers.get((song, movie))
+        if urls is None:
+            self._answer({(song, movie): (song_query(song, movie), False)})
+            urls = self.answers.get((song, movie))
+        return urls
+
+    def summary(self):
+        s = self.stats
+        saved_requests = s["songs"] - s["requests"]
+        saved_queries = s["songs"] - s["queries"]
+        return (f"Serper: {s['songs']} songs in {s['queries']} queries / {s['requests']} requests "
+                f"({s['credits']:g} credits); {s['movie_hits']} answered by their movie's results "
+                f"({s['fallbacks']} missed and were searched alone), {s['from_index']} queries from the local index, "
+                f"{s['failed']} queries in failed requests\n"
+                f"Serper: saved {saved_requests} API calls and {saved_queries} queries vs one search per song")
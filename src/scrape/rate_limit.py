@@ -0,0 +1,139 @@
+import random
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+HOST_INTERVAL = 0.2
+# Bounds on the adapted gap between requests to one host: never faster than
+# MIN_INTERVAL however healthy it looks, never slower than MAX_INTERVAL.
+MIN_INTERVAL = 0.05
+MAX_INTERVAL = 30.0
+BURST = 1
+# AIMD: every good response adds INCREASE requests/s to the host's rate; a
+# 429/5xx or dropped connection multiplies it by DECREASE, a response slower
+# than SLOW_FACTOR x the host's usual latency by SLOW_DECREASE. Requests in
+# flight together tend to fail together, so a host is cut at most once per
+# COOLDOWN seconds.
+INCREASE = 0.2
+DECREASE = 0.5
+COOLDOWN = 1.0
+SLOW_FACTOR = 3.0
+SLOW_DECREASE = 0.8
+LATENCY_ALPHA = 0.2
+WARMUP = 5
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+
+def throttled(status):
+    # None means no response at all: a timeout or dropped connection.
+    return status is None or status in RETRY_STATUSES
+
+def backoff(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    # Full jitter: uniform over [0, base * 2^attempt], so retries from many
+    # workers spread out instead of arriving together.
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def retry_after(value):
+    # Retry-After is either seconds or an HTTP date.
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class _Host:
+    __slots__ = ("interval", "floor", "next_slot", "paused_until", "cut_at", "latency", "samples")
+
+    def __init__(self, interval, floor, now):
+        self.interval = interval
+        self.floor = floor
+        self.next_slot = now
+        self.paused_until = 0.0
+        self.cut_at = float("-inf")
+        self.latency = 0.0
+        self.samples = 0
+
+class HostRateLimiter:
+    # Per-host token bucket (burst tokens, refilled one per interval). The
+    # interval starts at `interval` (or the host's override) and, as callers
+    # report responses through feedback(), adapts between min_interval and
+    # max_interval. Without feedback it stays a fixed per-host pace.
+    # Overridden hosts are ones that must be slow (search engines ban fast
+    # clients), so their override is also their floor: they only slow down.
+    def __init__(self, interval=HOST_INTERVAL, overrides=None, burst=BURST, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+        self.interval = interval
+        self.overrides = overrides or {}
+        self.burst = burst
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.stats = {'throttled': 0, 'slow': 0}
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host, now):
+        state = self._hosts.get(host)
+        if state is None:
+            if host in self.overrides:
+                state = _Host(self.overrides[host], max(self.min_interval, self.overrides[host]), now)
+            else:
+                state = _Host(self.interval, self.min_interval, now)
+            self._hosts[host] = state
+        return state
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+
+        # Reserve the next free slot for this host under the lock, then sleep
+        # outside it so other hosts are never held up by this one.
+        with self._lock:
+            now = time.monotonic()
+            state = self._host(host, now)
+            next_slot = max(state.next_slot, now)
+            slot = max(now, next_slot - (self.burst - 1) * state.interval, state.paused_until)
+            state.next_slot = max(next_slot, slot) + state.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def feedback(self, url, status=200, latency=None, retry_after=None):
+        # status is the HTTP code, or None when no response came back.
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            state = self._host(host, now)
+            rate = 1.0 / max(state.interval, 1e-3)
+            cooling = now - state.cut_at < COOLDOWN
+            if throttled(status):
+                self.stats['throttled'] += 1
+                if retry_after:
+                    state.paused_until = max(state.paused_until, now + retry_after)
+                if not cooling:
+                    rate *= DECREASE
+                    state.cut_at = now
+            elif latency is not None and state.samples >= WARMUP and latency > SLOW_FACTOR * state.latency:
+                self.stats['slow'] += 1
+                if not cooling:
+                    rate *= SLOW_DECREASE
+                    state.cut_at = now
+            elif not cooling:
+                rate += INCREASE
+            if latency is not None and not throttled(status):
+                state.latency = latency if not state.samples else (1 - LATENCY_ALPHA) * state.latency + LATENCY_ALPHA * latency
+                state.samples += 1
+            state.interval = min(self.max_interval, max(state.floor, 1.0 / rate))
+
+    def current_interval(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            state = self._hosts.get(host)
+            return state.interval if state else self.overrides.get(host, self.interval)
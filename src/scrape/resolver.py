@@ -0,0 +1,315 @@
+import argparse
+import csv
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from functools import partial
+import numpy as np
+from scrape import sink as sinks
+from scrape.cache import ResponseCache, CACHE_PATH
+from scrape.ledger import JobLedger, LEDGER_PATH
+from scrape.metrics import Metrics, NULL_METRICS, METRICS_DIR
+from scrape.title_index import TitleIndex
+from utils import telugu_text
+
+OUTPUT_DIR = "lyrics_resolved"
+MIN_TELUGU_CHARS = 30
+SONG_WORKERS = 4
+
+@dataclass
+class Resolution:
+    song: str
+    movie: str
+    found: bool = False
+    lyrics: str = ""
+    url: str = ""
+    backend: str = ""
+    seconds: float = 0.0
+    # backend name -> won / missed / error / timeout / cancelled, or
+    # skipped (over the cost budget) / not started (won before its delay)
+    outcomes: dict = field(default_factory=dict)
+
+class Cancelled(Exception):
+    pass
+
+# --- backends -------------------------------------------------------------------
+# A backend answers resolve(song, movie, cancelled) -> (found, lyrics, url) and
+# checks `cancelled` before every request, retries included: a thread can't be
+# killed, but it can stop before its next request once another backend has
+# won or it has timed out. Until the request it is in returns, a cancelled
+# backend still holds its executor thread, so cancelling frees capacity one
+# request later, not at once; the executor is sized for these stragglers.
+
+class Backend:
+    name = "backend"
+
+    def __init__(self, cost=0.0, timeout=30.0, start_after=0.0):
+        self.cost = cost
+        self.timeout = timeout
+        self.start_after = start_after
+
+    def resolve(self, song, movie, cancelled):
+        raise NotImplementedError
+
+    @staticmethod
+    def check(cancelled):
+        if cancelled.is_set():
+            raise Cancelled()
+
+    def checker(self, cancelled):
+        # For the scrapers' `check` hooks, which run before each request.
+        return partial(self.check, cancelled)
+
+class SerperBackend(Backend):
+    # One paid search per song (cost is in Serper credits), then plain GETs.
+    name = "serper"
+
+    def __init__(self, scraper, cost=1.0, timeout=20.0, start_after=0.0):
+        super().__init__(cost, timeout, start_after)
+        self.scraper = scraper
+
+    def resolve(self, song, movie, cancelled):
+        urls = self.scraper.get_lyricstape_urls(song, movie)
+        if urls is None:
+            raise RuntimeError("Serper search failed")
+        for url in urls:
+            lyrics = self.scraper.fetch_lyrics(url, self.checker(cancelled))
+            if lyrics:
+                return True, lyrics, url
+        return False, "", ""
+
+class StealthBackend(Backend):
+    # DuckDuckGo through a real browser: free, but slow. Browsers come from a
+    # BrowserPool so concurrent songs each get their own.
+    name = "stealth"
+
+    def __init__(self, scraper, pool, cost=0.0, timeout=45.0, start_after=0.0):
+        super().__init__(cost, timeout, start_after)
+        self.scraper = scraper
+        self.pool = pool
+
+    def resolve(self, song, movie, cancelled):
+        from scrape.lyrics_extractionV2 import MAX_RESULTS_TO_CHECK
+        check = self.checker(cancelled)
+        with self.pool.driver() as driver:
+            urls = self.scraper.search_results(song, movie, driver, check) or []
+            for url in urls[:MAX_RESULTS_TO_CHECK]:
+                if "lyricstape.com" not in url:
+                    continue
+                html = self.scraper.page_source(url, driver, check)
+                content = self.scraper.extract_from_page(html) if html else None
+                if content:
+                    return True, content, url
+                break
+        return False, "", ""
+
+# --- resolver -------------------------------------------------------------------
+
+class LyricsResolver:
+    def __init__(self, backends, min_telugu_chars=MIN_TELUGU_CHARS, max_cost=None, song_workers=SONG_WORKERS, metrics=None):
+        self.metrics = metrics or NULL_METRICS
+        self.backends = sorted(backends, key=lambda b: b.start_after)
+        self.min_telugu_chars = min_telugu_chars
+        self.max_cost = max_cost
+        self.song_workers = song_workers
+        self.spent = 0.0
+        self.wins = Counter()
+        self.outcomes = Counter()
+        self._lock = threading.Lock()
+        # Every song can have every backend in flight, plus losers still
+        # winding down after cancellation.
+        self._executor = ThreadPoolExecutor(max_workers=2 * song_workers * len(backends))
+
+    def good(self, lyrics):
+        return bool(lyrics) and telugu_text.count_telugu_chars(lyrics) >= self.min_telugu_chars
+
+    def _charge(self, backend):
+        with self._lock:
+            if self.max_cost is not None and self.spent + backend.cost > self.max_cost:
+                return False
+            self.spent += backend.cost
+            return True
+
+    def resolve(self, song, movie):
+        # Backends are started as their start_after comes due (0 = at once);
+        # the first good answer wins and every other backend is cancelled.
+        # Backends past their timeout are abandoned, not waited for.
+        start = time.monotonic()
+        result = Resolution(song, movie)
+        queued = list(self.backends)
+        running = {}
+
+        def launch(now):
+            # A delay only gives the running backends a head start: with none
+            # left running (all missed or failed), the next one starts now
+            # instead of being waited for.
+            while queued and (not running or queued[0].start_after <= now - start):
+                backend = queued.pop(0)
+                if not self._charge(backend):
+                    result.outcomes[backend.name] = "skipped"
+                    continue
+                cancelled = threading.Event()
+                future = self._executor.submit(backend.resolve, song, movie, cancelled)
+                running[future] = (backend, cancelled, now)
+
+        def stop_all(outcome):
+            for backend, cancelled, _ in running.values():
+                cancelled.set()
+                result.outcomes.setdefault(backend.name, outcome)
+            running.clear()
+
+        launch(start)
+        while running or queued:
+            now = time.monotonic()
+            deadlines = [started + b.timeout for b, _, started in running.values()]
+            if queued:
+                deadlines.append(start + queued[0].start_after)
+            done, _ = wait(running, timeout=max(0.0, min(deadlines) - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                backend, _, _ = running.pop(future)
+                try:
+                    found, lyrics, url = future.result()
+                except Cancelled:
+                    result.outcomes[backend.name] = "cancelled"
+                    continue
+                except Exception:
+                    result.outcomes[backend.name] = "error"
+                    continue
+                if found and self.good(lyrics):
+                    result.found, result.lyrics, result.url, result.backend = True, lyrics, url, backend.name
+                    result.outcomes[backend.name] = "won"
+                    stop_all("cancelled")
+                    for skipped in queued:
+                        result.outcomes[skipped.name] = "not started"
+                    queued.clear()
+                    break
+                result.outcomes[backend.name] = "missed"
+
+            now = time.monotonic()
+            for future, (backend, cancelled, started) in list(running.items()):
+                if now - started >= backend.timeout:
+                    cancelled.set()
+                    result.outcomes[backend.name] = "timeout"
+                    del running[future]
+            launch(now)
+
+        result.seconds = time.monotonic() - start
+        self.metrics.observe("resolve", result.seconds, winner=result.backend or "none")
+        for name, outcome in result.outcomes.items():
+            self.metrics.inc("backend", backend=name, outcome=outcome)
+        with self._lock:
+            if result.found:
+                self.wins[result.backend] += 1
+            self.outcomes.update(f"{name}:{outcome}" for name, outcome in result.outcomes.items())
+        return result
+
+    def resolve_many(self, rows, song_key='song_name', movie_key='movie_album', on_result=None):
+        # Songs are resolved song_workers at a time; results are yielded in
+        # input order.
+        with ThreadPoolExecutor(max_workers=self.song_workers) as pool:
+            results = pool.map(lambda row: self.resolve(row[song_key], row.get(movie_key, '')), rows)
+            for i, (row, result) in enumerate(zip(rows, results)):
+                if on_result:
+                    on_result(i, row, result)
+                yield result
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def save_resolution(result, sink, on_durable=None):
+    # Same record as the scrapers' own output, with the winning backend as
+    # the source.
+    rec = sinks.record(result.song, result.movie, result.lyrics, f"lyricstape.com ({result.backend})", result.url, "resolver")
+    return sink.write(rec, on_durable)
+
+def summarize(resolver, results):
+    seconds = np.array([r.seconds for r in results]) if results else np.zeros(1)
+    found = sum(r.found for r in results)
+    print(f"\nResolved {found}/{len(results)} | p50 {np.percentile(seconds, 50):.2f}s p99 {np.percentile(seconds, 99):.2f}s | cost spent {resolver.spent:g}")
+    for name, wins in resolver.wins.most_common():
+        print(f"  {name}: won {wins}")
+
+def main(csv_file, backends, ledger=None, title_index=None, max_cost=None, song_workers=SONG_WORKERS, metrics=None, sink=None):
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        songs = list(csv.DictReader(f))
+    if ledger:
+        songs = ledger.pending(songs)
+    if title_index:
+        songs = title_index.missing(songs)
+    print(f"--- Resolving {len(songs)} songs with {', '.join(b.name for b in backends)} ---")
+
+    resolver = LyricsResolver(backends, max_cost=max_cost, song_workers=song_workers, metrics=metrics)
+    sink = sink or sinks.TxtSink(OUTPUT_DIR)
+    total = len(songs)
+
+    def report(i, row, result):
+        tried = ", ".join(f"{k}={v}" for k, v in result.outcomes.items())
+        if result.found:
+            save_resolution(result, sink, partial(ledger.complete, result.song, result.movie, result.url) if ledger else None)
+            print(f"[{i+1}/{total}] {result.song}... Found via {result.backend} in {result.seconds:.1f}s ({tried})")
+        else:
+            if ledger:
+                ledger.fail(result.song, result.movie, tried or "no backend ran")
+            print(f"[{i+1}/{total}] {result.song}... Missing ({tried})")
+
+    try:
+        results = list(resolver.resolve_many(songs, on_result=report))
+    finally:
+        resolver.close()
+        sink.close()
+    summarize(resolver, results)
+    if metrics and metrics.enabled:
+        paths = metrics.write()
+        print(f"Time by stage (metrics in {paths[0].parent}):\n{metrics.summary()}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve lyrics from several sources at once, keeping the first good answer")
+    parser.add_argument("csv_file", nargs="?", default="rawdata/pending_songs.csv")
+    parser.add_argument("--backends", default="serper,stealth", help="comma-separated: serper, stealth")
+    parser.add_argument("--song-workers", type=int, default=SONG_WORKERS, help="songs resolved at once")
+    parser.add_argument("--browsers", type=int, default=2, help="browser pool size for the stealth backend")
+    parser.add_argument("--serper-timeout", type=float, default=20.0)
+    parser.add_argument("--stealth-timeout", type=float, default=45.0)
+    parser.add_argument("--serper-delay", type=float, default=0.0, help="seconds to let free backends try before spending a Serper credit")
+    parser.add_argument("--max-credits", type=float, default=None, help="stop using paid backends after this many credits")
+    parser.add_argument("--cache", default=CACHE_PATH, help="response cache database")
+    parser.add_argument("--no-cache", action="store_true", help="always hit the network")
+    parser.add_argument("--ledger", default=LEDGER_PATH, help="job ledger database for resumable runs")
+    parser.add_argument("--no-ledger", action="store_true", help="process every song, ignoring past runs")
+    parser.add_argument("--no-title-index", action="store_true", help="search even for songs the local corpus already has")
+    parser.add_argument("--metrics-dir", default=METRICS_DIR, help="where the .prom and .json run metrics are written")
+    parser.add_argument("--no-metrics", action="store_true", help="disable instrumentation")
+    parser.add_argument("--sink", choices=sinks.SINKS, default="jsonl", help="output format; txt is the old one file per song")
+    parser.add_argument("--shard-dir", default=sinks.SHARD_DIR, help="where jsonl/parquet shards are written")
+    args = parser.parse_args()
+
+    # One Metrics for the run: both backends' scrapers report into it.
+    metrics = None if args.no_metrics else Metrics("resolver", args.metrics_dir)
+    cache = None if args.no_cache else ResponseCache(args.cache)
+    names = [n.strip() for n in args.backends.split(",") if n.strip()]
+    backends = []
+    pool = None
+    if "serper" in names:
+        from scrape.lyrics_extraction import LyricstapeSerperScraper, SERPER_API_KEY
+        serper = LyricstapeSerperScraper(SERPER_API_KEY, workers=args.song_workers, cache=cache, metrics=metrics)
+        backends.append(SerperBackend(serper, timeout=args.serper_timeout, start_after=args.serper_delay))
+    if "stealth" in names:
+        from scrape.lyrics_extractionV2 import StealthDeepScraper
+        from scrape.browser_pool import BrowserPool
+        # Browsers come from the pool; the scraper starts none of its own.
+        stealth = StealthDeepScraper(cache=cache, metrics=metrics, start_driver=False)
+        pool = BrowserPool(stealth._setup_driver, size=args.browsers)
+        backends.append(StealthBackend(stealth, pool, timeout=args.stealth_timeout))
+
+    ledger = None if args.no_ledger else JobLedger("resolver", args.ledger)
+    title_index = None if args.no_title_index else TitleIndex.from_local()
+    try:
+        sink = sinks.open_sink(args.sink, "resolver", args.shard_dir, txt_root=OUTPUT_DIR)
+        main(args.csv_file, backends, ledger, title_index, args.max_credits, args.song_workers, metrics, sink)
+    finally:
+        if pool:
+            pool.close()
@@ -3,10 +3,45 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+import argparse
 import csv
-import time
+import os
 import re
 
+ARTIST_URL = "https://www.jiosaavn.com/artist/sirivennela-seetharama-sastry-songs/u-vLZvgDCPM_"
+OUTPUT_CSV = "sirivennela_songs.csv"
+FIELDS = ["song_name", "movie_album", "singers"]
+MAX_CLICKS = 100
+LOAD_TIMEOUT = 10
+
+# Runs in the page: returns every song row from index `arguments[0]` onward
+# as plain data, so a whole batch costs one WebDriver round-trip instead of
+# one innerHTML fetch per row.
+EXTRACT_ROWS_JS = """
+const start = arguments[0];
+let rows = Array.from(document.querySelectorAll('article.o-snippet, figure.c-snippet'));
+if (!rows.length) {
+    rows = Array.from(document.querySelectorAll('a[href^="/song/"]')).map(a => a.parentElement);
+}
+const text = a => a ? a.textContent.trim() : '';
+return {
+    total: rows.length,
+    songs: rows.slice(start).map(row => ({
+        song_name: text(row.querySelector('a[href^="/song/"]')),
+        movie_album: text(row.querySelector('a[href^="/album/"]')),
+        singers: Array.from(row.querySelectorAll('a[href^="/artist/"]')).map(text).join(', '),
+    })),
+};
+"""
+
+COUNT_ROWS_JS = """
+const rows = document.querySelectorAll('article.o-snippet, figure.c-snippet');
+return rows.length || document.querySelectorAll('a[href^="/song/"]').length;
+"""
+
+LOAD_MORE_XPATH = "//button[contains(@class, 'c-btn') and contains(., 'Load more')]"
+
 def setup_driver():
     opts = Options()
     opts.add_argument("--headless=new")
@@ -16,112 +51,115 @@ def setup_driver():
     opts.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0")
     return webdriver.Chrome(options=opts)
 
-def main():
-    url = "https://www.jiosaavn.com/artist/sirivennela-seetharama-sastry-songs/u-vLZvgDCPM_"
-    
+def remove_overlays(driver):
+    try:
+        driver.execute_script("""
+            document.querySelectorAll('[class*="modal"], [class*="popup"], [class*="overlay"]')
+                .forEach(el => el.remove());
+        """)
+    except:
+        pass
+
+class SongStream:
+    # Appends unique songs to the CSV as they are found, so memory and output
+    # stay proportional to what has been seen once, not to the catalogue.
+    # Rows go to <path>.tmp, swapped in only by a run that finishes, so a run
+    # that fails early leaves the last good song list in place.
+    def __init__(self, path):
+        self.path = path
+        self.tmp = f"{path}.tmp"
+        self.file = open(self.tmp, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+        self.writer.writeheader()
+        self.seen = set()
+
+    def add(self, songs):
+        added = 0
+        for s in songs:
+            key = s["song_name"].lower()
+            if key and key not in self.seen:
+                self.seen.add(key)
+                self.writer.writerow(s)
+                added += 1
+        self.file.flush()
+        return added
+
+    def close(self, keep=False):
+        self.file.close()
+        if keep:
+            os.replace(self.tmp, self.path)
+
+def load_more(driver, rows_before):
+    try:
+        btn = WebDriverWait(driver, 5).until(
+            EC.presence_of_element_located((By.XPATH, LOAD_MORE_XPATH))
+        )
+    except TimeoutException:
+        return False
+
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();", btn)
+    # Wait for the new rows themselves rather than a fixed pause.
+    try:
+        WebDriverWait(driver, LOAD_TIMEOUT, poll_frequency=0.2).until(
+            lambda d: d.execute_script(COUNT_ROWS_JS) > rows_before
+        )
+        return True
+    except TimeoutException:
+        return False
+
+def fallback_songs(page_html):
+    pattern = r'\[([^\]]+)\]\(/song/([^)]+)\)[^\[]*\[([^\]]+)\][^\[]*\[([^\]]+)\]'
+    for m in re.findall(pattern, page_html):
+        yield {
+            "song_name": m[0].strip(),
+            "movie_album": m[3].strip() if len(m) > 3 else "",
+            "singers": m[2].strip() if len(m) > 2 else ""
+        }
+
+def main(url=ARTIST_URL, output_csv=OUTPUT_CSV, max_clicks=MAX_CLICKS):
     print("Starting browser...")
     driver = setup_driver()
-    
+    stream = SongStream(output_csv)
+    done = False
+
     try:
         driver.get(url)
-        time.sleep(3)
-        
         try:
-            driver.execute_script("""
-                document.querySelectorAll('[class*="modal"], [class*="popup"], [class*="overlay"]')
-                    .forEach(el => el.remove());
-            """)
-        except:
-            pass
-        
+            WebDriverWait(driver, LOAD_TIMEOUT).until(lambda d: d.execute_script(COUNT_ROWS_JS) > 0)
+        except TimeoutException:
+            print("No song rows rendered yet")
+        remove_overlays(driver)
+
+        offset = 0
         clicks = 0
-        while clicks < 100:  
-            try:
-                btn = WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.XPATH, 
-                        "//button[contains(@class, 'c-btn') and contains(., 'Load more')]"))
-                )
-                
-                driver.execute_script(
-                    "arguments[0].scrollIntoView({block: 'center'});", btn)
-                time.sleep(0.5)
-                
-                driver.execute_script("arguments[0].click();", btn)
-                clicks += 1
-                print(f"Clicked Load more ({clicks})...")
-                time.sleep(1.5)
-                
-            except Exception as e:
-                print(f"No more Load more button: {type(e).__name__}")
+        while True:
+            batch = driver.execute_script(EXTRACT_ROWS_JS, offset)
+            offset = batch["total"]
+            added = stream.add(batch["songs"])
+            print(f"Rows: {offset} | new unique songs: {added} | total: {len(stream.seen)}")
+
+            if clicks >= max_clicks or not load_more(driver, offset):
                 break
-        
-        print(f"\nClicked {clicks} times. Extracting songs...")
-        
-        songs = []
-        rows = driver.find_elements(By.CSS_SELECTOR, "article.o-snippet, figure.c-snippet")
-        
-        if not rows:
-            rows = driver.find_elements(By.XPATH, "//a[contains(@href, '/song/')]/..")
-        
-        print(f"Found {len(rows)} song elements")
-        
-        for row in rows:
-            try:
-                html = row.get_attribute("innerHTML")
-                
-                song_match = re.search(r'href="/song/[^"]+">([^<]+)</a>', html)
-                song_name = song_match.group(1).strip() if song_match else ""
-                
-                album_match = re.search(r'href="/album/[^"]+">([^<]+)</a>', html)
-                album = album_match.group(1).strip() if album_match else ""
-                
-                artist_matches = re.findall(r'href="/artist/[^"]+">([^<]+)</a>', html)
-                singers = ", ".join(artist_matches) if artist_matches else ""
-                
-                if song_name:
-                    songs.append({
-                        "song_name": song_name,
-                        "movie_album": album,
-                        "singers": singers
-                    })
-            except Exception as e:
-                continue
-        
-        if len(songs) < 50:
+            clicks += 1
+
+        print(f"\nClicked Load more {clicks} times.")
+
+        if len(stream.seen) < 50:
             print("Trying alternative extraction...")
-            page_html = driver.page_source
-            
-            pattern = r'\[([^\]]+)\]\(/song/([^)]+)\)[^\[]*\[([^\]]+)\][^\[]*\[([^\]]+)\]'
-            matches = re.findall(pattern, page_html)
-            
-            for m in matches:
-                song_name = m[0].strip()
-                if song_name and not any(s["song_name"] == song_name for s in songs):
-                    songs.append({
-                        "song_name": song_name,
-                        "movie_album": m[3].strip() if len(m) > 3 else "",
-                        "singers": m[2].strip() if len(m) > 2 else ""
-                    })
-        
-        seen = set()
-        unique = []
-        for s in songs:
-            key = s["song_name"].lower()
-            if key and key not in seen:
-                seen.add(key)
-                unique.append(s)
-        
-        print(f"\nExtracted {len(unique)} unique songs")
-        
-        if unique:
-            with open("sirivennela_songs.csv", "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=["song_name", "movie_album", "singers"])
-                writer.writeheader()
-                writer.writerows(unique)
-            print(f" Saved to sirivennela_songs.csv")
-        
+            stream.add(fallback_songs(driver.page_source))
+
+        print(f"\nExtracted {len(stream.seen)} unique songs")
+        done = bool(stream.seen)
+        print(f" Saved to {output_csv}" if done else f" Nothing saved; {output_csv} left as it was")
+
     finally:
+        stream.close(keep=done)
         driver.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("url", nargs="?", default=ARTIST_URL, help="JioSaavn artist page")
+    parser.add_argument("-o", "--output", default=OUTPUT_CSV)
+    parser.add_argument("--max-clicks", type=int, default=MAX_CLICKS)
+    args = parser.parse_args()
+    main(args.url, args.output, args.max_clicks)
@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+SHARD_DIR = "lyrics_shards"
+BATCH_SIZE = 64
+# A checkpoint fsyncs the shard; only then are songs reported done to the
+# ledger, so a crash loses at most what the ledger will retry anyway.
+CHECKPOINT_EVERY = 256
+CHECKPOINT_SECONDS = 30.0
+FIELDS = ("song_name", "movie_name", "source", "url", "lyrics", "scraper", "scraped_at")
+SINKS = ("jsonl", "parquet", "txt")
+
+def record(song, movie, lyrics, source="", url="", scraper=""):
+    return {"song_name": song, "movie_name": movie, "source": source, "url": url or "",
+            "lyrics": lyrics, "scraper": scraper, "scraped_at": time.time()}
+
+def safe_name(text):
+    return re.sub(r'[^\w\-_]', '', text.replace(' ', '_'))
+
+def write_txt(root, rec):
+    # The scrapers' original layout: <root>/<movie>/<song>.txt with a
+    # "Key: value" header, a blank line, then the lyrics.
+    folder = Path(root) / safe_name(rec["movie_name"])
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{safe_name(rec['song_name'])}.txt"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Song: {rec['song_name']}\nMovie: {rec['movie_name']}\nSource: {rec['source']}\nURL: {rec['url']}\n\n{rec['lyrics']}")
+    return path
+
+def shard_path(directory, scraper, suffix):
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return Path(directory) / f"{scraper}-{stamp}-{os.getpid()}{suffix}"
+
+def _shard_schema():
+    # pyarrow (and pandas, for reading) are imported only where needed: a
+    # JSONL run never loads either.
+    import pyarrow as pa
+    return pa.schema([
+        ("song_name", pa.string()), ("movie_name", pa.string()), ("source", pa.string()),
+        ("url", pa.string()), ("lyrics", pa.large_string()), ("scraper", pa.string()),
+        ("scraped_at", pa.float64()),
+    ])
+
+class _BatchSink:
+    # Buffers records and hands them to _write in batches. on_durable(path)
+    # runs once the record it came with has been fsynced.
+    def __init__(self, path, batch_size=BATCH_SIZE, checkpoint_every=CHECKPOINT_EVERY, checkpoint_seconds=CHECKPOINT_SECONDS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_seconds = checkpoint_seconds
+        self.written = 0
+        self._buffer = []
+        self._waiting = []
+        self._since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        self._lock = threading.Lock()
+
+    def write(self, rec, on_durable=None):
+        with self._lock:
+            target = self._target()
+            self._buffer.append(rec)
+            if on_durable:
+                self._waiting.append((on_durable, target))
+            self._since_checkpoint += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+            if (self._since_checkpoint >= self.checkpoint_every
+                    or time.monotonic() - self._last_checkpoint >= self.checkpoint_seconds):
+                self._checkpoint()
+        return target
+
+    def _target(self):
+        return self.path
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def checkpoint(self):
+        with self._lock:
+            self._checkpoint()
+
+    def close(self):
+        with self._lock:
+            self._checkpoint()
+            self._close()
+
+    def _flush(self):
+        if self._buffer:
+            self._write(self._buffer)
+            self.written += len(self._buffer)
+            self._buffer = []
+
+    def _checkpoint(self):
+        self._flush()
+        self._sync()
+        waiting, self._waiting = self._waiting, []
+        self._since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        for callback, path in waiting:
+            callback(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class JsonlSink(_BatchSink):
+    # One append-only file per run; each batch is a single write().
+    suffix = ".jsonl"
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _write(self, batch):
+        self._file.write("".join(json.dumps(rec, ensure_ascii=False) + "\n" for rec in batch))
+        self._file.flush()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._file.close()
+
+class ParquetSink(_BatchSink):
+    # Batches become row groups. A Parquet file is unreadable until its footer
+    # is written, so each checkpoint closes the current part and the next
+    # batch starts a new one: <run>-00000.parquet, <run>-00001.parquet, ...
+    suffix = ".parquet"
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self.parts = []
+        self._writer = None
+        self._tmp = None
+
+    def _part(self):
+        return self.path.with_name(f"{self.path.stem}-{len(self.parts):05d}{self.suffix}")
+
+    _target = _part
+
+    def _write(self, batch):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pylist([{k: rec.get(k) for k in FIELDS} for rec in batch], schema=_shard_schema())
+        if self._writer is None:
+            self._tmp = self._part().with_suffix(".parquet.tmp")
+            self._writer = pq.ParquetWriter(self._tmp, table.schema, compression="zstd")
+        self._writer.write_table(table)
+
+    def _sync(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        with open(self._tmp, "rb") as f:
+            os.fsync(f.fileno())
+        part = self._part()
+        os.replace(self._tmp, part)
+        self.parts.append(part)
+        self._writer = None
+
+    def _close(self):
+        pass
+
+class TxtSink:
+    # The per-song file layout, for tools that still want it.
+    def __init__(self, root):
+        self.path = Path(root)
+        self.written = 0
+
+    def write(self, rec, on_durable=None):
+        path = write_txt(self.path, rec)
+        self.written += 1
+        if on_durable:
+            on_durable(path)
+        return path
+
+    def flush(self):
+        pass
+
+    def checkpoint(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_sink(kind, scraper, directory=SHARD_DIR, txt_root=None, **kwargs):
+    if kind == "txt":
+        return TxtSink(txt_root or directory)
+    cls = {"jsonl": JsonlSink, "parquet": ParquetSink}[kind]
+    return cls(shard_path(directory, scraper, cls.suffix), **kwargs)
+
+def shard_files(paths=(SHARD_DIR,)):
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files += sorted(p for p in path.iterdir() if p.suffix in (".jsonl", ".parquet"))
+        elif path.is_file():
+            files.append(path)
+    return files
+
+def _read_jsonl(path):
+    import pandas as pd
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A run killed mid-batch can leave half a line at the end.
+                break
+    return pd.DataFrame(rows, columns=list(FIELDS))
+
+def read_shards(paths=(SHARD_DIR,), columns=None):
+    import pandas as pd
+    frames = []
+    for path in shard_files(paths):
+        if path.suffix == ".parquet":
+            frames.append(pd.read_parquet(path, columns=columns))
+        else:
+            df = _read_jsonl(path)
+            frames.append(df[columns] if columns else df)
+    if not frames:
+        return pd.DataFrame(columns=columns or list(FIELDS))
+    return pd.concat(frames, ignore_index=True)
+
+def export_txt(paths, output_dir):
+    # Rebuilds <movie>/<song>.txt from shards; later shards win on a clash,
+    # as a later scrape would have overwritten the file.
+    df = read_shards(paths).sort_values("scraped_at", kind="stable")
+    for rec in df.to_dict("records"):
+        write_txt(output_dir, {k: ("" if v is None or v != v else v) for k, v in rec.items()})
+    return len(df)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export scraper shards to the <movie>/<song>.txt layout")
+    parser.add_argument("shards", nargs="*", default=[SHARD_DIR], help="shard files or directories")
+    parser.add_argument("-o", "--output", required=True, help="folder to write <movie>/<song>.txt into")
+    args = parser.parse_args()
+    count = export_txt(args.shards, args.output)
+    print(f"{count} songs from {len(shard_files(args.shards))} shards -> {args.output}")
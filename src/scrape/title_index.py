@@ -0,0 +1,196 @@
+import argparse
+import csv
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from utils.telugu_text import fold_title
+
+# Different songs often share most of a title ("Cheliya" and "Cheliya
+# Cheliya" score 0.78), so fuzzy matches need a high score and a movie that
+# agrees on both sides.
+MATCH_THRESHOLD = 0.85
+MOVIE_THRESHOLD = 0.5
+GRAM = 3
+
+# Everything we already hold lyrics for. Missing entries are skipped, so a
+# fresh checkout with only rawdata/ still works.
+LYRICS_CSVS = ("rawdata/extracted_data.csv", "cleaneddata/sirivennela_cleaned_data.csv")
+TXT_TREES = ("lyrics_serper_tape", "lyrics_stealth_v13", "lyrics_resolved")
+CORPUS_FILES = ("cleaneddata/corpus.parquet", "cleaneddata/corpus.arrow")
+SHARD_DIRS = ("lyrics_shards",)
+
+# "Samajavaragamana - Female", "Gali Chiru Gali (Bit)": another recording of
+# lyrics we already hold, so the version tag is ignored when matching.
+VERSION_RE = re.compile(r'\s*(\([^)]*\)|\[[^\]]*\]|\s-\s.*)\s*$')
+
+@dataclass
+class TitleMatch:
+    song: str
+    movie: str
+    source: str
+    score: float
+
+def title_key(song):
+    previous = None
+    song = str(song or '')
+    while song != previous:
+        previous, song = song, VERSION_RE.sub('', song)
+    return fold_title(song)
+
+def _grams(key):
+    padded = f"  {key} "
+    return {padded[i:i + GRAM] for i in range(len(padded) - GRAM + 1)}
+
+def _similar(a, b):
+    if a == b:
+        return 1.0
+    ga, gb = _grams(a), _grams(b)
+    return len(ga & gb) / len(ga | gb)
+
+class TitleIndex:
+    # Answers "do we already have lyrics for this song?" before a scraper
+    # spends an API call or a page load on it. Titles are folded (see
+    # fold_title), looked up exactly first, then by trigram overlap.
+    def __init__(self, threshold=MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.entries = []
+        self.exact = defaultdict(list)
+        self.postings = defaultdict(list)
+        self.grams = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, song, movie=None, source=""):
+        key = title_key(song)
+        if not key:
+            return
+        movie_key = fold_title(movie)
+        if any(self.entries[i][1] == movie_key for i in self.exact[key]):
+            return
+        i = len(self.entries)
+        self.entries.append((key, movie_key, song, movie or "", source))
+        self.exact[key].append(i)
+        grams = _grams(key)
+        for gram in grams:
+            self.postings[gram].append(i)
+        self.grams.append(grams)
+
+    def _movie_ok(self, i, movie_key, exact=True):
+        # A song asked for with its movie is only held if an entry names a
+        # similar movie: an entry without one (the cleaned CSV has none) may
+        # be any film's song of that title ("Vayyari Bhama"). Asked for by
+        # title alone, an exact title is enough; a fuzzy one never is.
+        held = self.entries[i][1]
+        if not movie_key:
+            return exact
+        return bool(held) and _similar(held, movie_key) >= MOVIE_THRESHOLD
+
+    def _match(self, i, score):
+        _, _, song, movie, source = self.entries[i]
+        return TitleMatch(song, movie, source, score)
+
+    def lookup(self, song, movie=None):
+        key = title_key(song)
+        if not key:
+            return None
+        movie_key = fold_title(movie)
+        for i in self.exact.get(key, ()):
+            if self._movie_ok(i, movie_key):
+                return self._match(i, 1.0)
+
+        # Prefix filter: a match shares at least ceil(t * |q|) of the query's
+        # grams, so it must hold one of the |q| - ceil(t * |q|) + 1 rarest.
+        # Only those postings are walked, then each candidate is verified.
+        grams = sorted(_grams(key), key=lambda g: len(self.postings.get(g, ())))
+        prefix = len(grams) - math.ceil(self.threshold * len(grams)) + 1
+        candidates = {i for g in grams[:prefix] for i in self.postings.get(g, ())}
+        query = set(grams)
+        best, best_score = None, self.threshold
+        for i in candidates:
+            shared = len(query & self.grams[i])
+            score = shared / (len(query) + len(self.grams[i]) - shared)
+            if score >= best_score and self._movie_ok(i, movie_key, exact=False):
+                best, best_score = i, score
+        return None if best is None else self._match(best, best_score)
+
+    def __contains__(self, song):
+        return self.lookup(song) is not None
+
+    def missing(self, rows, song_key='song_name', movie_key='movie_album'):
+        pending, unsure = [], []
+        for row in rows:
+            match = self.lookup(row[song_key], row.get(movie_key))
+            if match is None:
+                pending.append(row)
+            elif match.score < 1.0 or not match.movie or not row.get(movie_key):
+                unsure.append((row, match))
+        # Fuzzy matches, and title-only ones without a movie on both sides,
+        # are skipped like the rest; list them so a wrong one can be spotted
+        # and the song scraped by hand.
+        for row, match in unsure:
+            print(f"title index: skipping '{row[song_key]}' ({row.get(movie_key) or '-'}), "
+                  f"taken as '{match.song}' ({match.movie or '-'}, {match.source}) at {match.score:.2f}")
+        return pending
+
+    @classmethod
+    def from_local(cls, csvs=LYRICS_CSVS, txt_trees=TXT_TREES, corpus_files=CORPUS_FILES, shard_dirs=SHARD_DIRS, threshold=MATCH_THRESHOLD):
+        import pandas as pd
+        index = cls(threshold)
+        for path in map(Path, csvs):
+            if path.is_file():
+                df = pd.read_csv(path, usecols=lambda c: c in ('song_name', 'movie_name', 'lyrics', 'final_lyrics'))
+                index._add_frame(df, path.stem)
+        for path in map(Path, corpus_files):
+            if path.is_file():
+                # Only the name columns are read; lyrics stay on disk.
+                from utils import corpus_store
+                df = corpus_store.load_corpus(path, columns=['song_name', 'movie_name', 'source'])
+                for song, movie, source in zip(df['song_name'], df['movie_name'], df['source']):
+                    index.add(song, movie if isinstance(movie, str) else None, source or path.stem)
+        for root in map(Path, txt_trees):
+            # Scraper output is <movie>/<song>.txt; the names are enough, so
+            # the files themselves are never opened.
+            if root.is_dir():
+                for path in root.glob("*/*.txt"):
+                    index.add(path.stem, path.parent.name, root.name)
+        if any(Path(d).is_dir() for d in shard_dirs):
+            from scrape.sink import read_shards
+            df = read_shards(shard_dirs, columns=['song_name', 'movie_name', 'scraper'])
+            for song, movie, scraper in zip(df['song_name'], df['movie_name'], df['scraper']):
+                index.add(song, movie or None, scraper or "shards")
+        return index
+
+    def _add_frame(self, df, source):
+        # Only rows that actually carry lyrics count as held.
+        text = df['lyrics'] if 'lyrics' in df else df['final_lyrics']
+        held = df[text.fillna('').astype(str).str.strip() != '']
+        movies = held['movie_name'] if 'movie_name' in held else [None] * len(held)
+        for song, movie in zip(held['song_name'], movies):
+            self.add(song, movie if isinstance(movie, str) else None, source)
+
+def write_pending(songs_csv, output, index=None, song_key='song_name', movie_key='movie_album'):
+    # Replaces hand-building pending_songsv1.csv: every row of songs_csv that
+    # the local corpus doesn't already cover.
+    index = index or TitleIndex.from_local()
+    with open(songs_csv, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames
+        rows = list(reader)
+    pending = index.missing(rows, song_key, movie_key)
+    with open(output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(pending)
+    print(f"{len(rows) - len(pending)} of {len(rows)} songs already held ({len(index)} titles indexed) -> {len(pending)} pending in {output}")
+    return pending
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the songs in a CSV that have no local lyrics yet")
+    parser.add_argument("songs_csv", nargs="?", default="rawdata/sirivennela_songs.csv")
+    parser.add_argument("-o", "--output", default="rawdata/pending_songs.csv")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD, help="trigram Jaccard needed for a fuzzy match")
+    args = parser.parse_args()
+    write_pending(args.songs_csv, args.output, TitleIndex.from_local(threshold=args.threshold))
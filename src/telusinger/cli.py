@@ -0,0 +1,116 @@
+import builtins
+import importlib.util
+import os
+import sys
+import types
+from pathlib import Path
+
+# Every stage keeps its own argparse CLI; a command only names the module to
+# run as __main__. Nothing is imported until a command is picked, so --help
+# costs just this file and each command loads only what its stage imports.
+COMMANDS = {
+    "scrape": {
+        "serper": ("scrape.lyrics_extraction", "search lyricstape through Serper and extract lyrics"),
+        "stealth": ("scrape.lyrics_extractionV2", "search and extract lyrics in undetected Chrome"),
+        "resolve": ("scrape.resolver", "race serper and stealth per song, keep the first good answer"),
+        "jiosaavn": ("scrape.selenium_scrapper", "song list from a JioSaavn artist page"),
+        "pending": ("scrape.title_index", "songs in a CSV that have no local lyrics yet"),
+        "export": ("scrape.sink", "write jsonl/parquet shards out as one .txt per song"),
+    },
+    "dataset": ("datasets.bsp_songs", "write the SPB song list as the download dataset CSV"),
+    "download": ("scrape.spb_songs", "download and transcode the dataset's songs with yt-dlp"),
+    "preprocess": ("datasets.audio_pipeline", "resample, normalize, trim and segment downloaded audio"),
+    "align": ("datasets.align_lyrics", "time-align each song's lyric lines to its audio"),
+    "ingest": ("datasets.ingest_lyrics", "stream external zip/xlsx/csv lyrics dumps into one CSV"),
+    "build-corpus": ("data_cleaning.build_corpus", "clean scraped lyrics and compute their metrics"),
+    "corpus": ("utils.corpus_store", "build the columnar corpus file"),
+    "dedup": ("data_cleaning.dedup", "find near-duplicate songs in the corpus"),
+    "index": ("utils.database.lyrics_index", "embed the corpus into a LanceDB table"),
+}
+BENCH_PACKAGE = "bench"
+BENCH_PREFIX = "bench_"
+# Only the telusinger package is installed; the stage packages (scrape,
+# datasets, utils, ...) stay in the checkout's src/ next to it, so they can
+# never shadow an installed package of the same name (Hugging Face's
+# `datasets`). An editable install (`uv sync`, `pip install -e .`) finds
+# them here.
+SRC_ROOT = Path(__file__).resolve().parent.parent
+
+def find_stage(module):
+    if str(SRC_ROOT) not in sys.path:
+        sys.path.insert(0, str(SRC_ROOT))
+    try:
+        return importlib.util.find_spec(module)
+    except ModuleNotFoundError:
+        return None
+
+def benchmarks():
+    # bench_*.py in the bench package, found on disk without importing it.
+    spec = find_stage(BENCH_PACKAGE)
+    if spec is None or not spec.submodule_search_locations:
+        return {}
+    names = set()
+    for folder in spec.submodule_search_locations:
+        names.update(f[len(BENCH_PREFIX):-3] for f in os.listdir(folder)
+                     if f.startswith(BENCH_PREFIX) and f.endswith(".py"))
+    return {name.replace("_", "-"): (f"{BENCH_PACKAGE}.{BENCH_PREFIX}{name}", "")
+            for name in sorted(names)}
+
+def usage(prog, table, extra=()):
+    width = max(map(len, list(table) + [e[0] for e in extra]), default=0) + 2
+    lines = [f"usage: {prog} <command> [args ...]", "", "commands:"]
+    for name, entry in table.items():
+        about = f"{', '.join(entry)} ..." if isinstance(entry, dict) else entry[1]
+        lines.append(f"  {name:<{width}}{about}".rstrip())
+    lines += [f"  {name:<{width}}{about}" for name, about in extra]
+    lines += ["", f"Run '{prog} <command> --help' for a command's own options."]
+    return "\n".join(lines)
+
+def run_module(module, args, prog=None):
+    # Same as `python -m module args`, as runpy.run_module(alter_sys=True)
+    # does it: the stage is installed as __main__, where process pools look
+    # up their worker functions. argv[0] is the command rather than the
+    # module's file, so the stage's usage reads "telusinger dataset".
+    spec = find_stage(module)
+    if spec is None:
+        print(f"{prog or module}: module {module} not found; the stages run from a "
+              f"TeluSinger checkout (pip install -e .)", file=sys.stderr)
+        return 2
+    main = types.ModuleType("__main__")
+    main.__dict__.update(__file__=spec.origin, __spec__=spec, __loader__=spec.loader,
+                         __package__=spec.parent, __builtins__=builtins)
+    code = spec.loader.get_code(module)
+    saved = sys.modules["__main__"], sys.argv
+    sys.modules["__main__"], sys.argv = main, [prog or module, *args]
+    try:
+        exec(code, main.__dict__)
+    finally:
+        sys.modules["__main__"], sys.argv = saved
+    return 0
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    prog = "telusinger"
+    table = COMMANDS
+    extra = [("bench", "run a benchmark from the bench package (no name: list them)")]
+    while True:
+        if not args or args[0] in ("-h", "--help"):
+            print(usage(prog, table, extra))
+            return 0 if args else 2
+        name, args = args[0], args[1:]
+        if table is COMMANDS and name == "bench":
+            table, extra, prog = benchmarks(), [], f"{prog} bench"
+            if not args:
+                print("\n".join(table))
+                return 0
+            continue
+        entry = table.get(name)
+        if entry is None:
+            print(usage(prog, table, extra), file=sys.stderr)
+            print(f"\n{prog}: unknown command '{name}'", file=sys.stderr)
+            return 2
+        prog = f"{prog} {name}"
+        if isinstance(entry, dict):
+            table, extra = entry, []
+            continue
+        return run_module(entry[0], args, prog)
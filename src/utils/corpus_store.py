@@ -0,0 +1,171 @@
+import argparse
+import os
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+RAW_CSV = "rawdata/extracted_data.csv"
+CLEAN_CSV = "cleaneddata/sirivennela_cleaned_data.csv"
+CORPUS_PATH = "cleaneddata/corpus.parquet"
+
+ROW_GROUP_SIZE = 1024
+PARQUET_SUFFIXES = ('.parquet',)
+ARROW_SUFFIXES = ('.arrow', '.feather')
+
+# Text columns are large_string so a corpus past 2 GB of lyrics still fits in
+# one chunk; every metric is nullable because imports without lyrics (or
+# before build_corpus has run) simply don't have them.
+SCHEMA = pa.schema([
+    ('song_name', pa.string()),
+    ('movie_name', pa.string()),
+    ('source', pa.string()),
+    ('url', pa.string()),
+    ('lyrics', pa.large_string()),
+    ('final_lyrics', pa.large_string()),
+    ('word_count', pa.int64()),
+    ('telugu_ratio', pa.float64()),
+    ('uniqueness_ratio', pa.float64()),
+    ('richness', pa.float64()),
+    ('complexity', pa.float64()),
+    ('sanskrit_score', pa.float64()),
+])
+
+def to_table(data):
+    # Conforms a DataFrame (or Table) to SCHEMA: missing columns become nulls,
+    # extra columns are dropped, order is fixed.
+    if isinstance(data, pa.Table):
+        data = data.to_pandas()
+    columns = {}
+    for field in SCHEMA:
+        if field.name in data.columns:
+            columns[field.name] = pa.array(data[field.name], type=field.type, from_pandas=True)
+        else:
+            columns[field.name] = pa.nulls(len(data), type=field.type)
+    return pa.Table.from_pydict(columns, schema=SCHEMA)
+
+def write_corpus(data, path=CORPUS_PATH, row_group_size=ROW_GROUP_SIZE):
+    # .parquet is compressed for storage and sharing; .arrow is an uncompressed
+    # IPC file, the layout that can be memory-mapped with zero copies.
+    table = data if isinstance(data, pa.Table) and data.schema.equals(SCHEMA) else to_table(data)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    if path.suffix in ARROW_SUFFIXES:
+        with pa.OSFile(str(tmp), 'wb') as sink, ipc.new_file(sink, SCHEMA) as writer:
+            writer.write_table(table, max_chunksize=row_group_size)
+    elif path.suffix in PARQUET_SUFFIXES:
+        pq.write_table(table, tmp, row_group_size=row_group_size, compression='zstd')
+    else:
+        raise ValueError(f"{path}: expected one of {PARQUET_SUFFIXES + ARROW_SUFFIXES}")
+    os.replace(tmp, path)
+    return path
+
+def read_corpus(path=CORPUS_PATH, columns=None, filters=None):
+    # Only the requested columns are decoded. For .arrow files the table is a
+    # view onto the mapped file, so untouched lyrics pages are never read.
+    path = Path(path)
+    if path.suffix in ARROW_SUFFIXES:
+        source = pa.memory_map(str(path), 'r')
+        table = ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        if filters is not None:
+            table = table.filter(filters)
+        return table
+    return pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+
+def load_corpus(path=CORPUS_PATH, columns=None, filters=None):
+    return read_corpus(path, columns, filters).to_pandas()
+
+def from_extracted_csv(path=RAW_CSV, source=None):
+    df = pd.read_csv(path, index_col=0)
+    df['source'] = source or Path(path).stem
+    return to_table(df)
+
+def from_cleaned_csv(path=CLEAN_CSV, source=None):
+    # The cleaned CSV only carries song_name, the metrics and final_lyrics.
+    df = pd.read_csv(path)
+    df['source'] = source or Path(path).stem
+    return to_table(df)
+
+def read_txt(path):
+    # Scraper output: "Key: value" header lines, a blank line, then the lyrics.
+    text = Path(path).read_text(encoding='utf-8')
+    header, sep, body = text.partition('\n\n')
+    fields = {}
+    for line in header.splitlines():
+        key, colon, value = line.partition(': ')
+        if not colon:
+            return {}, text
+        fields[key.strip().lower()] = value.strip()
+    return fields, body if sep else ''
+
+def from_txt_tree(root, source=None):
+    # <root>/<movie>/<song>.txt, as written by the lyrics scrapers.
+    root = Path(root)
+    rows = []
+    for path in sorted(root.glob("*/*.txt")):
+        fields, lyrics = read_txt(path)
+        rows.append({
+            'song_name': fields.get('song', path.stem),
+            'movie_name': fields.get('movie', path.parent.name),
+            'source': fields.get('source', source or root.name),
+            'url': fields.get('url'),
+            'lyrics': lyrics,
+        })
+    return to_table(pd.DataFrame(rows, columns=['song_name', 'movie_name', 'source', 'url', 'lyrics']))
+
+def from_shards(paths, source=None):
+    # JSONL/Parquet shards written by the scrapers' batched sink.
+    from scrape.sink import read_shards
+    df = read_shards(paths, columns=['song_name', 'movie_name', 'source', 'url', 'lyrics'])
+    if source:
+        df['source'] = source
+    return to_table(df)
+
+def with_metrics(table, cache_path=None):
+    # Fills the metric columns from build_corpus, reusing its token cache.
+    from data_cleaning import build_corpus, features
+    df = table.to_pandas()
+    has_lyrics = df['lyrics'].notna()
+    if not has_lyrics.any():
+        return table
+    cache = features.TokenCache(cache_path) if cache_path else None
+    try:
+        metrics, _, _ = build_corpus.build(df[has_lyrics], cache)
+    finally:
+        if cache:
+            cache.close()
+    metrics.index = df.index[has_lyrics]
+    for column in build_corpus.METRICS:
+        df.loc[has_lyrics, column] = metrics[column]
+    return to_table(df)
+
+def main(output=CORPUS_PATH, extracted=(), cleaned=(), txt_trees=(), metrics_cache=None, compute_metrics=True, shards=()):
+    tables = [from_extracted_csv(path) for path in extracted]
+    tables += [from_txt_tree(root) for root in txt_trees]
+    if shards:
+        tables.append(from_shards(shards))
+    if tables and compute_metrics:
+        tables = [with_metrics(pa.concat_tables(tables), metrics_cache)]
+    tables += [from_cleaned_csv(path) for path in cleaned]
+    if not tables:
+        raise SystemExit("Nothing to import: pass --extracted, --cleaned, --txt and/or --shards")
+    table = pa.concat_tables(tables)
+    write_corpus(table, output)
+    print(f"{table.num_rows} songs -> {output} ({Path(output).stat().st_size / 1024:.0f} KB)")
+    return table
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import lyrics CSVs and scraper .txt trees into one Parquet/Arrow corpus")
+    parser.add_argument("-o", "--output", default=CORPUS_PATH, help=".parquet, or .arrow for memory-mapped reads")
+    parser.add_argument("--extracted", action="append", default=[], help=f"raw lyrics CSV like {RAW_CSV}")
+    parser.add_argument("--cleaned", action="append", default=[], help=f"cleaned metrics CSV like {CLEAN_CSV}")
+    parser.add_argument("--txt", action="append", default=[], help="scraper output folder, e.g. lyrics_serper_tape")
+    parser.add_argument("--shards", action="append", default=[], help="scraper shard file or folder, e.g. lyrics_shards")
+    parser.add_argument("--metrics-cache", default=".cache/lyrics_tokens.npz", help="build_corpus token cache")
+    parser.add_argument("--no-metrics", action="store_true", help="leave metric columns empty")
+    args = parser.parse_args()
+    main(args.output, args.extracted, args.cleaned, args.txt, args.metrics_cache, not args.no_metrics, args.shards)
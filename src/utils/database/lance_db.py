@@ -1,20 +1,163 @@
-import lancedb
+import asyncio
+import threading
+import time
+import weakref
+from datetime import timedelta
 from dotenv import load_dotenv
 load_dotenv()
-import os 
+import os
 LANCEDB_API_KEY=os.getenv("LANCEDB_API_KEY")
 LANCEDB_URL=os.getenv("LANCEDB_URL")
+LANCEDB_REGION="us-east-1"
 
-def get_lance():
-  db = lancedb.connect(
-    api_key=LANCEDB_API_KEY,
-    uri=LANCEDB_URL,
-    region="us-east-1"
-  )
-  return db
-
-def get_lance_table(table_name:str):
-  db=get_lance()
-  table = db.open_table(table_name)
+# Used when LANCEDB_URL isn't set, so everything runs against a local
+# directory (tests, load tests, offline work).
+LOCAL_URI=".cache/lancedb"
+# A cached connection is only re-checked after sitting this long, so the
+# check costs at most one round trip per interval rather than one per call.
+HEALTH_CHECK_INTERVAL=30.0
+# Local table handles otherwise never see rows written by other processes.
+READ_CONSISTENCY=timedelta(seconds=5)
+MAX_CONCURRENCY=16
+
+_lock=threading.Lock()
+_connections={}
+_tables={}
+
+def _resolve(uri):
+  return str(uri or LANCEDB_URL or LOCAL_URI)
+
+def _is_remote(uri):
+  return uri.startswith("db://")
+
+def _connect(uri):
+  # lancedb takes over a second to import, so it waits for a first connection.
+  import lancedb
+  if _is_remote(uri):
+    return lancedb.connect(api_key=LANCEDB_API_KEY, uri=uri, region=LANCEDB_REGION)
+  return lancedb.connect(uri, read_consistency_interval=READ_CONSISTENCY)
+
+def is_healthy(db):
+  try:
+    db.list_tables()
+    return True
+  except Exception:
+    return False
+
+def get_lance(uri=None, refresh=False):
+  # One connection per URI for the whole process. Handles that have been idle
+  # past HEALTH_CHECK_INTERVAL are probed first and replaced if dead, which
+  # also drops every table handle opened through them.
+  uri=_resolve(uri)
+  with _lock:
+    entry=_connections.get(uri)
+    now=time.monotonic()
+    if entry and not refresh:
+      db, checked=entry
+      if now - checked < HEALTH_CHECK_INTERVAL or is_healthy(db):
+        _connections[uri]=(db, now)
+        return db
+    for key in [k for k in _tables if k[0] == uri]:
+      del _tables[key]
+    db=_connect(uri)
+    _connections[uri]=(db, now)
+    return db
+
+def get_lance_table(table_name:str, uri=None, refresh=False):
+  uri=_resolve(uri)
+  db=get_lance(uri)
+  with _lock:
+    table=_tables.get((uri, table_name))
+  if table is None or refresh:
+    table=db.open_table(table_name)
+    with _lock:
+      _tables[(uri, table_name)]=table
   return table
 
+def forget(uri=None, table_name=None):
+  # Drops cached handles: one table, or a whole connection when no table is
+  # given. Call after dropping/recreating a table from another handle.
+  uri=_resolve(uri)
+  with _lock:
+    if table_name is not None:
+      _tables.pop((uri, table_name), None)
+      return
+    _connections.pop(uri, None)
+    for key in [k for k in _tables if k[0] == uri]:
+      del _tables[key]
+
+# --- asyncio ------------------------------------------------------------------
+
+class AsyncLance:
+  # The same caching over LanceDB's async client. Bulk queries go through a
+  # semaphore so a burst of thousands can't open thousands of requests.
+  def __init__(self, uri=None, max_concurrency=MAX_CONCURRENCY):
+    self.uri=_resolve(uri)
+    self.semaphore=asyncio.Semaphore(max_concurrency)
+    self._lock=asyncio.Lock()
+    self._db=None
+    self._checked=0.0
+    self._tables={}
+
+  async def connect(self, refresh=False):
+    async with self._lock:
+      now=time.monotonic()
+      if self._db is not None and not refresh:
+        if now - self._checked < HEALTH_CHECK_INTERVAL or await self._healthy():
+          self._checked=now
+          return self._db
+      self._tables.clear()
+      import lancedb
+      if _is_remote(self.uri):
+        self._db=await lancedb.connect_async(self.uri, api_key=LANCEDB_API_KEY, region=LANCEDB_REGION)
+      else:
+        self._db=await lancedb.connect_async(self.uri, read_consistency_interval=READ_CONSISTENCY)
+      self._checked=now
+      return self._db
+
+  async def _healthy(self):
+    try:
+      await self._db.list_tables()
+      return True
+    except Exception:
+      return False
+
+  async def table(self, table_name, refresh=False):
+    db=await self.connect()
+    table=self._tables.get(table_name)
+    if table is None or refresh:
+      table=await db.open_table(table_name)
+      self._tables[table_name]=table
+    return table
+
+  async def search(self, table_name, vector, k=10, columns=None, distance_type="cosine", nprobes=None):
+    table=await self.table(table_name)
+    async with self.semaphore:
+      query=(await table.search(vector)).distance_type(distance_type).limit(k)
+      if nprobes:
+        query=query.nprobes(nprobes)
+      if columns:
+        # _distance named explicitly, or Lance warns on every query.
+        query=query.select(list(columns)+[c for c in ("_distance",) if c not in columns])
+      return await query.to_pandas()
+
+  async def search_many(self, table_name, vectors, k=10, **kwargs):
+    return await asyncio.gather(*(self.search(table_name, v, k, **kwargs) for v in vectors))
+
+  def close(self):
+    for table in self._tables.values():
+      table.close()
+    self._tables.clear()
+    if self._db is not None:
+      self._db.close()
+      self._db=None
+
+_async_clients=weakref.WeakKeyDictionary()
+
+def get_lance_async(uri=None, max_concurrency=MAX_CONCURRENCY):
+  # asyncio primitives belong to one event loop, so clients are cached per loop.
+  clients=_async_clients.setdefault(asyncio.get_running_loop(), {})
+  uri=_resolve(uri)
+  if uri not in clients:
+    clients[uri]=AsyncLance(uri, max_concurrency)
+  return clients[uri]
@@ -0,0 +1,193 @@
+import argparse
+import importlib
+import time
+import zlib
+import numpy as np
+import pyarrow as pa
+from utils import corpus_store
+from utils.database import lance_db
+
+INDEX_URI = lance_db.LOCAL_URI
+INDEX_TABLE = "lyrics_vectors"
+BATCH_SIZE = 4096
+EMBED_DIM = 256
+NGRAMS = (2, 3, 4)
+# PQ trains 256 centroids per sub-vector; below this a flat scan is both
+# faster and exact, so the index is skipped.
+MIN_INDEX_ROWS = 1024
+NPROBES = 20
+REFINE_FACTOR = 5
+TEXT_COLUMN = 'final_lyrics'
+COLUMNS = ['song_name', 'movie_name', 'source']
+
+# --- embedders ----------------------------------------------------------------
+# Anything with .name, .dim and .embed(list[str]) -> float32 (n, dim) array
+# can be plugged in with --embedder module:Class.
+
+class HashingEmbedder:
+    # Signed feature hashing of per-word character n-grams. No model files and
+    # no training, and it copes with Telugu's long agglutinated words better
+    # than whole-word tokens. Each distinct word is hashed once per embedder.
+    def __init__(self, dim=EMBED_DIM, ngrams=NGRAMS):
+        self.dim = dim
+        self.ngrams = ngrams
+        self.name = f"hashing-{dim}-{'.'.join(map(str, ngrams))}"
+        self._words = {}
+
+    def _features(self, word):
+        cached = self._words.get(word)
+        if cached is None:
+            padded = f"<{word}>"
+            grams = [padded[i:i + n] for n in self.ngrams for i in range(len(padded) - n + 1)] or [padded]
+            hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint32, count=len(grams))
+            cached = ((hashes % self.dim).astype(np.intp), np.where(hashes >> 31, -1.0, 1.0))
+            self._words[word] = cached
+        return cached
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = (text or '').split()
+            if not words:
+                continue
+            features = [self._features(w) for w in words]
+            buckets = np.concatenate([f[0] for f in features])
+            signs = np.concatenate([f[1] for f in features])
+            vec = np.bincount(buckets, weights=signs, minlength=self.dim)
+            vec = np.sign(vec) * np.log1p(np.abs(vec))
+            norm = np.linalg.norm(vec)
+            out[row] = vec / norm if norm else vec
+        return out
+
+class SentenceTransformerEmbedder:
+    # Optional: needs `pip install sentence-transformers` and a cached model.
+    def __init__(self, model="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2", batch_size=64):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("SentenceTransformerEmbedder needs sentence-transformers installed") from e
+        self.model = SentenceTransformer(model, device="cpu")
+        self.batch_size = batch_size
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{model}"
+
+    def embed(self, texts):
+        return self.model.encode(
+            [t or '' for t in texts], batch_size=self.batch_size,
+            normalize_embeddings=True, convert_to_numpy=True,
+        ).astype(np.float32)
+
+def load_embedder(spec=None):
+    if not spec or spec == "hashing":
+        return HashingEmbedder()
+    module, _, cls = spec.partition(":")
+    return getattr(importlib.import_module(module), cls)()
+
+# --- index --------------------------------------------------------------------
+
+class LyricsIndex:
+    def __init__(self, db, table_name=INDEX_TABLE, embedder=None, uri=None):
+        self.db = db
+        self.uri = uri
+        self.table_name = table_name
+        self.embedder = embedder or HashingEmbedder()
+        self._table = None
+
+    @classmethod
+    def connect(cls, uri=INDEX_URI, table_name=INDEX_TABLE, embedder=None):
+        # Shares lance_db's process-wide connection and table handles.
+        return cls(lance_db.get_lance(uri), table_name, embedder, uri)
+
+    def schema(self):
+        fields = [(name, pa.string()) for name in COLUMNS]
+        fields.append(('vector', pa.list_(pa.float32(), self.embedder.dim)))
+        return pa.schema(fields, metadata={'embedder': self.embedder.name})
+
+    @property
+    def table(self):
+        if self._table is None:
+            if self.uri is not None:
+                self._table = lance_db.get_lance_table(self.table_name, self.uri)
+            else:
+                self._table = self.db.open_table(self.table_name)
+            stored = (self._table.schema.metadata or {}).get(b'embedder', b'').decode()
+            if stored and stored != self.embedder.name:
+                raise ValueError(f"{self.table_name} was built with {stored}, not {self.embedder.name}")
+        return self._table
+
+    def _batches(self, corpus, batch_size):
+        schema = self.schema()
+        for batch in corpus.to_batches(max_chunksize=batch_size):
+            texts = batch.column(TEXT_COLUMN).to_pylist()
+            vectors = self.embedder.embed(texts)
+            yield pa.RecordBatch.from_arrays(
+                [batch.column(name) for name in COLUMNS]
+                + [pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), self.embedder.dim)],
+                schema=schema,
+            )
+
+    def ingest(self, corpus_path=corpus_store.CORPUS_PATH, batch_size=BATCH_SIZE):
+        # Embeds batch by batch and streams them into a single table write, so
+        # the whole corpus's vectors are never held at once and Lance gets a
+        # few large fragments instead of one per song.
+        corpus = corpus_store.read_corpus(corpus_path, COLUMNS + [TEXT_COLUMN])
+        corpus = corpus.filter(corpus.column(TEXT_COLUMN).is_valid())
+        reader = pa.RecordBatchReader.from_batches(self.schema(), self._batches(corpus, batch_size))
+        self._table = self.db.create_table(self.table_name, data=reader, mode="overwrite")
+        if self.uri is not None:
+            lance_db.forget(self.uri, self.table_name)
+        return self._table.count_rows()
+
+    def build_index(self, num_partitions=None, num_sub_vectors=None):
+        rows = self.table.count_rows()
+        if rows < MIN_INDEX_ROWS:
+            return False
+        from lancedb.index import IvfPq
+        self.table.create_index(
+            'vector',
+            config=IvfPq(
+                distance_type='cosine',
+                num_partitions=num_partitions or max(1, int(np.sqrt(rows))),
+                num_sub_vectors=num_sub_vectors or self.embedder.dim // 16,
+            ),
+            replace=True,
+        )
+        return True
+
+    def search_vector(self, vector, k=10, exact=False, nprobes=NPROBES, refine_factor=REFINE_FACTOR):
+        query = self.table.search(vector, vector_column_name='vector').distance_type('cosine').limit(k)
+        if exact:
+            query = query.bypass_vector_index()
+        else:
+            query = query.nprobes(nprobes).refine_factor(refine_factor)
+        # _distance named explicitly: leaving it out makes Lance log a
+        # deprecation warning on every query.
+        return query.select(COLUMNS + ['_distance']).to_pandas()
+
+    def search_similar(self, lyrics, k=10, **kwargs):
+        return self.search_vector(self.embedder.embed([lyrics])[0], k, **kwargs)
+
+def search_similar(lyrics, k=10, uri=INDEX_URI, table_name=INDEX_TABLE, embedder=None):
+    return LyricsIndex.connect(uri, table_name, embedder).search_similar(lyrics, k)
+
+def main(corpus_path, uri=INDEX_URI, table_name=INDEX_TABLE, embedder_spec=None, batch_size=BATCH_SIZE):
+    index = LyricsIndex.connect(uri, table_name, load_embedder(embedder_spec))
+    start = time.perf_counter()
+    rows = index.ingest(corpus_path, batch_size)
+    print(f"Embedded {rows} songs with {index.embedder.name} in {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    if index.build_index():
+        print(f"Built IVF-PQ index in {time.perf_counter() - start:.1f}s")
+    else:
+        print(f"Fewer than {MIN_INDEX_ROWS} rows: searches use a flat scan")
+    return index
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed the lyrics corpus into a local LanceDB table")
+    parser.add_argument("corpus", nargs="?", default=corpus_store.CORPUS_PATH, help="corpus .parquet/.arrow from utils.corpus_store")
+    parser.add_argument("--uri", default=INDEX_URI)
+    parser.add_argument("--table", default=INDEX_TABLE)
+    parser.add_argument("--embedder", default="hashing", help="'hashing' or module:Class")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    main(args.corpus, args.uri, args.table, args.embedder, args.batch_size)
@@ -0,0 +1,36 @@
+import csv
+import os
+import threading
+from pathlib import Path
+
+DATASET_CSV = "rawdata/spb_rvc_training_dataset.csv"
+
+_lock = threading.Lock()
+
+def song_stem(base_folder, song):
+    # <base>/<Category>/<Song_Name>, the layout spb_songs has always used.
+    category_clean = song['category'].replace(" ", "_").replace("/", "-")
+    song_clean = song['song_name'].replace(" ", "_")
+    return Path(base_folder) / category_clean / song_clean
+
+def load_dataset(path=DATASET_CSV):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def update_dataset(path, song, **columns):
+    with _lock:
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            fields = reader.fieldnames
+            rows = list(reader)
+        for row in rows:
+            if row['song_name'] == song['song_name'] and row['movie_name'] == song['movie_name']:
+                row.update(columns)
+        # Written beside the original and swapped in, so a crash mid-write
+        # never leaves a truncated dataset file.
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp, path)
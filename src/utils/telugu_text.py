@@ -0,0 +1,86 @@
+import re
+
+TELUGU_RANGE = '\u0C00-\u0C7F'
+TELUGU_RE = re.compile(f'[{TELUGU_RANGE}]')
+NON_TELUGU_RE = re.compile(f'[^{TELUGU_RANGE}]+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Navigation / social chrome that leaks into the scraped lyrics blocks.
+SERPER_BLOCKLIST = ('home', 'movie', 'review', 'rating', 'whatsapp', 'share', 'tweet', 'pin it')
+STEALTH_BLOCKLIST = ('share', 'comment', 'whatsapp', 'search', 'home', 'click here', 'advertisement')
+
+# Romanized Telugu titles are spelt freely ("Choope"/"Chupe",
+# "Nachchav"/"Nachav", "Dhivi"/"Divi", "Allantha_Doorala"/"Allantha Doorala"),
+# so titles are folded to one spelling before they're compared.
+_TITLE_FOLDS = [(re.compile(p), r) for p, r in (
+    (r'[^a-z]', ''), (r'ee', 'i'), (r'oo', 'u'), (r'([bcdgjkpt])h', r'\1'),
+    (r'w', 'v'), (r'z', 'j'), (r'(.)\1+', r'\1'),
+)]
+
+_blockers = {}
+
+def blocklist_re(keywords):
+    # All keywords folded into one alternation, so each line is scanned once
+    # instead of once per keyword. Compiled once per blocklist.
+    pattern = _blockers.get(keywords)
+    if pattern is None:
+        pattern = _blockers[keywords] = re.compile('|'.join(map(re.escape, keywords)))
+    return pattern
+
+def fold_title(title):
+    title = str(title or '').lower()
+    for pattern, repl in _TITLE_FOLDS:
+        title = pattern.sub(repl, title)
+    return title
+
+def is_telugu(text):
+    return TELUGU_RE.search(text) is not None
+
+def count_telugu_chars(text):
+    # Deleting everything else and measuring the rest is ~2x faster than
+    # findall(), which allocates a one-character string per match.
+    return len(NON_TELUGU_RE.sub('', text)) if text else 0
+
+def telugu_ratio(text):
+    if not isinstance(text, str) or not text:
+        return 0
+    total = len(WHITESPACE_RE.sub('', text))
+    if total == 0:
+        return 0
+    return count_telugu_chars(text) / total
+
+def clean_text(text, blocklist=SERPER_BLOCKLIST, telugu_only=True):
+    if not text: return ""
+    blocked = blocklist_re(tuple(blocklist)).search
+    cleaned = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if telugu_only and TELUGU_RE.search(line) is None:
+            continue
+        if blocked(line.lower()):
+            continue
+        cleaned.append(line)
+    return '\n'.join(cleaned)
+
+def _batch(func, texts, *args):
+    # Accepts a pandas Series (index preserved) or any iterable of strings.
+    values = texts.tolist() if hasattr(texts, 'tolist') else texts
+    results = [func(text if isinstance(text, str) else '', *args) for text in values]
+    if hasattr(texts, 'iloc'):
+        import pandas as pd
+        return pd.Series(results, index=texts.index, name=texts.name)
+    return results
+
+def count_telugu_chars_batch(texts):
+    return _batch(count_telugu_chars, texts)
+
+def telugu_ratio_batch(texts):
+    return _batch(telugu_ratio, texts)
+
+def is_telugu_batch(texts):
+    return _batch(is_telugu, texts)
+
+def clean_text_batch(texts, blocklist=SERPER_BLOCKLIST, telugu_only=True):
+    return _batch(clean_text, texts, blocklist, telugu_only)
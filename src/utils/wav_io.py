@@ -0,0 +1,95 @@
+import os
+import struct
+import numpy as np
+
+PCM = 1
+IEEE_FLOAT = 3
+EXTENSIBLE = 0xFFFE
+
+DTYPES = {(PCM, 16): np.int16, (PCM, 32): np.int32, (IEEE_FLOAT, 32): np.float32}
+SCALE = {np.int16: 32768.0, np.int32: 2147483648.0, np.float32: 1.0}
+
+class WavInfo:
+    def __init__(self, rate, channels, dtype, offset, frames):
+        self.rate = rate
+        self.channels = channels
+        self.dtype = dtype
+        self.offset = offset
+        self.frames = frames
+
+    @property
+    def seconds(self):
+        return self.frames / self.rate
+
+def read_info(path):
+    # Walks the RIFF chunks just far enough to find where the samples start;
+    # the samples themselves are never read here.
+    with open(path, 'rb') as f:
+        riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave != b'WAVE':
+            raise ValueError(f"{path}: not a RIFF/WAVE file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: no data chunk")
+            chunk_id, size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                body = f.read(size)
+                tag, channels, rate, _, _, bits = struct.unpack('<HHIIHH', body[:16])
+                if tag == EXTENSIBLE:
+                    tag = struct.unpack('<H', body[24:26])[0]
+                fmt = (tag, channels, rate, bits)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"{path}: data before fmt chunk")
+                tag, channels, rate, bits = fmt
+                dtype = DTYPES.get((tag, bits))
+                if dtype is None:
+                    raise ValueError(f"{path}: unsupported WAV format {tag}/{bits}-bit")
+                offset = f.tell()
+                # ffmpeg writes 0xFFFFFFFF sizes when streaming; trust the file length then.
+                available = os.path.getsize(path) - offset
+                size = available if size in (0, 0xFFFFFFFF) else min(size, available)
+                frames = size // (channels * np.dtype(dtype).itemsize)
+                return WavInfo(rate, channels, dtype, offset, frames)
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+            if chunk_id == b'fmt ' and size & 1:
+                f.seek(1, os.SEEK_CUR)
+
+def open_wav(path):
+    # Samples as a (frames, channels) view onto the file: pages are only read
+    # as chunks of it are touched, so a whole song is never loaded at once.
+    info = read_info(path)
+    if info.frames == 0:
+        return info, np.zeros((0, info.channels), dtype=info.dtype)
+    data = np.memmap(path, dtype=info.dtype, mode='r', offset=info.offset, shape=(info.frames, info.channels))
+    return info, data
+
+def to_float(chunk):
+    return chunk.astype(np.float32) / SCALE[chunk.dtype.type]
+
+def create_wav(path, rate, channels, frames, dtype=np.float32):
+    # Writes the header, then hands back a writable memmap over the data area.
+    dtype = np.dtype(dtype)
+    tag = IEEE_FLOAT if dtype == np.float32 else PCM
+    size = frames * channels * dtype.itemsize
+    header = struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + size, b'WAVE',
+        b'fmt ', 16, tag, channels, rate, rate * channels * dtype.itemsize, channels * dtype.itemsize, dtype.itemsize * 8,
+        b'data', size,
+    )
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.truncate(len(header) + size)
+    if frames == 0:
+        return np.zeros((0, channels), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r+', offset=len(header), shape=(frames, channels))
+
+def write_pcm16(path, rate, samples):
+    out = create_wav(path, rate, samples.shape[1], samples.shape[0], np.int16)
+    if len(samples):
+        out[:] = np.clip(samples * 32767.0, -32768, 32767).astype(np.int16)
+        out.flush()
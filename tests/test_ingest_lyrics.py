@@ -0,0 +1,31 @@
+from datasets.ingest_lyrics import _song_name
+
+
+def test_plain_pallavi():
+    assert _song_name("\n  ఆకాశ దేశాన ఆషాఢ మాసాన మెరిసేటి\nమేఘమా") == "ఆకాశ_దేశాన_ఆషాఢ_మాసాన_మెరిసేటి"
+
+
+def test_section_label_line_is_skipped():
+    assert _song_name("పల్లవి:\nనీవేనా నను తలచినది\n") == "నీవేనా_నను_తలచినది"
+    assert _song_name("పల్లవి :\n\nనీవేనా నను తలచినది") == "నీవేనా_నను_తలచినది"
+
+
+def test_credit_lines_are_skipped():
+    lyrics = ("Director:\xa0Santhana Bharathi\nMusic: Ilayaraja\nCast: Kamal Hassan, Roshni\n\n"
+              "Priyathama Neevachata Kushalama:\nSingers: S.P.Balu, S.P. Sailaja\nLyrics: Vennelakanti\n")
+    assert _song_name(lyrics) == "Priyathama_Neevachata_Kushalama"
+    assert _song_name("Singer: Vani Jayaram\nగానం : జానకి\nఎవరో రావాలి") == "ఎవరో_రావాలి"
+
+
+def test_song_label_names_the_song():
+    assert _song_name("Song: Eppudeppudu Valapu\nMusic: Chakravarthy\n") == "Eppudeppudu_Valapu"
+
+
+def test_singer_prefix_is_dropped():
+    assert _song_name("అ: ప: దేవుడే ఇచ్చాడు వీధి ఒకటి") == "దేవుడే_ఇచ్చాడు_వీధి_ఒకటి"
+    assert _song_name("అభిమన్యుడు: నీవేనా నను తలచినది") == "నీవేనా_నను_తలచినది"
+    assert _song_name("ఓ మనసా... : ఓ మనసా\nనీ చూపే") == "ఓ_మనసా..."
+
+
+def test_no_lyrics():
+    assert _song_name("పల్లవి:\n\n") == ""
@@ -0,0 +1,33 @@
+from scrape.query_planner import QueryPlanner, SearchIndex, match_score, movie_group
+
+def result(title, slug):
+    return {"title": f"{title} Song Lyrics In Telugu - Cinema", "link": f"https://lyricstape.com/{slug}/"}
+
+def test_sibling_titles_do_not_match():
+    assert match_score("Cheliya", result("Cheliya Cheliya", "cheliya-cheliya-song-lyrics"))[0] < 0.85
+    assert match_score("Nuvvu Nenu", result("Nuvvu Nenu Prema", "nuvvu-nenu-prema-song-lyrics"))[0] < 0.85
+
+def test_spelling_and_version_variants_match():
+    assert match_score("Gaali Vaaluga", result("Gali Valuga", "gali-valuga-song-lyrics")) == (1.0, True)
+    assert match_score("Samajavaragamana - Female", result("Samajavaragamana", "samajavaragamana")) == (1.0, False)
+
+def test_movie_groups_keep_numbers():
+    assert movie_group("Gang Leader (1991)") != movie_group("Gang Leader (2019)")
+    assert movie_group("Manmadhudu") != movie_group("Manmadhudu 2")
+
+def test_song_missing_from_movie_results_gets_its_own_search(tmp_path):
+    queries = []
+
+    def search(payloads):
+        queries.extend(p["q"] for p in payloads)
+        # The movie's page lists only "Cheliya Cheliya"; a song's own
+        # search finds its page.
+        return [{"organic": [result("Cheliya Cheliya", "cheliya-cheliya")]} if "Cheliya" not in p["q"]
+                else {"organic": [{"title": "own", "link": "https://lyricstape.com/own/"}]} for p in payloads]
+
+    planner = QueryPlanner(search, SearchIndex(tmp_path / "index.sqlite"))
+    planner.prefetch([{"song_name": "Cheliya Cheliya", "movie_album": "Cinema"},
+                      {"song_name": "Cheliya", "movie_album": "Cinema"}])
+    assert planner.urls("Cheliya Cheliya", "Cinema") == ["https://lyricstape.com/cheliya-cheliya/"]
+    assert planner.urls("Cheliya", "Cinema") == ["https://lyricstape.com/own/"]
+    assert queries == ["site:lyricstape.com Cinema lyrics", "site:lyricstape.com Cheliya Cinema lyrics"]
@@ -0,0 +1,47 @@
+import time
+from scrape.resolver import Backend, LyricsResolver
+
+LYRICS = "నీవే నా ప్రాణం నా మనసు నీ కోసం పాడే పాట ఇది వెన్నెల గాలి"
+
+class StubBackend(Backend):
+    def __init__(self, name, found, seconds=0.0, start_after=0.0):
+        super().__init__(start_after=start_after)
+        self.name = name
+        self.found = found
+        self.seconds = seconds
+        self.started = None
+
+    def resolve(self, song, movie, cancelled):
+        self.started = time.monotonic()
+        time.sleep(self.seconds)
+        return (True, LYRICS, f"https://lyricstape.com/{self.name}") if self.found else (False, "", "")
+
+def resolve(*backends):
+    resolver = LyricsResolver(backends, min_telugu_chars=10, song_workers=1)
+    try:
+        return resolver.resolve("Pata", "Cinema")
+    finally:
+        resolver.close()
+
+def test_miss_then_delayed_backend_starts_at_once_without_spinning():
+    cpu, wall = time.process_time(), time.monotonic()
+    result = resolve(StubBackend("free", False), StubBackend("paid", True, start_after=2.0))
+    assert result.found and result.backend == "paid"
+    assert result.outcomes == {"free": "missed", "paid": "won"}
+    # The paid backend didn't wait out its 2 s delay, and nothing busy-waited.
+    assert time.monotonic() - wall < 1.0
+    assert time.process_time() - cpu < 0.5
+
+def test_delay_still_gives_a_running_backend_its_head_start():
+    slow = StubBackend("free", False, seconds=0.6)
+    paid = StubBackend("paid", True, start_after=0.3)
+    start = time.monotonic()
+    result = resolve(slow, paid)
+    assert result.backend == "paid"
+    assert 0.25 <= paid.started - start < 0.55
+
+def test_delayed_backend_not_started_once_another_wins():
+    paid = StubBackend("paid", True, start_after=2.0)
+    result = resolve(StubBackend("free", True, seconds=0.1), paid)
+    assert result.backend == "free"
+    assert result.outcomes["paid"] == "not started" and paid.started is None
@@ -0,0 +1,63 @@
+import re
+from pathlib import Path
+import pandas as pd
+import pytest
+from bench.bench_telugu_text import (FIXTURES, legacy_clean_serper, legacy_clean_stealth,
+                                     legacy_count_telugu_chars, legacy_is_telugu)
+from utils import telugu_text
+
+CORPUS = Path(__file__).resolve().parents[1] / "rawdata" / "extracted_data.csv"
+
+EDGE_CASES = [
+    "",
+    "\n\n  \n",
+    "English only line",
+    "ప్రేమ",
+    "  నీవే నా ప్రాణం  \nShare on WhatsApp\nHOME\nమనసు  కలలు\n",
+    "Movie: ఆకాశం\nClick Here to read more\nవెన్నెల గాలి\r\ncomment below",
+    "ఀ ౿ boundary characters",
+]
+
+def fixture_pages():
+    # Tags turned into line breaks, as the bench does, so the blocklists see
+    # the navigation and comment lines of a real page.
+    return [re.sub(r'<[^>]+>', '\n', p.read_text(encoding='utf-8')) for p in sorted(FIXTURES.glob("*.html"))]
+
+def corpus_lyrics():
+    if not CORPUS.is_file():
+        return []
+    return pd.read_csv(CORPUS, index_col=0)['lyrics'].fillna('').astype(str).tolist()
+
+TEXTS = EDGE_CASES + fixture_pages() + corpus_lyrics()
+IDS = [f"text{i}" for i in range(len(TEXTS))]
+
+def test_fixture_pages_found():
+    assert fixture_pages()
+
+@pytest.mark.parametrize("text", TEXTS, ids=IDS)
+def test_is_telugu(text):
+    assert telugu_text.is_telugu(text) == legacy_is_telugu(text)
+
+@pytest.mark.parametrize("text", TEXTS, ids=IDS)
+def test_count_telugu_chars(text):
+    assert telugu_text.count_telugu_chars(text) == legacy_count_telugu_chars(text)
+
+@pytest.mark.parametrize("text", TEXTS, ids=IDS)
+def test_clean_text_serper(text):
+    assert telugu_text.clean_text(text, telugu_text.SERPER_BLOCKLIST, telugu_only=True) == legacy_clean_serper(text)
+
+@pytest.mark.parametrize("text", TEXTS, ids=IDS)
+def test_clean_text_stealth(text):
+    assert telugu_text.clean_text(text, telugu_text.STEALTH_BLOCKLIST, telugu_only=False) == legacy_clean_stealth(text)
+
+def test_batches_match_single_calls():
+    series = pd.Series(TEXTS, index=range(100, 100 + len(TEXTS)), name="lyrics")
+    cleaned = telugu_text.clean_text_batch(series, telugu_text.SERPER_BLOCKLIST, True)
+    assert cleaned.index.equals(series.index) and cleaned.name == "lyrics"
+    assert cleaned.tolist() == [legacy_clean_serper(t) for t in TEXTS]
+    assert telugu_text.is_telugu_batch(TEXTS) == [legacy_is_telugu(t) for t in TEXTS]
+    assert telugu_text.count_telugu_chars_batch(series).tolist() == [legacy_count_telugu_chars(t) for t in TEXTS]
+
+def test_batch_treats_missing_as_empty():
+    assert telugu_text.clean_text_batch([None, float('nan')]) == ["", ""]
+    assert telugu_text.count_telugu_chars_batch([None]) == [0]
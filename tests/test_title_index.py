@@ -0,0 +1,36 @@
+from scrape.title_index import TitleIndex
+
+def index():
+    index = TitleIndex()
+    index.add("Vayari_Bhama", None, "sirivennela_cleaned_data")
+    index.add("Cheliya Cheliya", "Kshana Kshanam", "extracted_data")
+    index.add("Priyathama Neevachata Kushalama", "Guna", "extracted_data")
+    return index
+
+def test_title_without_movie_does_not_hold_another_films_song():
+    assert index().lookup("Vayyari Bhama", "Number One") is None
+
+def test_title_alone_matches_exact_titles_only():
+    assert index().lookup("Vayyari Bhama").score == 1.0
+    assert index().lookup("Priyathama Neevachata Kushalamu") is None
+
+def test_exact_title_needs_a_similar_movie():
+    assert index().lookup("Cheliya Cheliya", "Kshana Kshanam (1991)").source == "extracted_data"
+    assert index().lookup("Cheliya Cheliya", "Gang Leader") is None
+
+def test_fuzzy_match_needs_score_and_movie():
+    assert index().lookup("Cheliya", "Kshana Kshanam") is None
+    assert 0.85 <= index().lookup("Priyathama Neevachata Kushalamu", "Guna (1991)").score < 1.0
+
+def test_missing_lists_every_skip_it_is_unsure_of(capsys):
+    rows = [
+        {"song_name": "Vayyari Bhama", "movie_album": "Number One"},
+        {"song_name": "Vayyari Bhama", "movie_album": ""},
+        {"song_name": "Priyathama Neevachata Kushalamu", "movie_album": "Guna"},
+        {"song_name": "Cheliya Cheliya", "movie_album": "Kshana Kshanam"},
+    ]
+    pending = index().missing(rows)
+    assert pending == rows[:1]
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 2
+    assert "'Vayyari Bhama' (-)" in out[0] and "Kushalamu" in out[1]